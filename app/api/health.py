@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from app.services.report_cache import report_cache
 
 # Health check endpoint
 router = APIRouter()
@@ -10,3 +11,10 @@ async def health_check():
     Does not check database connection.
     """
     return {"status": "ok"}
+
+@router.get("/health/report-cache")
+async def report_cache_stats():
+    """
+    Hit, miss and size counters of this worker's report cache.
+    """
+    return report_cache.stats()
@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from pathlib import Path
+from typing import Optional, Tuple
+import mimetypes
+import os
+from app.core.config import settings
+from app.utils.etag import make_etag, etag_matches
+from app.utils.file_serving import parse_range, iter_file_range, stat_file
+from app.utils.image_upload import content_digest
+
+# Uploaded files are never rewritten in place; a new image gets a new name
+UPLOAD_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+router = APIRouter()
+
+def _find_upload(file_path: str) -> Optional[Tuple[Path, os.stat_result]]:
+    """
+    Resolve a path under UPLOAD_DIR to a servable file and its stat.
+
+    Paths escaping the upload directory and hidden files, such as uploads
+    still being written, are not served.
+    """
+    if any(part.startswith(".") for part in Path(file_path).parts):
+        return None
+    upload_dir = Path(settings.UPLOAD_DIR).resolve()
+    full_path = (upload_dir / file_path).resolve()
+    if upload_dir not in full_path.parents:
+        return None
+    stat_result = stat_file(str(full_path))
+    if stat_result is None:
+        return None
+    return full_path, stat_result
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"])
+async def serve_upload(
+    request: Request,
+    file_path: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Serve an uploaded image by the path stored on its user or menu item.
+
+    Responses can be cached for a year without revalidation. A client
+    presenting the ETag in If-None-Match gets a 304 without a body, and a
+    single byte range is served as a 206. HEAD gets the same headers
+    without reading the file.
+
+    No authentication is checked, so that plain <img> tags work. Names are
+    the SHA-256 of the content under a per-user folder, so anyone who knows
+    a user's ID and has a copy of an image can confirm whether that user
+    stored it.
+    """
+    found = await run_in_threadpool(_find_upload, file_path)
+    if found is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    full_path, stat_result = found
+    size = stat_result.st_size
+    
+    # Content-addressed files are tagged by their hash, the same on every host
+    digest = content_digest(file_path)
+    etag = f'"{digest}"' if digest else make_etag(file_path, str(size), str(stat_result.st_mtime_ns))
+    headers = {"ETag": etag, "Cache-Control": UPLOAD_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    # If-Range asks for the whole file unless the client's copy is current
+    byte_range = None
+    if if_range is None or if_range.strip() == etag:
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    
+    if byte_range is None:
+        return FileResponse(full_path, headers=headers, stat_result=stat_result, method=request.method)
+    
+    start, end = byte_range
+    media_type = mimetypes.guess_type(full_path.name)[0] or "application/octet-stream"
+    headers = {
+        **headers,
+        "Content-Range": f"bytes {start}-{end}/{size}",
+        "Content-Length": str(end - start + 1)
+    }
+    if request.method == "HEAD":
+        return Response(status_code=206, media_type=media_type, headers=headers)
+    return StreamingResponse(
+        iter_file_range(str(full_path), start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
@@ -1,30 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Path, Header, Response, UploadFile, File, Query
+from typing import List, Optional
+from datetime import datetime
 from app.middleware.auth_middleware import get_current_user
 from app.middleware.access_control import verify_user_access
-from app.schemas.menu import MenuItem, MenuItemCreate, MenuItemUpdate
+from app.schemas.menu import (
+    MenuItem,
+    MenuItemCreate,
+    MenuItemUpdate,
+    MenuChanges,
+    MenuImportFormat,
+    MenuImportResult
+)
 from app.services.menu_service import (
     get_menu_items, 
+    get_menu_etag,
+    get_menu_changes,
     get_menu_item, 
     create_menu_item, 
+    import_menu_items,
     update_menu_item,
+    update_menu_item_image,
     delete_menu_item
 )
+from app.db.models.menu import FoodCategory
+from app.utils.etag import etag_matches
+from app.utils.menu_import import iter_menu_csv, iter_menu_json, iter_menu_ndjson
+from app.core.config import settings
+import os
 from bson import ObjectId
 
 router = APIRouter()
 
+# Row readers for each menu import format
+MENU_IMPORT_READERS = {
+    MenuImportFormat.CSV: iter_menu_csv,
+    MenuImportFormat.JSON: iter_menu_json,
+    MenuImportFormat.NDJSON: iter_menu_ndjson
+}
+
+def _upload_size(file: UploadFile) -> int:
+    """
+    Get the size of a spooled upload, seeking to its end if the parser
+    didn't record it.
+    """
+    if file.size is not None:
+        return file.size
+    size = file.file.seek(0, os.SEEK_END)
+    file.file.seek(0)
+    return size
+
 @router.get("/{user_id}/menu", response_model=List[MenuItem])
 async def read_menu_items(
+    response: Response,
     user_id: str = Path(...),
+    category: Optional[FoodCategory] = None,
+    is_vegetarian: Optional[bool] = None,
+    is_available: Optional[bool] = None,
+    q: Optional[str] = Query(None, max_length=100),
+    if_none_match: Optional[str] = Header(None),
     current_user=Depends(get_current_user)
 ):
     """
-    Get all menu items for a specific user.
+    Get menu items for a specific user with optional filtering.
+    
+    q matches anywhere in the item name (or at the start of a word for one
+    or two characters); results are then ranked by how well the name
+    matches.
+    
+    The response carries an ETag; sending it back in If-None-Match gets a
+    304 without a body while the menu is unchanged.
     """
     verify_user_access(current_user, user_id)
     
-    items = await get_menu_items(user_id)
+    filters = {}
+    if category:
+        filters["category"] = category.value
+    if is_vegetarian is not None:
+        filters["is_vegetarian"] = is_vegetarian
+    if is_available is not None:
+        filters["is_available"] = is_available
+    if q and q.strip():
+        filters["search"] = q
+    
+    etag = await get_menu_etag(user_id, filters)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    
+    items = await get_menu_items(user_id, filters)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
     return items
 
 @router.post("/{user_id}/menu", response_model=MenuItem, status_code=201)
@@ -41,6 +105,59 @@ async def add_menu_item(
     created_item = await create_menu_item(user_id, item)
     return created_item
 
+@router.post("/{user_id}/menu/import", response_model=MenuImportResult)
+async def import_menu(
+    file: UploadFile = File(...),
+    user_id: str = Path(...),
+    format: Optional[MenuImportFormat] = Query(None),
+    current_user=Depends(get_current_user)
+):
+    """
+    Create or update menu items in bulk from a CSV (with a header line),
+    JSON array or NDJSON upload, matching existing items by name.
+    
+    The format is taken from the file extension unless given. Rows that
+    fail validation are reported individually and the rest are applied.
+    A JSON array is parsed in one piece, so JSON uploads larger than
+    MENU_IMPORT_MAX_BYTES are rejected with 413 before parsing; CSV and
+    NDJSON are read row by row and only limited to MENU_IMPORT_MAX_ROWS.
+    """
+    verify_user_access(current_user, user_id)
+    
+    if format is None:
+        extension = os.path.splitext(file.filename or "")[1].lstrip(".").lower()
+        try:
+            format = MenuImportFormat(extension)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Unknown import format; pass format=csv, json or ndjson")
+    
+    if format == MenuImportFormat.JSON and _upload_size(file) > settings.MENU_IMPORT_MAX_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"JSON imports are limited to {settings.MENU_IMPORT_MAX_BYTES} bytes; use NDJSON for larger menus"
+        )
+    
+    try:
+        result = await import_menu_items(user_id, MENU_IMPORT_READERS[format](file.file))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return result
+
+@router.get("/{user_id}/menu/changes", response_model=MenuChanges)
+async def read_menu_changes(
+    user_id: str = Path(...),
+    since: Optional[datetime] = None,
+    current_user=Depends(get_current_user)
+):
+    """
+    Get the menu items changed or deleted since the watermark returned by
+    the previous call. Without since, the whole menu is returned.
+    """
+    verify_user_access(current_user, user_id)
+    
+    changes = await get_menu_changes(user_id, since)
+    return changes
+
 @router.get("/{user_id}/menu/{item_id}", response_model=MenuItem)
 async def read_menu_item(
     item_id: str,
@@ -74,6 +191,31 @@ async def edit_menu_item(
         raise HTTPException(status_code=404, detail="Menu item not found")
     return updated_item
 
+@router.put("/{user_id}/menu/{item_id}/image", response_model=MenuItem)
+async def edit_menu_item_image(
+    item_id: str,
+    user_id: str = Path(...),
+    file: UploadFile = File(...),
+    current_user=Depends(get_current_user)
+):
+    """
+    Replace a menu item's image.
+    
+    Thumbnail and medium variants are generated in the background and
+    appear in image_variants once ready; until then clients should fall
+    back to image.
+    """
+    verify_user_access(current_user, user_id)
+    
+    # Validate file type
+    if not file.content_type or not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image")
+    
+    updated_item = await update_menu_item_image(user_id, item_id, file)
+    if not updated_item:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    return updated_item
+
 @router.delete("/{user_id}/menu/{item_id}", status_code=204)
 async def remove_menu_item(
     item_id: str,
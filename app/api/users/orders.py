@@ -1,29 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, Request, Header
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from datetime import datetime, date
-from app.middleware.auth_middleware import get_current_user
+from app.middleware.auth_middleware import get_current_user, get_current_stream_user, create_stream_token
 from app.middleware.access_control import verify_user_access
-from app.schemas.order import Order, OrderCreate, OrderUpdate, OrderStatus
+from app.schemas.order import (
+    Order,
+    OrderCreate,
+    OrderUpdate,
+    OrderStatus,
+    OrderExportFormat,
+    OrderSummary,
+    OrderBulkCreate,
+    OrderBulkResponse,
+    OrderChanges
+)
 from app.services.order_service import (
     get_orders, 
+    get_orders_page,
+    get_order_summaries,
+    get_order_changes,
     get_order, 
     create_order, 
+    create_orders_bulk,
     update_order,
-    delete_order
+    delete_order,
+    iter_orders
 )
+from app.utils.export import stream_orders_csv, stream_orders_ndjson, ORDER_CSV_PROJECTION
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.services.order_events import order_event_hub, format_sse, RESET_EVENT
+from app.core.config import settings
+from app.utils.etag import make_etag, etag_matches
+import asyncio
 
 router = APIRouter()
 
 @router.get("/{user_id}/orders", response_model=List[Order])
 async def read_orders(
+    response: Response,
     user_id: str = Path(...),
     status: Optional[OrderStatus] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user=Depends(get_current_user)
 ):
     """
-    Get all orders for a specific user with optional filtering.
+    Get orders for a specific user with optional filtering.
+    
+    Without limit or cursor all matching orders are returned. With either,
+    one page is returned and the cursor of the next page is sent in the
+    X-Next-Cursor header (absent on the last page).
     """
     verify_user_access(current_user, user_id)
     
@@ -34,10 +63,198 @@ async def read_orders(
         filters["start_date"] = start_date
     if end_date:
         filters["end_date"] = end_date
-        
-    orders = await get_orders(user_id, filters)
+    
+    if limit is None and cursor is None:
+        orders = await get_orders(user_id, filters)
+        return orders
+    
+    try:
+        orders, next_cursor = await get_orders_page(
+            user_id, filters, limit=limit or DEFAULT_PAGE_SIZE, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return orders
 
+@router.get("/{user_id}/orders/summary", response_model=List[OrderSummary])
+async def read_order_summaries(
+    response: Response,
+    user_id: str = Path(...),
+    status: Optional[OrderStatus] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user=Depends(get_current_user)
+):
+    """
+    Get the list-view summary (number, table, total, status, time) of a
+    specific user's orders. Filtering and pagination work as for the full
+    order list.
+    """
+    verify_user_access(current_user, user_id)
+    
+    filters = {}
+    if status:
+        filters["status"] = status
+    if start_date:
+        filters["start_date"] = start_date
+    if end_date:
+        filters["end_date"] = end_date
+    
+    try:
+        summaries, next_cursor = await get_order_summaries(
+            user_id, filters, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return summaries
+
+@router.get("/{user_id}/orders/changes", response_model=OrderChanges)
+async def read_order_changes(
+    user_id: str = Path(...),
+    since: Optional[datetime] = None,
+    current_user=Depends(get_current_user)
+):
+    """
+    Get the orders changed or deleted since the watermark returned by the
+    previous call, so reconnecting POS clients only download what changed.
+    Without since, or once since is older than the deletion log is kept,
+    all orders are returned with full set to true.
+    """
+    verify_user_access(current_user, user_id)
+    
+    changes = await get_order_changes(user_id, since)
+    return changes
+
+@router.post("/{user_id}/orders/events/token")
+async def create_order_events_token(
+    user_id: str = Path(...),
+    current_user=Depends(get_current_user)
+):
+    """
+    Issue a short-lived token for the order event stream.
+    
+    A browser EventSource can't send an Authorization header, so it opens
+    the stream with ?token=<token> instead, fetching a new token before
+    each reconnect once this one has expired.
+    """
+    verify_user_access(current_user, user_id)
+    
+    return {
+        "token": create_stream_token(current_user),
+        "expires_in": settings.ORDER_EVENTS_TOKEN_EXPIRE_SECONDS
+    }
+
+@router.get("/{user_id}/orders/events")
+async def stream_order_events(
+    request: Request,
+    user_id: str = Path(...),
+    last_event_id: Optional[str] = Header(None),
+    last_event_id_param: Optional[str] = Query(None, alias="lastEventId"),
+    current_user=Depends(get_current_stream_user)
+):
+    """
+    Push order create, update and delete events as Server-Sent Events.
+    
+    Authenticates with the Authorization header or, for EventSource, a
+    token from the events/token endpoint in the token query parameter.
+    
+    Clients reconnecting with a Last-Event-ID header receive the events they
+    missed; if those are no longer available, or the ID was issued before a
+    restart or by another worker, a "reset" event tells them to reload the
+    order list. Clients that open a new EventSource to pass a fresh token
+    send the last ID they saw as the lastEventId query parameter instead.
+    """
+    verify_user_access(current_user, user_id)
+    
+    if last_event_id is None:
+        last_event_id = last_event_id_param
+    
+    async def event_stream():
+        # Subscribe before replaying so nothing published in between is lost
+        queue = order_event_hub.subscribe(user_id)
+        last_sent = 0
+        try:
+            if last_event_id is not None:
+                missed = order_event_hub.replay(user_id, last_event_id)
+                if missed is None:
+                    yield format_sse(RESET_EVENT)
+                    return
+                last_sent = order_event_hub.parse_event_id(last_event_id)
+                for event in missed:
+                    last_sent = event["seq"]
+                    yield format_sse(event)
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.ORDER_EVENTS_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                if event is RESET_EVENT:
+                    yield format_sse(event)
+                    return
+                if event["seq"] <= last_sent:
+                    # Already sent during replay
+                    continue
+                last_sent = event["seq"]
+                yield format_sse(event)
+        finally:
+            order_event_hub.unsubscribe(user_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{user_id}/orders/export")
+async def export_orders(
+    user_id: str = Path(...),
+    format: OrderExportFormat = Query(OrderExportFormat.CSV),
+    status: Optional[OrderStatus] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user=Depends(get_current_user)
+):
+    """
+    Stream all matching orders as a CSV or NDJSON download.
+    """
+    verify_user_access(current_user, user_id)
+    
+    filters = {}
+    if status:
+        filters["status"] = status
+    if start_date:
+        filters["start_date"] = start_date
+    if end_date:
+        filters["end_date"] = end_date
+    
+    if format == OrderExportFormat.CSV:
+        content = stream_orders_csv(iter_orders(user_id, filters, projection=ORDER_CSV_PROJECTION))
+        media_type = "text/csv"
+    else:
+        content = stream_orders_ndjson(iter_orders(user_id, filters))
+        media_type = "application/x-ndjson"
+    
+    filename = f"orders-{user_id}-{datetime.utcnow().strftime('%Y%m%d')}.{format.value}"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.post("/{user_id}/orders", response_model=Order, status_code=201)
 async def add_order(
     order: OrderCreate,
@@ -49,23 +266,61 @@ async def add_order(
     """
     verify_user_access(current_user, user_id)
     
-    created_order = await create_order(user_id, order)
+    try:
+        created_order = await create_order(user_id, order)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return created_order
 
+@router.post("/{user_id}/orders/bulk", response_model=OrderBulkResponse)
+async def add_orders_bulk(
+    payload: OrderBulkCreate,
+    user_id: str = Path(...),
+    current_user=Depends(get_current_user)
+):
+    """
+    Create many orders at once, e.g. when a POS device syncs orders it
+    queued while offline. Each order should carry an idempotency_key so
+    the batch can be replayed safely; the result of every order is
+    reported individually.
+    """
+    verify_user_access(current_user, user_id)
+    
+    results = await create_orders_bulk(user_id, payload.orders)
+    return {
+        "created": sum(1 for result in results if result["status"] == "created"),
+        "duplicates": sum(1 for result in results if result["status"] == "duplicate"),
+        "failed": sum(1 for result in results if result["status"] == "failed"),
+        "results": results
+    }
+
 @router.get("/{user_id}/orders/{order_id}", response_model=Order)
 async def read_order(
+    response: Response,
     order_id: str,
     user_id: str = Path(...),
+    if_none_match: Optional[str] = Header(None),
     current_user=Depends(get_current_user)
 ):
     """
     Get a specific order.
+    
+    The response carries an ETag derived from the order's updated_at;
+    sending it back in If-None-Match gets a 304 without a body while the
+    order is unchanged.
     """
     verify_user_access(current_user, user_id)
     
     order = await get_order(user_id, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
+    
+    etag = make_etag(str(order["_id"]), order["updated_at"].isoformat())
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
     return order
 
 @router.put("/{user_id}/orders/{order_id}", response_model=Order)
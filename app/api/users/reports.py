@@ -3,8 +3,13 @@ from typing import List, Optional
 from datetime import datetime, date
 from app.middleware.auth_middleware import get_current_user
 from app.middleware.access_control import verify_user_access
-from app.schemas.report import SalesReport, RevenueReport, ReportTimeFrame
-from app.services.report_service import generate_sales_report, generate_revenue_report
+from app.schemas.report import SalesReport, RevenueReport, CategorySalesReport, SummaryReport, ReportTimeFrame
+from app.services.report_service import (
+    generate_sales_report,
+    generate_revenue_report,
+    generate_category_report,
+    generate_summary_report
+)
 
 router = APIRouter()
 
@@ -49,3 +54,46 @@ async def get_revenue_report(
         end_date=end_date
     )
     return report
+
+@router.get("/{user_id}/reports/categories", response_model=CategorySalesReport)
+async def get_category_report(
+    user_id: str = Path(...),
+    time_frame: ReportTimeFrame = Query(ReportTimeFrame.DAILY),
+    start_date: date = Query(...),
+    end_date: Optional[date] = Query(None),
+    current_user=Depends(get_current_user)
+):
+    """
+    Generate a category-wise sales report for a specific user.
+    """
+    verify_user_access(current_user, user_id)
+    
+    report = await generate_category_report(
+        user_id=user_id,
+        time_frame=time_frame,
+        start_date=start_date,
+        end_date=end_date
+    )
+    return report
+
+@router.get("/{user_id}/reports/summary", response_model=SummaryReport)
+async def get_summary_report(
+    user_id: str = Path(...),
+    time_frame: ReportTimeFrame = Query(ReportTimeFrame.DAILY),
+    start_date: date = Query(...),
+    end_date: Optional[date] = Query(None),
+    current_user=Depends(get_current_user)
+):
+    """
+    Generate the combined sales and revenue report for a specific user,
+    with payment method and order status breakdowns.
+    """
+    verify_user_access(current_user, user_id)
+    
+    report = await generate_summary_report(
+        user_id=user_id,
+        time_frame=time_frame,
+        start_date=start_date,
+        end_date=end_date
+    )
+    return report
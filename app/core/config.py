@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Restaurant Billing API"
     DEBUG: bool = True
+    DB_CALL_COUNT_HEADER: bool = False  # Send each request's MongoDB round trips in X-DB-Calls
     
     # CORS settings - will load from .env file
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
@@ -29,6 +30,36 @@ class Settings(BaseSettings):
     # File upload settings
     UPLOAD_DIR: str = "uploads"
     MAX_UPLOAD_SIZE: int = 5242880  # 5MB default
+    MENU_IMPORT_MAX_ROWS: int = 10000  # Rows accepted by one menu import
+    MENU_IMPORT_MAX_BYTES: int = 10485760  # Largest JSON array import, which is parsed whole; 10MB
+    IMAGE_VARIANT_WORKERS: int = 2  # Processes resizing menu images (needs Pillow); 0 disables
+    
+    # Order settings
+    ORDER_NUMBER_BLOCK_SIZE: int = 20  # Order numbers reserved per counter round trip
+    MENU_CACHE_TTL_SECONDS: int = 60  # How long other workers' menu writes can go unseen
+    MENU_CACHE_MISS_REFRESH_SECONDS: int = 5  # Shortest gap between reloads for unknown menu item IDs
+    ORDER_INSERT_BATCHING: bool = False  # Group-commit concurrent order inserts
+    ORDER_INSERT_BATCH_WINDOW_MS: int = 5  # Longest an insert waits for its batch
+    ORDER_INSERT_BATCH_MAX: int = 100  # Batch size that triggers an immediate flush
+    ORDER_ARCHIVE_AFTER_DAYS: int = 90  # Age at which delivered/cancelled orders are archived
+    ORDER_ARCHIVE_BUCKET_SIZE: int = 500  # Orders per compressed archive bucket
+    
+    # Live order feed settings
+    ORDER_EVENTS_SOURCE: str = "local"  # "local" (this worker's writes) or "change_stream"
+    ORDER_EVENTS_BUFFER_SIZE: int = 200  # Recent events kept per user for Last-Event-ID resume
+    ORDER_EVENTS_QUEUE_SIZE: int = 100  # Unsent events before a slow client is reset
+    ORDER_EVENTS_KEEPALIVE_SECONDS: int = 15
+    ORDER_EVENTS_TOKEN_EXPIRE_SECONDS: int = 300  # Lifetime of ?token= stream tokens for EventSource
+    
+    # Sync settings
+    SYNC_SETTLE_SECONDS: int = 2  # Recent writes left for the next sync while still in flight
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30  # Older watermarks get a full resync
+    
+    # Report settings
+    REPORT_ENGINE: str = "aggregation"  # "aggregation" (MongoDB pipeline), "rollups" or "python"
+    REPORT_CACHE_MAX_ENTRIES: int = 1024
+    REPORT_CACHE_TTL_SECONDS: int = 30  # For ranges that include today
+    REPORT_CACHE_CLOSED_TTL_SECONDS: int = 600  # For past ranges; bounds staleness from other workers' writes
     
     @property
     def allowed_origins_list(self) -> List[str]:
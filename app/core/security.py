@@ -67,10 +67,10 @@ async def create_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
     # Insert user into database
     result = await db.users.insert_one(user_data)
     
-    # Get the created user
-    created_user = await db.users.find_one({"_id": result.inserted_id})
+    # The inserted document is the user; no need to read it back
+    user_data["_id"] = result.inserted_id
     
-    return created_user
+    return user_data
 
 async def get_user_by_email(email: str) -> Optional[dict]:
     """
@@ -0,0 +1,93 @@
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+from typing import Callable, Dict, Any, List, Tuple, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class InsertBatcher:
+    """
+    Group-commits inserts that arrive close together.
+
+    Callers await insert() as they would insert_one(). Documents are held
+    for at most window_ms (or until max_batch are waiting) and then written
+    with a single unordered insert_many. Each caller gets its own _id back,
+    or the error for its own document.
+    """
+
+    def __init__(self, get_collection: Callable[[], Any], window_ms: float, max_batch: int):
+        self.get_collection = get_collection
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes = set()
+
+    async def insert(self, document: Dict[str, Any]) -> Any:
+        """
+        Insert a document as part of the next batch.
+
+        Returns:
+            The inserted _id
+
+        Raises:
+            DuplicateKeyError, WriteError: If this document was rejected
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((document, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._write(batch))
+        # Keep a reference so the write isn't garbage collected mid-flight
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        documents = [document for document, _ in batch]
+        write_errors = {}
+
+        try:
+            await self.get_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                write_errors[error["index"]] = error
+        except Exception as e:
+            logger.error(f"Batched insert of {len(batch)} documents failed: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for index, (document, future) in enumerate(batch):
+            if future.done():
+                continue
+            error = write_errors.get(index)
+            if error is None:
+                future.set_result(document["_id"])
+            elif error.get("code") == 11000:
+                future.set_exception(DuplicateKeyError(error.get("errmsg"), error.get("code"), error))
+            else:
+                future.set_exception(WriteError(error.get("errmsg"), error.get("code"), error))
+
+    async def drain(self) -> None:
+        """
+        Flush pending documents and wait for in-flight writes.
+        """
+        self._flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
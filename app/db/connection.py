@@ -2,6 +2,8 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 import logging
 from app.core.config import settings
+from app.db.monitoring import command_counter
+from app.db.indexes import apply_indexes
 import asyncio
 from typing import Optional
 
@@ -13,9 +15,20 @@ class Database:
     users = None
     menu_items = None
     orders = None
+    order_daily_rollups = None
+    order_counters = None
+    order_archive = None
+    deletions = None
+    image_refs = None
 
 db = Database()
 
+async def ensure_indexes():
+    """
+    Create the indexes registered in app.db.indexes. Safe to call repeatedly.
+    """
+    await apply_indexes(db.db)
+
 async def connect_to_mongo():
     """
     Connect to MongoDB with retry logic.
@@ -36,7 +49,8 @@ async def connect_to_mongo():
                 connectTimeoutMS=5000,
                 socketTimeoutMS=5000,
                 tlsAllowInvalidCertificates=True,  # Only use in development
-                retryWrites=True
+                retryWrites=True,
+                event_listeners=[command_counter]
             )
             
             # Initialize database and collections
@@ -44,10 +58,17 @@ async def connect_to_mongo():
             db.users = db.db.users
             db.menu_items = db.db.menu_items
             db.orders = db.db.orders
+            db.order_daily_rollups = db.db.order_daily_rollups
+            db.order_counters = db.db.order_counters
+            db.order_archive = db.db.order_archive
+            db.deletions = db.db.deletions
+            db.image_refs = db.db.image_refs
             
             # Ping the server to verify connection
             await db.client.admin.command('ping')
             logger.info(f"Connected to MongoDB successfully on attempt {attempt}")
+            
+            await ensure_indexes()
             return
             
         except (ConnectionFailure, ServerSelectionTimeoutError) as e:
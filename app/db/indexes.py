@@ -0,0 +1,121 @@
+from app.core.config import settings
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+from typing import Dict, Any, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IndexSpec:
+    """An index one or more service queries rely on."""
+
+    __slots__ = ("collection", "keys", "options")
+
+    def __init__(self, collection: str, keys: List[Tuple[str, int]], **options: Any):
+        self.collection = collection
+        self.keys = keys
+        self.options = options
+
+    @property
+    def name(self) -> str:
+        # Same default name MongoDB would pick
+        return self.options.get("name") or "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    def model(self) -> IndexModel:
+        return IndexModel(self.keys, **self.options)
+
+# Every index the services need. Add an entry here alongside any new query
+# shape; `python -m app.scripts.indexes verify` checks queries against it.
+INDEXES = [
+    # Login and token validation look users up by email
+    IndexSpec("users", [("email", 1)], unique=True),
+
+    # Menu import upserts by name; its user_id prefix also serves menu
+    # listing, the menu cache and item lookups
+    IndexSpec("menu_items", [("user_id", 1), ("name", 1)]),
+    # Menu delta sync
+    IndexSpec("menu_items", [("user_id", 1), ("updated_at", 1)]),
+
+    # Order lists, keyset pages, exports and report ranges
+    IndexSpec("orders", [("user_id", 1), ("created_at", -1), ("_id", -1)]),
+    # Order delta sync
+    IndexSpec("orders", [("user_id", 1), ("updated_at", 1)]),
+    # Idempotent order creation
+    IndexSpec(
+        "orders",
+        [("user_id", 1), ("idempotency_key", 1)],
+        unique=True,
+        partialFilterExpression={"idempotency_key": {"$type": "string"}}
+    ),
+    # Order numbers allocated from order_counters must never repeat;
+    # orders created before numbering was sequential are not covered
+    IndexSpec(
+        "orders",
+        [("user_id", 1), ("order_number", 1)],
+        unique=True,
+        partialFilterExpression={"order_seq": {"$exists": True}}
+    ),
+
+    # One rollup document per user and day
+    IndexSpec("order_daily_rollups", [("user_id", 1), ("day", 1)], unique=True),
+
+    # Archive buckets overlapping a range, newest first for order lists and
+    # oldest first for exports, and single archived orders by ID
+    IndexSpec("order_archive", [("user_id", 1), ("last_created_at", -1)]),
+    IndexSpec("order_archive", [("user_id", 1), ("first_created_at", 1)]),
+    IndexSpec("order_archive", [("user_id", 1), ("order_ids", 1)]),
+
+    # Tombstones read by delta sync, expired once no watermark can need them
+    IndexSpec("deletions", [("user_id", 1), ("collection", 1), ("deleted_at", 1)]),
+    IndexSpec(
+        "deletions",
+        [("deleted_at", 1)],
+        expireAfterSeconds=settings.SYNC_TOMBSTONE_RETENTION_DAYS * 86400
+    )
+]
+
+async def apply_indexes(database, indexes: List[IndexSpec] = INDEXES) -> List[str]:
+    """
+    Create the registered indexes. Existing indexes are left as they are,
+    so this is safe to run on every startup.
+
+    An index that can't be built (for example a unique index over existing
+    duplicates) is logged and skipped rather than stopping startup.
+
+    Args:
+        database: The Motor database
+        indexes: The index specs to apply
+
+    Returns:
+        List[str]: Names of the indexes that failed to build
+    """
+    failed = []
+    for spec in indexes:
+        try:
+            await database[spec.collection].create_indexes([spec.model()])
+        except OperationFailure as e:
+            logger.error(f"Could not create index {spec.collection}.{spec.name}: {str(e)}")
+            failed.append(f"{spec.collection}.{spec.name}")
+    return failed
+
+def find_collscans(explain: Any) -> List[Dict[str, Any]]:
+    """
+    Find the collection scans in the winning plan of an explain() result.
+
+    Args:
+        explain: The output of the explain command
+
+    Returns:
+        List[dict]: The COLLSCAN plan stages
+    """
+    scans = []
+    if isinstance(explain, dict):
+        if explain.get("stage") == "COLLSCAN":
+            scans.append(explain)
+        for key, value in explain.items():
+            if key != "rejectedPlans":
+                scans.extend(find_collscans(value))
+    elif isinstance(explain, list):
+        for value in explain:
+            scans.extend(find_collscans(value))
+    return scans
@@ -19,6 +19,7 @@ menu_item_model = {
     "description": str,
     "category": str,
     "image": Optional[str],
+    "image_variants": Optional[dict],  # Derivative name -> path, e.g. thumbnail, medium
     "is_vegetarian": bool,
     "is_available": bool,
     "created_at": datetime,
@@ -31,13 +31,15 @@ order_item_schema = {
     "name": str,
     "quantity": int,
     "price": float,
-    "subtotal": float
+    "subtotal": float,
+    "category": Optional[str]  # Menu category at the time of the order
 }
 
 # MongoDB document structure for Order
 order_model = {
     "user_id": str,
-    "order_number": str,
+    "order_number": str,  # YYYYMMDD-NNNN, unique per user
+    "order_seq": int,  # Sequence number within the day
     "customer_name": Optional[str],
     "customer_phone": Optional[str],
     "table_number": Optional[str],
@@ -0,0 +1,54 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from pymongo import monitoring
+
+class DatabaseCallCount:
+    """Number of database commands sent within a counting scope."""
+    __slots__ = ("count", "commands")
+    
+    def __init__(self):
+        self.count = 0
+        self.commands = []
+
+# The counter object is shared by reference, so commands issued from
+# Motor's executor threads (which run in a copy of the caller's context)
+# still land on the request's counter
+_current_count: ContextVar[Optional[DatabaseCallCount]] = ContextVar("db_call_count", default=None)
+
+class CommandCounter(monitoring.CommandListener):
+    """
+    Command listener that counts every command sent to MongoDB against the
+    active counting scope. Each command is one round trip.
+    """
+    
+    def started(self, event):
+        counter = _current_count.get()
+        if counter is not None:
+            counter.count += 1
+            counter.commands.append(event.command_name)
+    
+    def succeeded(self, event):
+        pass
+    
+    def failed(self, event):
+        pass
+
+command_counter = CommandCounter()
+
+@contextmanager
+def count_db_calls() -> Iterator[DatabaseCallCount]:
+    """
+    Count the database round trips made inside the block.
+    
+    Example:
+        with count_db_calls() as calls:
+            await update_menu_item(user_id, item_id, item_data)
+        assert calls.count == 1
+    """
+    counter = DatabaseCallCount()
+    token = _current_count.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_count.reset(token)
@@ -6,6 +6,10 @@ from app.api import api_router
 from app.core.config import settings
 from app.db.connection import connect_to_mongo, close_mongo_connection
 from app.middleware.db_middleware import DatabaseConnectionMiddleware
+from app.services.order_events import watch_order_changes
+from app.services.order_service import order_insert_batcher
+from app.utils.image_variants import shutdown_variant_pool
+import asyncio
 import logging
 import os
 
@@ -33,6 +37,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Add database connection middleware
@@ -53,9 +58,24 @@ async def startup_event():
     except Exception as e:
         logging.error(f"Failed to connect to MongoDB: {str(e)}")
         # The app will still start, but the middleware will handle DB-dependent requests
+    
+    # Feed the live order events from MongoDB when running several workers
+    if settings.ORDER_EVENTS_SOURCE == "change_stream":
+        app.state.order_change_stream = asyncio.create_task(watch_order_changes())
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    # Stop the order change stream
+    change_stream_task = getattr(app.state, "order_change_stream", None)
+    if change_stream_task:
+        change_stream_task.cancel()
+    
+    # Write any orders still waiting for their batch
+    await order_insert_batcher.drain()
+    
+    # Stop the image resizing processes
+    shutdown_variant_pool()
+    
     # Close database connection
     await close_mongo_connection()
 
@@ -1,13 +1,19 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
-from app.core.jwt import decode_access_token
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from app.core.jwt import create_access_token, decode_access_token
 from app.core.security import get_user_by_email
 from app.core.config import settings
 
 # Setup OAuth2 with token URL
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# Scope of the short-lived tokens event streams accept in the query string,
+# since a browser EventSource can't send an Authorization header
+STREAM_TOKEN_SCOPE = "stream"
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Get the current authenticated user from the JWT token.
@@ -21,6 +27,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     Raises:
         HTTPException: If the token is invalid or the user doesn't exist
     """
+    return await _user_from_token(token)
+
+async def _user_from_token(token: str, scope: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get the user a token was issued to, if the token has the given scope.
+    
+    Stream tokens travel in URLs and end up in logs, so they are only
+    accepted where the stream scope is asked for.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -32,7 +47,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         email: str = payload.get("sub")
         user_id: str = payload.get("user_id")
         
-        if email is None or user_id is None:
+        if email is None or user_id is None or payload.get("scope") != scope:
             raise credentials_exception
             
     except JWTError:
@@ -43,3 +58,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         raise credentials_exception
         
     return user
+
+def create_stream_token(user: Dict[str, Any]) -> str:
+    """
+    Create a token that only authenticates event streams, valid for
+    ORDER_EVENTS_TOKEN_EXPIRE_SECONDS.
+    """
+    return create_access_token(
+        data={"sub": user["email"], "user_id": str(user["_id"]), "scope": STREAM_TOKEN_SCOPE},
+        expires_delta=timedelta(seconds=settings.ORDER_EVENTS_TOKEN_EXPIRE_SECONDS)
+    )
+
+async def get_current_stream_user(request: Request, token: Optional[str] = Query(None)):
+    """
+    Get the current user of an event stream request.
+    
+    Accepts the usual Authorization header, or a stream token from
+    create_stream_token in the token query parameter for browser
+    EventSource clients.
+    
+    Raises:
+        HTTPException: If neither is present and valid
+    """
+    if token is not None:
+        return await _user_from_token(token, scope=STREAM_TOKEN_SCOPE)
+    return await _user_from_token(await oauth2_scheme(request))
@@ -2,6 +2,8 @@ from fastapi import FastAPI, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 import logging
 from app.db.connection import db
+from app.db.monitoring import count_db_calls
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +19,10 @@ class DatabaseConnectionMiddleware(BaseHTTPMiddleware):
         if request.url.path.endswith("/health") or request.url.path == "/":
             return await call_next(request)
         
+        # Uploaded files are served from disk alone
+        if request.url.path.startswith(f"{settings.API_V1_STR}/uploads/"):
+            return await call_next(request)
+        
         # Check if MongoDB connection is established
         if db.client is None or db.db is None:
             logger.error("Database connection not available")
@@ -26,9 +32,12 @@ class DatabaseConnectionMiddleware(BaseHTTPMiddleware):
                 media_type="application/json"
             )
         
-        # Continue with the request
+        # Continue with the request, counting its database round trips
         try:
-            response = await call_next(request)
+            with count_db_calls() as db_calls:
+                response = await call_next(request)
+            if settings.DB_CALL_COUNT_HEADER:
+                response.headers["X-DB-Calls"] = str(db_calls.count)
             return response
         except Exception as e:
             logger.error(f"Error processing request: {str(e)}")
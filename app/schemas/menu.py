@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
+from enum import Enum
 from app.db.models.menu import FoodCategory
 
 class MenuItemBase(BaseModel):
@@ -42,9 +43,37 @@ class MenuItem(MenuItemBase):
     id: str = Field(..., alias="_id")
     user_id: str
     image: Optional[str] = None
+    # Smaller copies of image by name (thumbnail, medium), once generated
+    image_variants: Optional[Dict[str, str]] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
         populate_by_name = True
+
+class MenuImportFormat(str, Enum):
+    """File formats accepted by the menu import."""
+    CSV = "csv"
+    JSON = "json"
+    NDJSON = "ndjson"
+
+class MenuImportError(BaseModel):
+    """A row of a menu import that was not applied."""
+    row: int  # 1-based, not counting the CSV header
+    name: Optional[str] = None
+    error: str
+
+class MenuImportResult(BaseModel):
+    """Schema for menu import response."""
+    created: int
+    updated: int
+    failed: int
+    errors: List[MenuImportError]
+
+class MenuChanges(BaseModel):
+    """Schema for an incremental menu sync."""
+    changed: List[MenuItem]
+    deleted: List[str]  # IDs of menu items deleted since the watermark
+    watermark: datetime  # Send as `since` on the next sync
+    full: bool  # True if changed holds the whole menu and the client should replace its copy
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from datetime import datetime
+from enum import Enum
 from app.db.models.order import OrderStatus, PaymentStatus, PaymentMethod
 
 class OrderItemBase(BaseModel):
@@ -29,6 +30,7 @@ class OrderItemBase(BaseModel):
 class OrderItem(OrderItemBase):
     """Schema for order item."""
     subtotal: float
+    category: Optional[str] = None
 
 class OrderBase(BaseModel):
     """Base schema for orders."""
@@ -39,6 +41,9 @@ class OrderCreate(OrderBase):
     """Schema for creating a new order."""
     items: List[OrderItemBase]
     payment_method: PaymentMethod = PaymentMethod.CASH
+    customer_name: Optional[str] = None
+    customer_phone: Optional[str] = None
+    idempotency_key: Optional[str] = None  # Client-generated, makes replays safe
     
     @validator('items')
     def items_not_empty(cls, v):
@@ -46,6 +51,33 @@ class OrderCreate(OrderBase):
             raise ValueError('Order must have at least one item')
         return v
 
+class OrderBulkCreate(BaseModel):
+    """Schema for creating many orders at once."""
+    orders: List[OrderCreate]
+    
+    @validator('orders')
+    def orders_within_limit(cls, v):
+        if not v:
+            raise ValueError('At least one order is required')
+        if len(v) > 500:
+            raise ValueError('At most 500 orders can be created at once')
+        return v
+
+class OrderBulkResult(BaseModel):
+    """Outcome of one order in a bulk create."""
+    index: int
+    status: str  # created, duplicate or failed
+    order_id: Optional[str] = None
+    order_number: Optional[str] = None
+    error: Optional[str] = None
+
+class OrderBulkResponse(BaseModel):
+    """Schema for bulk create response."""
+    created: int
+    duplicates: int
+    failed: int
+    results: List[OrderBulkResult]
+
 class OrderUpdate(BaseModel):
     """Schema for updating an order."""
     table_number: Optional[str] = None
@@ -73,3 +105,28 @@ class Order(OrderBase):
     class Config:
         from_attributes = True
         populate_by_name = True
+
+class OrderChanges(BaseModel):
+    """Schema for an incremental order sync."""
+    changed: List[Order]
+    deleted: List[str]  # IDs of orders deleted since the watermark
+    watermark: datetime  # Send as `since` on the next sync
+    full: bool  # True if changed holds every order and the client should replace its copy
+
+class OrderSummary(BaseModel):
+    """Slim schema for order list views."""
+    id: str = Field(..., alias="_id")
+    order_number: str
+    table_number: Optional[str] = None
+    total: float
+    status: OrderStatus
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+class OrderExportFormat(str, Enum):
+    """File formats for order exports."""
+    CSV = "csv"
+    NDJSON = "ndjson"
@@ -57,3 +57,31 @@ class CategorySalesReport(BaseModel):
     start_date: date
     end_date: date
     data: List[CategorySalesData]
+
+class PaymentMethodSummary(BaseModel):
+    """Orders and net amount for one payment method."""
+    payment_method: str
+    orders_count: int
+    net_amount: float
+
+class OrderStatusSummary(BaseModel):
+    """Orders and net amount for one order status."""
+    status: str
+    orders_count: int
+    net_amount: float
+
+class SummaryReport(BaseModel):
+    """Schema for the combined sales and revenue report."""
+    time_frame: ReportTimeFrame
+    start_date: date
+    end_date: date
+    total_orders: int
+    total_items_sold: int
+    total_revenue: float
+    total_tax: float
+    total_discount: float
+    total_net_amount: float
+    sales: List[SalesDataPoint]
+    revenue: List[RevenueDataPoint]
+    payment_methods: List[PaymentMethodSummary]
+    statuses: List[OrderStatusSummary]
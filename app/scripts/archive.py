@@ -0,0 +1,44 @@
+"""
+Move delivered and cancelled orders older than ORDER_ARCHIVE_AFTER_DAYS
+into the compressed order archive.
+
+Usage:
+    python -m app.scripts.archive [--user-id BZU123456]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from app.db.connection import db, connect_to_mongo, close_mongo_connection
+from app.services.archive_service import archive_orders
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger(__name__)
+
+async def run(user_id: str = None) -> int:
+    await connect_to_mongo()
+    if db.client is None or db.orders is None:
+        logger.error("Database connection not available")
+        return 2
+
+    try:
+        result = await archive_orders(user_id)
+        if result["backfilled"]:
+            logger.info(f"Added per-day totals to {result['backfilled']} older bucket(s)")
+        logger.info(f"Archived {result['archived']} order(s) into {result['buckets']} bucket(s)")
+        return 0
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive closed orders")
+    parser.add_argument("--user-id", default=None, help="Only archive this user's orders")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.user_id)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Create the registered indexes, or check that every service query is
+served by one.
+
+Usage:
+    python -m app.scripts.indexes apply
+    python -m app.scripts.indexes verify
+
+verify runs explain() on each query shape the services issue and exits
+with status 1 if any of them would scan a whole collection. Run it against
+a test database after adding a query or changing the index registry;
+tests/test_indexes.py runs it when MONGODB_URI is set.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, date, timedelta
+from bson import ObjectId
+from app.db.connection import db, connect_to_mongo, close_mongo_connection
+from app.db.indexes import apply_indexes, find_collscans
+from app.schemas.report import ReportTimeFrame
+from app.services.order_service import build_order_query, build_idempotency_keys_query
+from app.services.sync_service import build_changes_query, build_tombstones_query, SYNC_ORDERS, SYNC_MENU_ITEMS
+from app.services.report_service import build_bucket_pipeline, build_category_pipeline, build_summary_pipeline
+from app.services.archive_service import ARCHIVABLE_STATUSES, archive_cutoff, archived_days_pipeline
+from app.utils.pagination import after_cursor_filter
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger(__name__)
+
+def service_queries():
+    """
+    Build every query shape the services run, from the same query builders
+    the services call. A service query added without a builder here is not
+    verified, so add it alongside the query.
+
+    Returns:
+        List[tuple]: (name, collection, explain command body)
+    """
+    user_id = "BZU000000"
+    object_id = ObjectId()
+    now = datetime.utcnow()
+    start = now - timedelta(days=30)
+    filtered = build_order_query(user_id, {
+        "status": "pending",
+        "start_date": date.today() - timedelta(days=7),
+        "end_date": date.today()
+    })
+    page = {**build_order_query(user_id), **after_cursor_filter(now, object_id)}
+    filtered_page = {**filtered, **after_cursor_filter(now, object_id)}
+
+    def find(collection, query, sort=None):
+        body = {"find": collection, "filter": query}
+        if sort:
+            body["sort"] = sort
+        return body
+
+    def aggregate(collection, pipeline):
+        return {"aggregate": collection, "pipeline": pipeline, "cursor": {}}
+
+    return [
+        ("users by email", "users", find("users", {"email": "someone@example.com"})),
+        ("users by id", "users", find("users", {"_id": object_id})),
+        ("menu items", "menu_items", find("menu_items", {"user_id": user_id})),
+        ("menu item", "menu_items", find("menu_items", {"_id": object_id, "user_id": user_id})),
+        ("menu item by name", "menu_items", find("menu_items", {"user_id": user_id, "name": "Paneer Tikka"})),
+        ("menu changes", "menu_items", find(
+            "menu_items", build_changes_query(user_id, start, now), {"updated_at": 1}
+        )),
+        ("menu full resync", "menu_items", find(
+            "menu_items", build_changes_query(user_id), {"updated_at": 1}
+        )),
+        ("orders", "orders", find("orders", build_order_query(user_id), {"created_at": -1})),
+        ("orders filtered", "orders", find("orders", filtered, {"created_at": -1})),
+        ("orders page", "orders", find("orders", page, {"created_at": -1, "_id": -1})),
+        ("orders filtered page", "orders", find("orders", filtered_page, {"created_at": -1, "_id": -1})),
+        ("order", "orders", find("orders", {"_id": object_id, "user_id": user_id})),
+        ("order changes", "orders", find(
+            "orders", build_changes_query(user_id, start, now), {"updated_at": 1}
+        )),
+        ("orders full resync", "orders", find("orders", build_changes_query(user_id), {"updated_at": 1})),
+        ("order by idempotency key", "orders", find("orders", {"user_id": user_id, "idempotency_key": "key"})),
+        ("orders by idempotency keys", "orders", find(
+            "orders", build_idempotency_keys_query(user_id, ["key-1", "key-2"])
+        )),
+        ("orders to archive", "orders", find(
+            "orders",
+            {"status": {"$in": ARCHIVABLE_STATUSES}, "created_at": {"$lt": archive_cutoff()}},
+            {"user_id": 1, "created_at": -1, "_id": -1}
+        )),
+        ("report buckets", "orders", aggregate(
+            "orders", build_bucket_pipeline(user_id, ReportTimeFrame.DAILY, start, now)
+        )),
+        ("category report", "orders", aggregate("orders", build_category_pipeline(user_id, start, now))),
+        ("summary report", "orders", aggregate(
+            "orders", build_summary_pipeline(user_id, ReportTimeFrame.DAILY, start, now)
+        )),
+        ("daily rollups", "order_daily_rollups", find(
+            "order_daily_rollups",
+            {"user_id": user_id, "day": {"$gte": start, "$lte": now}, "orders_count": {"$gt": 0}},
+            {"day": 1}
+        )),
+        ("order counter", "order_counters", find("order_counters", {"_id": f"{user_id}:20240101"})),
+        ("archive buckets", "order_archive", find(
+            "order_archive",
+            {"user_id": user_id, "last_created_at": {"$gte": start}, "first_created_at": {"$lte": now}},
+            {"last_created_at": -1}
+        )),
+        ("archive export buckets", "order_archive", find(
+            "order_archive",
+            {"user_id": user_id, "last_created_at": {"$gte": start}, "first_created_at": {"$lte": now}},
+            {"first_created_at": 1}
+        )),
+        ("archived report days", "order_archive", aggregate(
+            "order_archive", archived_days_pipeline(user_id, start, now)
+        )),
+        ("archived order", "order_archive", find("order_archive", {"user_id": user_id, "order_ids": object_id})),
+        ("order tombstones", "deletions", find(
+            "deletions", build_tombstones_query(user_id, SYNC_ORDERS, start, now)
+        )),
+        ("menu tombstones", "deletions", find(
+            "deletions", build_tombstones_query(user_id, SYNC_MENU_ITEMS, start, now)
+        ))
+    ]
+
+async def verify() -> int:
+    scans = 0
+    for name, collection, body in service_queries():
+        explain = await db.db.command("explain", body, verbosity="queryPlanner")
+        if find_collscans(explain):
+            scans += 1
+            logger.error(f"COLLSCAN: {name} on {collection}")
+        else:
+            logger.info(f"ok: {name}")
+    logger.info(f"{scans} query shape(s) scan a whole collection")
+    return 1 if scans else 0
+
+async def run(command: str) -> int:
+    await connect_to_mongo()
+    if db.client is None or db.db is None:
+        logger.error("Database connection not available")
+        return 2
+
+    try:
+        if command == "apply":
+            # connect_to_mongo already applied the registry; this reports what failed
+            failed = await apply_indexes(db.db)
+            return 1 if failed else 0
+        return await verify()
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or verify the MongoDB index registry")
+    parser.add_argument("command", choices=["apply", "verify"])
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.command)))
+
+if __name__ == "__main__":
+    main()
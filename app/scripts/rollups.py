@@ -0,0 +1,52 @@
+"""
+Rebuild or verify the daily order rollups used by reports.
+
+Usage:
+    python -m app.scripts.rollups verify [--user-id BZU123456]
+    python -m app.scripts.rollups rebuild [--user-id BZU123456]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from app.db.connection import db, connect_to_mongo, close_mongo_connection
+from app.services.rollup_service import verify_rollups, rebuild_rollups
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger(__name__)
+
+async def run(command: str, user_id: str = None) -> int:
+    await connect_to_mongo()
+    if db.client is None or db.orders is None:
+        logger.error("Database connection not available")
+        return 2
+    
+    try:
+        if command == "rebuild":
+            result = await rebuild_rollups(user_id)
+            logger.info(f"Rebuilt rollups: {result['written']} written, {result['removed']} removed")
+        
+        drift = await verify_rollups(user_id)
+        for entry in drift:
+            logger.warning(
+                f"Drift for {entry['user_id']} on {entry['day'].date()}: "
+                f"expected {entry['expected']}, found {entry['actual']}"
+            )
+        logger.info(f"{len(drift)} drifted rollup day(s)")
+        return 1 if drift else 0
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or verify daily order rollups")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--user-id", default=None, help="Only process this user's orders")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.command, args.user_id)))
+
+if __name__ == "__main__":
+    main()
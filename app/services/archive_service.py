@@ -0,0 +1,373 @@
+from app.db.connection import db
+from app.core.config import settings
+from app.schemas.order import OrderStatus
+from app.services.rollup_service import ROLLUP_FIELDS, order_day, order_rollup_values
+from bson import Binary, ObjectId, decode, encode
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+import heapq
+import zlib
+
+# Orders in these states no longer change and can move to the archive
+ARCHIVABLE_STATUSES = [OrderStatus.DELIVERED.value, OrderStatus.CANCELLED.value]
+
+def archive_cutoff(now: Optional[datetime] = None) -> datetime:
+    """
+    Get the created_at before which closed orders are archived.
+    """
+    return (now or datetime.utcnow()) - timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS)
+
+def reaches_archive(start_datetime: Optional[datetime]) -> bool:
+    """
+    Check whether a query range starting at start_datetime can include
+    archived orders.
+
+    Only orders older than the archive cutoff are ever archived, so ranges
+    that start after it are served from the orders collection alone.
+    """
+    return start_datetime is None or start_datetime < archive_cutoff()
+
+def _month(created_at: datetime) -> datetime:
+    return datetime(created_at.year, created_at.month, 1)
+
+def compress_orders(orders: List[Dict[str, Any]]) -> Binary:
+    """
+    Pack orders into a compressed BSON blob.
+    """
+    return Binary(zlib.compress(encode({"orders": orders})))
+
+def decompress_orders(blob: bytes) -> List[Dict[str, Any]]:
+    """
+    Unpack orders packed by compress_orders.
+    """
+    return decode(zlib.decompress(blob))["orders"]
+
+def _add_breakdown(entries: Dict[Any, Dict[str, Any]], field: str, key: Any, totals: Dict[str, Any]) -> None:
+    entry = entries.get(key)
+    if entry is None:
+        entry = entries[key] = {field: key, **{name: 0 for name in totals}}
+    for name, value in totals.items():
+        entry[name] += value
+
+def summarize_days(orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Pre-aggregate orders per day for the uncompressed days field of a bucket.
+
+    Each day holds the rollup counters and the first order time, plus item
+    totals per category and order totals per payment method and status, so
+    reports can $unwind and $group the days instead of decompressing the
+    orders. Categories are stored as found on the items, None included.
+
+    Returns:
+        List[dict]: One entry per day with orders, sorted by day
+    """
+    days = {}
+    for order in orders:
+        day = order_day(order["created_at"])
+        entry = days.get(day)
+        if entry is None:
+            entry = days[day] = {
+                "day": day,
+                **{field: 0 for field in ROLLUP_FIELDS},
+                "first_order_at": order["created_at"],
+                "categories": {},
+                "payment_methods": {},
+                "statuses": {}
+            }
+        for field, value in order_rollup_values(order).items():
+            entry[field] += value
+        entry["first_order_at"] = min(entry["first_order_at"], order["created_at"])
+
+        for item in order["items"]:
+            _add_breakdown(entry["categories"], "category", item.get("category"), {
+                "items_sold": item["quantity"],
+                "revenue": item["subtotal"]
+            })
+        order_totals = {"orders_count": 1, "net_amount": order["total"]}
+        _add_breakdown(entry["payment_methods"], "payment_method", order.get("payment_method"), order_totals)
+        _add_breakdown(entry["statuses"], "status", order.get("status"), order_totals)
+
+    summary = []
+    for day in sorted(days):
+        entry = days[day]
+        for breakdown in ("categories", "payment_methods", "statuses"):
+            entry[breakdown] = list(entry[breakdown].values())
+        summary.append(entry)
+    return summary
+
+def build_archive_bucket(user_id: str, orders: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build an archive bucket document for orders of one user and month.
+
+    The orders are stored compressed; the bucket keeps their IDs, time span
+    and per-day totals uncompressed so lookups can find the right buckets by
+    index and reports never have to unpack them.
+    """
+    orders = sorted(orders, key=lambda order: (order["created_at"], order["_id"]))
+    return {
+        "user_id": user_id,
+        "month": _month(orders[0]["created_at"]),
+        "first_created_at": orders[0]["created_at"],
+        "last_created_at": orders[-1]["created_at"],
+        "count": len(orders),
+        "order_ids": [order["_id"] for order in orders],
+        "days": summarize_days(orders),
+        "orders": compress_orders(orders),
+        "archived_at": datetime.utcnow()
+    }
+
+def archived_days_pipeline(user_id: str, start_datetime: datetime, end_datetime: datetime) -> List[Dict[str, Any]]:
+    """
+    Build the aggregation stages that emit the per-day totals of a user's
+    archive buckets, one document per day in a range.
+
+    The range is compared against the day (midnight) of each entry, so it
+    should cover whole days like the report ranges do.
+    """
+    return [
+        {"$match": {
+            "user_id": user_id,
+            "first_created_at": {"$lte": end_datetime},
+            "last_created_at": {"$gte": start_datetime}
+        }},
+        {"$unwind": "$days"},
+        {"$replaceRoot": {"newRoot": "$days"}},
+        {"$match": {"day": {"$gte": start_datetime, "$lte": end_datetime}}}
+    ]
+
+def _matches(order: Dict[str, Any], status: Optional[str], start_datetime: Optional[datetime], end_datetime: Optional[datetime]) -> bool:
+    if status is not None and order["status"] != status:
+        return False
+    if start_datetime is not None and order["created_at"] < start_datetime:
+        return False
+    if end_datetime is not None and order["created_at"] > end_datetime:
+        return False
+    return True
+
+def _sort_key(order: Dict[str, Any]) -> Tuple[datetime, ObjectId]:
+    return order["created_at"], order["_id"]
+
+async def get_archived_orders(
+    user_id: str,
+    start_datetime: Optional[datetime] = None,
+    end_datetime: Optional[datetime] = None,
+    status: Optional[str] = None,
+    before: Optional[Tuple[datetime, ObjectId]] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Get a user's archived orders.
+
+    Only buckets whose time span overlaps the range are read and
+    decompressed. With a limit, buckets are read newest first and reading
+    stops once no older bucket can contribute to the result.
+
+    Args:
+        user_id: The user's ID
+        start_datetime: Inclusive lower bound on created_at (optional)
+        end_datetime: Inclusive upper bound on created_at (optional)
+        status: Only orders with this status (optional)
+        before: Only orders sorting before this (created_at, _id) (optional)
+        limit: Maximum number of orders to return (optional)
+
+    Returns:
+        List[dict]: The orders, newest first
+    """
+    if db.order_archive is None:
+        return []
+
+    query = {"user_id": user_id}
+    if start_datetime is not None:
+        query["last_created_at"] = {"$gte": start_datetime}
+    upper = end_datetime
+    if before is not None and (upper is None or before[0] < upper):
+        upper = before[0]
+    if upper is not None:
+        query["first_created_at"] = {"$lte": upper}
+
+    orders = []
+    cursor = db.order_archive.find(query).sort("last_created_at", -1)
+    async for bucket in cursor:
+        if limit is not None and len(orders) >= limit:
+            # Buckets can overlap, so stop only once this one is entirely
+            # older than everything already collected
+            orders.sort(key=_sort_key, reverse=True)
+            orders = orders[:limit]
+            if bucket["last_created_at"] < orders[-1]["created_at"]:
+                break
+
+        for order in decompress_orders(bucket["orders"]):
+            if not _matches(order, status, start_datetime, end_datetime):
+                continue
+            if before is not None and _sort_key(order) >= before:
+                continue
+            orders.append(order)
+
+    orders.sort(key=_sort_key, reverse=True)
+    return orders[:limit] if limit is not None else orders
+
+async def iter_archived_orders(
+    user_id: str,
+    start_datetime: Optional[datetime] = None,
+    end_datetime: Optional[datetime] = None,
+    status: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a user's archived orders, oldest first.
+
+    Buckets are read in first_created_at order and decompressed one at a
+    time, only when the stream reaches their time span; buckets whose spans
+    overlap are open together and merged.
+
+    Args:
+        user_id: The user's ID
+        start_datetime: Inclusive lower bound on created_at (optional)
+        end_datetime: Inclusive upper bound on created_at (optional)
+        status: Only orders with this status (optional)
+
+    Yields:
+        dict: The orders, oldest first
+    """
+    if db.order_archive is None:
+        return
+
+    query = {"user_id": user_id}
+    if start_datetime is not None:
+        query["last_created_at"] = {"$gte": start_datetime}
+    if end_datetime is not None:
+        query["first_created_at"] = {"$lte": end_datetime}
+
+    # Orders of the open buckets, as (created_at, _id, order)
+    pending = []
+    cursor = db.order_archive.find(query).sort("first_created_at", 1).batch_size(1)
+    buckets = cursor.__aiter__()
+    next_bucket = await anext(buckets, None)
+    while next_bucket is not None or pending:
+        # Open every bucket that starts before the oldest pending order
+        while next_bucket is not None and (not pending or next_bucket["first_created_at"] <= pending[0][0]):
+            for order in decompress_orders(next_bucket["orders"]):
+                if _matches(order, status, start_datetime, end_datetime):
+                    heapq.heappush(pending, (*_sort_key(order), order))
+            next_bucket = await anext(buckets, None)
+        if pending:
+            yield heapq.heappop(pending)[2]
+
+async def get_archived_order(user_id: str, order_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """
+    Get a single archived order.
+
+    Args:
+        user_id: The user's ID
+        order_id: The order's ID
+
+    Returns:
+        dict: The order if it is archived, None otherwise
+    """
+    if db.order_archive is None:
+        return None
+
+    bucket = await db.order_archive.find_one({"user_id": user_id, "order_ids": order_id})
+    if bucket is None:
+        return None
+    for order in decompress_orders(bucket["orders"]):
+        if order["_id"] == order_id:
+            return order
+    return None
+
+async def _archive_chunk(user_id: str, orders: List[Dict[str, Any]]) -> int:
+    """
+    Move one bucket's worth of orders to the archive.
+
+    The bucket is written before the orders are deleted, so an interrupted
+    run never loses orders; orders a previous run already archived are
+    skipped and only deleted.
+
+    Returns:
+        int: Number of orders written to the archive
+    """
+    order_ids = [order["_id"] for order in orders]
+
+    already_archived = set()
+    async for bucket in db.order_archive.find(
+        {"user_id": user_id, "order_ids": {"$in": order_ids}},
+        {"order_ids": 1}
+    ):
+        already_archived.update(bucket["order_ids"])
+
+    fresh_orders = [order for order in orders if order["_id"] not in already_archived]
+    if fresh_orders:
+        await db.order_archive.insert_one(build_archive_bucket(user_id, fresh_orders))
+
+    await db.orders.delete_many({"_id": {"$in": order_ids}, "user_id": user_id})
+    return len(fresh_orders)
+
+async def backfill_bucket_days(user_id: Optional[str] = None) -> int:
+    """
+    Add the per-day totals to buckets archived before they were stored.
+
+    Args:
+        user_id: Restrict to a single user (optional)
+
+    Returns:
+        int: Number of buckets updated
+    """
+    query = {"days": {"$exists": False}}
+    if user_id:
+        query["user_id"] = user_id
+
+    updated = 0
+    async for bucket in db.order_archive.find(query, {"orders": 1}):
+        days = summarize_days(decompress_orders(bucket["orders"]))
+        await db.order_archive.update_one({"_id": bucket["_id"]}, {"$set": {"days": days}})
+        updated += 1
+    return updated
+
+async def archive_orders(user_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    Move delivered and cancelled orders older than ORDER_ARCHIVE_AFTER_DAYS
+    from the orders collection to the archive.
+
+    Orders are grouped into one or more compressed buckets per user and
+    month, with at most ORDER_ARCHIVE_BUCKET_SIZE orders each. Daily
+    rollups are left untouched because the orders still count towards
+    reports. Older buckets without per-day totals are backfilled first.
+
+    Args:
+        user_id: Restrict to a single user (optional)
+
+    Returns:
+        dict: Number of orders archived, buckets written and buckets
+        backfilled
+    """
+    backfilled = await backfill_bucket_days(user_id)
+
+    query = {
+        "status": {"$in": ARCHIVABLE_STATUSES},
+        "created_at": {"$lt": archive_cutoff()}
+    }
+    if user_id:
+        query["user_id"] = user_id
+
+    archived = 0
+    buckets = 0
+    chunk = []
+    chunk_key = None
+
+    # Walk the (user_id, created_at, _id) index so each user's months are contiguous
+    cursor = db.orders.find(query).sort([("user_id", 1), ("created_at", -1), ("_id", -1)])
+    async for order in cursor:
+        key = (order["user_id"], _month(order["created_at"]))
+        if chunk and (key != chunk_key or len(chunk) >= settings.ORDER_ARCHIVE_BUCKET_SIZE):
+            written = await _archive_chunk(chunk_key[0], chunk)
+            archived += written
+            buckets += 1 if written else 0
+            chunk = []
+        chunk_key = key
+        chunk.append(order)
+
+    if chunk:
+        written = await _archive_chunk(chunk_key[0], chunk)
+        archived += written
+        buckets += 1 if written else 0
+
+    return {"archived": archived, "buckets": buckets, "backfilled": backfilled}
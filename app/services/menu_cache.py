@@ -0,0 +1,136 @@
+from app.db.connection import db
+from app.core.config import settings
+from app.services.menu_search import MenuSearchIndex
+from app.utils.etag import make_etag
+from typing import Optional, Dict, Any
+import json
+import time
+
+class MenuSnapshot:
+    """A user's full menu at one point in time, keyed by menu item ID."""
+
+    __slots__ = ("version", "items", "loaded_at", "_etag", "_search_index")
+
+    def __init__(self, version: int, items: Dict[str, Dict[str, Any]], loaded_at: float):
+        self.version = version
+        self.items = items
+        self.loaded_at = loaded_at
+        self._etag = None
+        self._search_index = None
+
+    @property
+    def etag(self) -> str:
+        """
+        ETag of the menu's content, the same on every worker that loaded
+        the same menu. Computed on first use.
+        """
+        if self._etag is None:
+            content = json.dumps(list(self.items.values()), sort_keys=True, default=str)
+            self._etag = make_etag(content)
+        return self._etag
+
+    @property
+    def search_index(self) -> MenuSearchIndex:
+        """
+        Name search index over the items. Built on first use and then kept
+        up to date by put() and discard().
+        """
+        if self._search_index is None:
+            self._search_index = MenuSearchIndex(
+                (item_id, item.get("name", "")) for item_id, item in self.items.items()
+            )
+        return self._search_index
+
+    def put(self, version: int, item: Dict[str, Any]) -> None:
+        item_id = str(item["_id"])
+        self.items[item_id] = item
+        if self._search_index is not None:
+            self._search_index.add(item_id, item.get("name", ""))
+        self.version = version
+        self._etag = None
+
+    def discard(self, version: int, item_id: str) -> None:
+        self.items.pop(item_id, None)
+        if self._search_index is not None:
+            self._search_index.remove(item_id)
+        self.version = version
+        self._etag = None
+
+class MenuCache:
+    """
+    Per-user in-memory menu snapshots.
+
+    Every menu write in this process bumps the user's version and either
+    applies the written item to the snapshot or drops the snapshot, and a
+    snapshot loaded concurrently with a write is discarded instead of being
+    stored. Writes made by other workers are picked up when the snapshot's
+    TTL runs out.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: Dict[str, MenuSnapshot] = {}
+        self._versions: Dict[str, int] = {}
+
+    def version(self, user_id: str) -> int:
+        return self._versions.get(user_id, 0)
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Drop a user's snapshot after a menu write.
+        """
+        self._versions[user_id] = self.version(user_id) + 1
+        self._snapshots.pop(user_id, None)
+
+    def apply(self, user_id: str, item: Dict[str, Any]) -> None:
+        """
+        Store a created or updated menu item in the user's snapshot, keeping
+        its search index current without a reload.
+        """
+        self._versions[user_id] = self.version(user_id) + 1
+        snapshot = self._snapshots.get(user_id)
+        if snapshot is not None:
+            snapshot.put(self._versions[user_id], item)
+
+    def remove(self, user_id: str, item_id: str) -> None:
+        """
+        Drop a deleted menu item from the user's snapshot.
+        """
+        self._versions[user_id] = self.version(user_id) + 1
+        snapshot = self._snapshots.get(user_id)
+        if snapshot is not None:
+            snapshot.discard(self._versions[user_id], item_id)
+
+    def _fresh(self, snapshot: Optional[MenuSnapshot], max_age: float) -> bool:
+        return snapshot is not None and time.monotonic() - snapshot.loaded_at < max_age
+
+    async def get(self, user_id: str, max_age: Optional[float] = None) -> MenuSnapshot:
+        """
+        Get a user's menu snapshot, loading it with one query if needed.
+
+        Args:
+            user_id: The user's ID
+            max_age: Reload if the cached snapshot is older than this many
+                seconds (defaults to the TTL)
+
+        Returns:
+            MenuSnapshot: The snapshot
+        """
+        snapshot = self._snapshots.get(user_id)
+        if self._fresh(snapshot, self.ttl_seconds if max_age is None else max_age):
+            return snapshot
+
+        version = self.version(user_id)
+        items = {}
+        if db.menu_items is not None:
+            async for item in db.menu_items.find({"user_id": user_id}):
+                items[str(item["_id"])] = item
+
+        snapshot = MenuSnapshot(version, items, time.monotonic())
+        # Don't keep a snapshot that raced with a write
+        if version == self.version(user_id):
+            self._snapshots[user_id] = snapshot
+        return snapshot
+
+# Shared menu cache
+menu_cache = MenuCache(ttl_seconds=settings.MENU_CACHE_TTL_SECONDS)
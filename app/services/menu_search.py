@@ -0,0 +1,115 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Set, Tuple
+
+def normalize_name(name: str) -> str:
+    """
+    Lowercase a name and collapse its whitespace for matching.
+    """
+    return " ".join(name.lower().split())
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _word_prefixes(text: str) -> Set[str]:
+    return {word[:length] for word in text.split() for length in (1, 2)}
+
+class MenuSearchIndex:
+    """
+    Name index over one user's menu items.
+
+    Queries of three or more characters match anywhere in a name and only
+    check the items that share all of the query's trigrams. Shorter
+    queries match the start of a word, looked up directly. Items are added
+    and removed one at a time, so the index follows menu writes without
+    being rebuilt.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, str]] = ()):
+        """
+        Args:
+            items: (item ID, name) pairs with unique IDs
+        """
+        # item ID -> normalized name
+        self._names: Dict[str, str] = {}
+        # (normalized name, item ID), kept sorted for ordered results
+        self._sorted: List[Tuple[str, str]] = []
+        # trigram or one/two-letter word prefix -> IDs of matching items
+        self._postings: Dict[str, Set[str]] = {}
+        for item_id, name in items:
+            self._index(item_id, normalize_name(name))
+        self._sorted = sorted((name, item_id) for item_id, name in self._names.items())
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _keys(self, normalized: str) -> Set[str]:
+        return _trigrams(normalized) | _word_prefixes(normalized)
+
+    def add(self, item_id: str, name: str) -> None:
+        """
+        Index an item's name, replacing its previous name if indexed.
+        """
+        self.remove(item_id)
+        normalized = normalize_name(name)
+        self._index(item_id, normalized)
+        insort(self._sorted, (normalized, item_id))
+
+    def _index(self, item_id: str, normalized: str) -> None:
+        self._names[item_id] = normalized
+        for key in self._keys(normalized):
+            self._postings.setdefault(key, set()).add(item_id)
+
+    def remove(self, item_id: str) -> None:
+        """
+        Drop an item from the index, if present.
+        """
+        normalized = self._names.pop(item_id, None)
+        if normalized is None:
+            return
+        del self._sorted[bisect_left(self._sorted, (normalized, item_id))]
+        for key in self._keys(normalized):
+            postings = self._postings.get(key)
+            if postings is None:
+                continue
+            postings.discard(item_id)
+            if not postings:
+                del self._postings[key]
+
+    def search(self, query: str) -> List[str]:
+        """
+        Find the items whose name matches the query.
+
+        Returns:
+            List[str]: Item IDs; names starting with the query come first,
+            then names with a word starting with it, then other matches,
+            each group in alphabetical order
+        """
+        query = normalize_name(query)
+        if not query:
+            return [item_id for _, item_id in self._sorted]
+
+        if len(query) < 3:
+            candidates = self._postings.get(query, set())
+        else:
+            # Intersect the smallest posting lists first
+            postings = sorted((self._postings.get(trigram, set()) for trigram in _trigrams(query)), key=len)
+            candidates = set.intersection(*postings) if postings[0] else set()
+        if not candidates:
+            return []
+
+        # Sort a few candidates, or filter the presorted names for many
+        if len(candidates) * 8 < len(self._sorted):
+            ordered = sorted((self._names[item_id], item_id) for item_id in candidates)
+        else:
+            ordered = [entry for entry in self._sorted if entry[1] in candidates]
+
+        word_query = " " + query
+        ranked = ([], [], [])
+        for name, item_id in ordered:
+            if name.startswith(query):
+                ranked[0].append(item_id)
+            elif word_query in name:
+                ranked[1].append(item_id)
+            elif query in name:
+                ranked[2].append(item_id)
+        return ranked[0] + ranked[1] + ranked[2]
@@ -1,11 +1,29 @@
 from app.db.connection import db
+from app.core.config import settings
+from app.utils.etag import make_etag
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from pydantic import ValidationError
 from app.schemas.menu import MenuItemCreate, MenuItemUpdate
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Set
 from app.utils.image_upload import save_upload_file, delete_file
-from fastapi import UploadFile
+from app.utils.image_variants import generate_variants, remove_variants
+from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pathlib import Path
 from app.db.models.menu import FoodCategory
+from app.services.menu_cache import menu_cache, MenuSnapshot
+from app.services.sync_service import record_deletion, get_changes, SYNC_MENU_ITEMS
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Image variant jobs in flight, kept so they aren't garbage collected
+_variant_tasks: Set[asyncio.Task] = set()
 
 def serialize_menu_item(item):
     if not item:
@@ -19,12 +37,41 @@ def serialize_menu_item(item):
             pass
     return item
 
-async def get_menu_items(user_id: str) -> List[Dict[str, Any]]:
+# Menu item fields that can be filtered on exactly
+MENU_FILTER_FIELDS = ("category", "is_vegetarian", "is_available")
+
+def filter_menu_items(snapshot: MenuSnapshot, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """
+    Select the items of a menu snapshot that match the filters.
+    
+    Args:
+        snapshot: The user's menu snapshot
+        filters: Optional filters (category, is_vegetarian, is_available,
+            and search for a name prefix or substring)
+        
+    Returns:
+        List[dict]: The matching items; search results are ranked by how
+        well the name matches
+    """
+    filters = filters or {}
+    if filters.get("search"):
+        items = [snapshot.items[item_id] for item_id in snapshot.search_index.search(filters["search"])]
+    else:
+        items = list(snapshot.items.values())
+    
+    for field in MENU_FILTER_FIELDS:
+        if filters.get(field) is not None:
+            items = [item for item in items if item.get(field) == filters[field]]
+    return items
+
+async def get_menu_items(user_id: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
     """
-    Get all menu items for a user.
+    Get the menu items for a user with optional filtering.
     
     Args:
         user_id: The user's ID
+        filters: Optional filters (category, is_vegetarian, is_available,
+            and search for a name prefix or substring)
         
     Returns:
         List[dict]: The menu items
@@ -33,12 +80,44 @@ async def get_menu_items(user_id: str) -> List[Dict[str, Any]]:
         return []
     
     try:
-        cursor = db.menu_items.find({"user_id": user_id})
-        items = await cursor.to_list(length=None)
-        return [serialize_menu_item(i) for i in items]
+        # Served and filtered from the menu cache, which every menu write updates
+        snapshot = await menu_cache.get(user_id)
+        return [serialize_menu_item(dict(item)) for item in filter_menu_items(snapshot, filters)]
     except Exception:
         return []
 
+async def get_menu_etag(user_id: str, filters: Dict[str, Any] = None) -> str:
+    """
+    Get the ETag of a user's menu as returned by get_menu_items.
+    
+    Args:
+        user_id: The user's ID
+        filters: The filters passed to get_menu_items
+        
+    Returns:
+        str: The quoted ETag
+    """
+    snapshot = await menu_cache.get(user_id)
+    if not filters:
+        return snapshot.etag
+    return make_etag(snapshot.etag, *(f"{key}={filters[key]}" for key in sorted(filters)))
+
+async def get_menu_changes(user_id: str, since: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Get the menu items created, updated or deleted since a sync watermark.
+    
+    Args:
+        user_id: The user's ID
+        since: The watermark returned by the previous sync (optional)
+        
+    Returns:
+        dict: changed menu items, deleted item IDs, the new watermark and
+        whether this is a full resync
+    """
+    changes = await get_changes(user_id, SYNC_MENU_ITEMS, since)
+    changes["changed"] = [serialize_menu_item(item) for item in changes["changed"]]
+    return changes
+
 async def get_menu_item(user_id: str, item_id: str) -> Optional[Dict[str, Any]]:
     """
     Get a specific menu item.
@@ -93,9 +172,122 @@ async def create_menu_item(user_id: str, item_data: MenuItemCreate) -> Dict[str,
     # Insert menu item
     result = await db.menu_items.insert_one(item_doc)
     
-    # Get the inserted menu item
-    item = await db.menu_items.find_one({"_id": result.inserted_id})
-    return serialize_menu_item(item)
+    # The inserted document is the menu item; no need to read it back
+    item_doc["_id"] = result.inserted_id
+    menu_cache.apply(user_id, dict(item_doc))
+    return serialize_menu_item(item_doc)
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+def _prepare_menu_import(user_id: str, rows: Iterable[Optional[Dict[str, Any]]], now: datetime) -> tuple:
+    """
+    Read and validate import rows and build their upserts.
+    
+    Blocking: rows are usually parsed lazily from the uploaded file, so this
+    runs in the threadpool.
+    
+    Returns:
+        tuple: The upserts by name as (row number, operation), and the
+        errors of the rows that were rejected
+        
+    Raises:
+        ValueError: If the file is not UTF-8 or has too many rows
+    """
+    errors = []
+    # name -> (row number, operation), so repeated names collapse to one upsert
+    upserts: Dict[str, tuple] = {}
+    
+    try:
+        for row_number, row in enumerate(rows, start=1):
+            if row_number > settings.MENU_IMPORT_MAX_ROWS:
+                raise ValueError(f"At most {settings.MENU_IMPORT_MAX_ROWS} menu items can be imported at once")
+            if row is None:
+                errors.append({"row": row_number, "error": "Row is not a JSON object"})
+                continue
+            
+            try:
+                item = MenuItemCreate(**row)
+            except ValidationError as e:
+                errors.append({"row": row_number, "name": row.get("name"), "error": _format_validation_error(e)})
+                continue
+            
+            fields = item.dict(exclude_unset=True)
+            fields["category"] = item.category.value
+            fields["updated_at"] = now
+            defaults = {"image": None, "created_at": now}
+            for field in ("is_vegetarian", "is_available"):
+                if field not in fields:
+                    defaults[field] = getattr(item, field)
+            
+            previous = upserts.get(item.name)
+            if previous is not None:
+                errors.append({"row": previous[0], "name": item.name, "error": f"Replaced by row {row_number} with the same name"})
+            upserts[item.name] = (row_number, UpdateOne(
+                {"user_id": user_id, "name": item.name},
+                {"$set": fields, "$setOnInsert": defaults},
+                upsert=True
+            ))
+    except UnicodeDecodeError:
+        raise ValueError("Import file must be UTF-8 encoded")
+    return upserts, errors
+
+async def import_menu_items(user_id: str, rows: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Create or update many menu items at once, matching existing items by name.
+    
+    Rows are read and validated one at a time in the threadpool, so a large
+    file doesn't block the event loop, and all valid rows are written with a
+    single unordered bulk upsert. Columns missing from a row keep their
+    current value on existing items. When a name appears more than once, the
+    last row wins.
+    
+    Args:
+        user_id: The user's ID
+        rows: Menu item fields per row; None marks a row that could not be parsed
+        
+    Returns:
+        dict: Numbers of items created, updated and failed, and the errors
+        of the rows that were not applied
+        
+    Raises:
+        ValueError: If the file is not UTF-8 or has too many rows
+    """
+    if db.menu_items is None:
+        # This should not happen in production
+        raise Exception("Database not initialized")
+    
+    upserts, errors = await run_in_threadpool(_prepare_menu_import, user_id, rows, datetime.utcnow())
+    
+    names = list(upserts)
+    row_numbers = [row_number for row_number, _ in upserts.values()]
+    operations = [operation for _, operation in upserts.values()]
+    
+    # Write every valid row in one round trip; failures don't stop the rest
+    created = 0
+    failed_writes = 0
+    if operations:
+        try:
+            result = await db.menu_items.bulk_write(operations, ordered=False)
+            created = len(result.upserted_ids)
+        except BulkWriteError as e:
+            created = len(e.details.get("upserted", []))
+            for error in e.details.get("writeErrors", []):
+                failed_writes += 1
+                index = error["index"]
+                errors.append({"row": row_numbers[index], "name": names[index], "error": error.get("errmsg", "Write failed")})
+        menu_cache.invalidate(user_id)
+    
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "created": created,
+        "updated": len(operations) - created - failed_writes,
+        "failed": len(errors),
+        "errors": errors
+    }
 
 async def update_menu_item(user_id: str, item_id: str, item_data: MenuItemUpdate) -> Optional[Dict[str, Any]]:
     """
@@ -127,17 +319,14 @@ async def update_menu_item(user_id: str, item_id: str, item_data: MenuItemUpdate
         # Add updated_at timestamp
         update_data["updated_at"] = datetime.utcnow()
         
-        # Update menu item
-        result = await db.menu_items.update_one(
+        # Update menu item and get the new version in the same round trip
+        updated_item = await db.menu_items.find_one_and_update(
             {"_id": item_id_obj, "user_id": user_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        
-        if result.modified_count == 0:
-            return None
-        
-        # Get the updated menu item
-        updated_item = await db.menu_items.find_one({"_id": item_id_obj})
+        if updated_item:
+            menu_cache.apply(user_id, dict(updated_item))
         return serialize_menu_item(updated_item)
     except Exception:
         return None
@@ -159,18 +348,17 @@ async def delete_menu_item(user_id: str, item_id: str) -> bool:
     try:
         item_id_obj = ObjectId(item_id)
         
-        # Get the menu item first to delete the image if exists
-        item = await db.menu_items.find_one({"_id": item_id_obj, "user_id": user_id})
+        # Delete the menu item, getting it back to clean up its image
+        item = await db.menu_items.find_one_and_delete({"_id": item_id_obj, "user_id": user_id})
         if not item:
             return False
+        menu_cache.remove(user_id, str(item_id_obj))
+        await record_deletion(user_id, SYNC_MENU_ITEMS, item_id_obj)
         
         # Delete the image if exists
         if item.get("image"):
-            delete_file(item["image"])
-        
-        # Delete the menu item
-        result = await db.menu_items.delete_one({"_id": item_id_obj, "user_id": user_id})
-        return result.deleted_count > 0
+            await delete_file(item["image"])
+        return True
     except Exception:
         return False
 
@@ -192,31 +380,62 @@ async def update_menu_item_image(user_id: str, item_id: str, file: UploadFile) -
     try:
         item_id_obj = ObjectId(item_id)
         
-        # Get the current menu item
-        item = await db.menu_items.find_one({"_id": item_id_obj, "user_id": user_id})
-        if not item:
-            return None
-        
-        # Delete old image if exists
-        if item.get("image"):
-            delete_file(item["image"])
-        
-        # Save new image
-        file_path = await save_upload_file(file, "menu")
+        # Save new image; each user gets a folder so uploads are only
+        # deduplicated within a tenant
+        file_path = await save_upload_file(file, f"menu/{user_id}")
         
-        # Update menu item with new image
-        await db.menu_items.update_one(
+        # Point the menu item at the new image, getting the previous version back;
+        # its variants are added once they have been generated
+        update_data = {
+            "image": file_path,
+            "image_variants": None,
+            "updated_at": datetime.utcnow()
+        }
+        previous_item = await db.menu_items.find_one_and_update(
             {"_id": item_id_obj, "user_id": user_id},
-            {
-                "$set": {
-                    "image": file_path,
-                    "updated_at": datetime.utcnow()
-                }
-            }
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE
         )
+        if not previous_item:
+            await delete_file(file_path)
+            return None
+        updated_item = {**previous_item, **update_data}
+        menu_cache.apply(user_id, dict(updated_item))
+        
+        # Resize the image in the background
+        task = asyncio.create_task(_add_image_variants(user_id, item_id_obj, file_path))
+        _variant_tasks.add(task)
+        task.add_done_callback(_variant_tasks.discard)
         
-        # Get the updated menu item
-        updated_item = await db.menu_items.find_one({"_id": item_id_obj})
-        return updated_item
+        # Delete old image if exists
+        if previous_item.get("image"):
+            await delete_file(previous_item["image"])
+        
+        return serialize_menu_item(updated_item)
+    except HTTPException:
+        raise
     except Exception:
         return None
+
+async def _add_image_variants(user_id: str, item_id_obj: ObjectId, file_path: str) -> None:
+    """
+    Generate the variants of a menu item's new image and record them on
+    the item, unless its image has changed again in the meantime.
+    """
+    try:
+        variants = await generate_variants(file_path)
+        if not variants:
+            return
+        
+        item = await db.menu_items.find_one_and_update(
+            {"_id": item_id_obj, "user_id": user_id, "image": file_path},
+            {"$set": {"image_variants": variants, "updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if item:
+            menu_cache.apply(user_id, item)
+        elif not await run_in_threadpool(os.path.exists, Path(settings.UPLOAD_DIR) / file_path):
+            # The image was deleted while it was being resized
+            await run_in_threadpool(remove_variants, file_path)
+    except Exception as e:
+        logger.warning(f"Could not record image variants for menu item {item_id_obj}: {str(e)}")
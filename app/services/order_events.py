@@ -0,0 +1,209 @@
+from app.db.connection import db
+from app.core.config import settings
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Deque, Set
+import asyncio
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Event types published for order writes
+ORDER_CREATED = "order.created"
+ORDER_UPDATED = "order.updated"
+ORDER_DELETED = "order.deleted"
+
+# Event fields sent to kitchen displays
+ORDER_EVENT_FIELDS = (
+    "order_number",
+    "table_number",
+    "items",
+    "total",
+    "status",
+    "payment_status",
+    "notes",
+    "created_at",
+    "updated_at"
+)
+
+# Sent instead of replaying when a client's Last-Event-ID can't be served
+# from the buffer, or when a client falls too far behind; clients should
+# reload the order list and reconnect
+RESET_EVENT = {"id": None, "seq": None, "event": "reset", "data": {}}
+
+class OrderEventHub:
+    """
+    In-process pub/sub for order events, one channel per user.
+
+    Each user's recent events are kept in a bounded buffer so a client that
+    reconnects with Last-Event-ID gets what it missed. Event IDs have the
+    form "<epoch>-<seq>": the epoch is random per hub, so IDs issued before a
+    restart or by another worker never match, and seq increases
+    monotonically within the hub. A client whose ID fell out of the buffer
+    or carries another epoch gets a reset event instead.
+    """
+
+    def __init__(self, buffer_size: int, queue_size: int, epoch: Optional[str] = None):
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self.epoch = epoch or uuid.uuid4().hex[:12]
+        self._next_seq = 1
+        self._buffers: Dict[str, Deque[Dict[str, Any]]] = {}
+        # user_id -> seq of the newest event dropped from the buffer
+        self._evicted_through: Dict[str, int] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def publish(self, user_id: str, event_type: str, order: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Publish an order event to every subscriber of a user.
+        """
+        seq = self._next_seq
+        event = {
+            "id": f"{self.epoch}-{seq}",
+            "seq": seq,
+            "event": event_type,
+            "data": order_event_payload(order)
+        }
+        self._next_seq += 1
+
+        buffer = self._buffers.get(user_id)
+        if buffer is None:
+            buffer = self._buffers[user_id] = deque(maxlen=self.buffer_size)
+        if len(buffer) == buffer.maxlen:
+            self._evicted_through[user_id] = buffer[0]["seq"]
+        buffer.append(event)
+
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A subscriber that stopped reading is told to reload
+                self.unsubscribe(user_id, queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESET_EVENT)
+        return event
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[user_id]
+
+    def parse_event_id(self, event_id: str) -> Optional[int]:
+        """
+        Get the seq of an event ID issued by this hub.
+
+        Returns:
+            int: The seq, or None if the ID is malformed or was issued
+            before a restart or by another process
+        """
+        epoch, _, seq = event_id.rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def replay(self, user_id: str, last_event_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the buffered events after an event ID.
+
+        Returns:
+            List[dict]: The missed events, or None if some of them are no
+            longer buffered or the ID comes from another epoch and the
+            client has to reload
+        """
+        last_seq = self.parse_event_id(last_event_id)
+        if last_seq is None or last_seq >= self._next_seq or last_seq < self._evicted_through.get(user_id, 0):
+            return None
+        return [event for event in self._buffers.get(user_id, ()) if event["seq"] > last_seq]
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+def order_event_payload(order: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the JSON-ready body of an order event.
+    """
+    payload = {"id": str(order["_id"])}
+    for field in ORDER_EVENT_FIELDS:
+        if field in order:
+            value = order[field]
+            if field == "items":
+                value = [{key: _plain(item_value) for key, item_value in item.items()} for item in value]
+            payload[field] = _plain(value)
+    return payload
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """
+    Serialize an event in the text/event-stream format.
+    """
+    id_line = f"id: {event['id']}\n" if event["id"] is not None else ""
+    return f"{id_line}event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+def publish_order_event(user_id: str, event_type: str, order: Dict[str, Any]) -> None:
+    """
+    Publish an order write to the hub, unless events come from the
+    MongoDB change stream instead.
+    """
+    if settings.ORDER_EVENTS_SOURCE == "change_stream":
+        return
+    order_event_hub.publish(user_id, event_type, order)
+
+_CHANGE_STREAM_EVENTS = {
+    "insert": ORDER_CREATED,
+    "update": ORDER_UPDATED,
+    "replace": ORDER_UPDATED,
+    "delete": ORDER_DELETED
+}
+
+async def watch_order_changes() -> None:
+    """
+    Feed the hub from a MongoDB change stream on the orders collection, so
+    every worker sees writes made by the others. Requires a replica set;
+    delete events also need MongoDB 6.0+ with changeStreamPreAndPostImages
+    enabled on the orders collection, otherwise they are skipped.
+    """
+    resume_token = None
+    while True:
+        try:
+            async with db.orders.watch(
+                full_document="updateLookup",
+                full_document_before_change="whenAvailable",
+                resume_after=resume_token
+            ) as stream:
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    event_type = _CHANGE_STREAM_EVENTS.get(change["operationType"])
+                    if event_type is None:
+                        continue
+
+                    order = change.get("fullDocument") or change.get("fullDocumentBeforeChange")
+                    if order is None:
+                        # Deletes without pre-images only carry the _id
+                        logger.debug(f"Skipping change without document: {change['documentKey']}")
+                        continue
+                    order_event_hub.publish(order["user_id"], event_type, order)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Order change stream failed, restarting: {str(e)}")
+            await asyncio.sleep(5)
+
+# Shared hub for order events
+order_event_hub = OrderEventHub(
+    buffer_size=settings.ORDER_EVENTS_BUFFER_SIZE,
+    queue_size=settings.ORDER_EVENTS_QUEUE_SIZE
+)
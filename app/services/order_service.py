@@ -1,9 +1,121 @@
 from app.db.connection import db
+from app.db.batcher import InsertBatcher
+from app.core.config import settings
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from app.schemas.order import OrderCreate, OrderUpdate, OrderStatus, PaymentStatus
+from app.services.rollup_service import (
+    record_order_created,
+    record_orders_created,
+    record_order_updated,
+    record_order_deleted
+)
+from app.services.report_cache import report_cache
+from app.services.menu_cache import menu_cache
+from app.services.sequence_service import order_numbers, format_order_number
+from app.services.order_events import publish_order_event, ORDER_CREATED, ORDER_UPDATED, ORDER_DELETED
+from app.services.archive_service import reaches_archive, get_archived_orders, get_archived_order, iter_archived_orders
+from app.services.sync_service import record_deletion, get_changes, SYNC_ORDERS
+from app.utils.pagination import encode_cursor, decode_cursor, after_cursor_filter
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-import uuid
+from typing import Optional, Dict, Any, List, AsyncIterator, Iterable, Tuple
+
+# Coalesces concurrent create_order inserts when ORDER_INSERT_BATCHING is on
+order_insert_batcher = InsertBatcher(
+    lambda: db.orders,
+    window_ms=settings.ORDER_INSERT_BATCH_WINDOW_MS,
+    max_batch=settings.ORDER_INSERT_BATCH_MAX
+)
+
+# Fields needed by the order list views on the POS
+ORDER_SUMMARY_PROJECTION = {
+    "order_number": 1,
+    "table_number": 1,
+    "total": 1,
+    "status": 1,
+    "created_at": 1
+}
+
+def build_order_query(user_id: str, filters: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Build the MongoDB query for a user's orders.
+    
+    Args:
+        user_id: The user's ID
+        filters: Optional filters (status, date range, etc.)
+        
+    Returns:
+        dict: The query document
+    """
+    # Start with the base query
+    query = {"user_id": user_id}
+    
+    # Add filters if provided
+    if filters:
+        if "status" in filters:
+            query["status"] = filters["status"]
+        
+        if "start_date" in filters:
+            if "created_at" not in query:
+                query["created_at"] = {}
+            query["created_at"]["$gte"] = datetime.combine(filters["start_date"], datetime.min.time())
+        
+        if "end_date" in filters:
+            if "created_at" not in query:
+                query["created_at"] = {}
+            query["created_at"]["$lte"] = datetime.combine(filters["end_date"], datetime.max.time())
+    
+    return query
+
+def _archive_filters(query: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Translate an order query from build_order_query into archive filters.
+    """
+    created_at = query.get("created_at", {})
+    return {
+        "start_datetime": created_at.get("$gte"),
+        "end_datetime": created_at.get("$lte"),
+        "status": query.get("status")
+    }
+
+def _project(order: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply an inclusion projection to an archived order.
+    """
+    if not projection:
+        return order
+    fields = {field.split(".")[0] for field in projection}
+    return {key: value for key, value in order.items() if key == "_id" or key in fields}
+
+async def _merge_archived_orders(
+    user_id: str,
+    query: Dict[str, Any],
+    orders: List[Dict[str, Any]],
+    projection: Dict[str, Any] = None,
+    before: Optional[Tuple[datetime, ObjectId]] = None,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Add the archived orders matching a query to orders read from the
+    orders collection, newest first.
+    
+    The archive is only read when the query range reaches back past the
+    archive cutoff. Orders found in both tiers (left behind by an
+    interrupted archive run) are taken from the orders collection.
+    """
+    filters = _archive_filters(query)
+    if not reaches_archive(filters["start_datetime"]):
+        return orders
+    
+    archived = await get_archived_orders(user_id, **filters, before=before, limit=limit)
+    if not archived:
+        return orders
+    
+    hot_ids = {order["_id"] for order in orders}
+    merged = orders + [_project(order, projection) for order in archived if order["_id"] not in hot_ids]
+    merged.sort(key=lambda order: (order["created_at"], order["_id"]), reverse=True)
+    return merged
 
 async def get_orders(user_id: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
     """
@@ -20,32 +132,163 @@ async def get_orders(user_id: str, filters: Dict[str, Any] = None) -> List[Dict[
         return []
     
     try:
-        # Start with the base query
-        query = {"user_id": user_id}
-        
-        # Add filters if provided
-        if filters:
-            if "status" in filters:
-                query["status"] = filters["status"]
-            
-            if "start_date" in filters:
-                if "created_at" not in query:
-                    query["created_at"] = {}
-                query["created_at"]["$gte"] = datetime.combine(filters["start_date"], datetime.min.time())
-            
-            if "end_date" in filters:
-                if "created_at" not in query:
-                    query["created_at"] = {}
-                query["created_at"]["$lte"] = datetime.combine(filters["end_date"], datetime.max.time())
+        query = build_order_query(user_id, filters)
         
         # Execute query
         cursor = db.orders.find(query).sort("created_at", -1)  # Sort by created_at desc
         orders = await cursor.to_list(length=None)
-        return orders
+        
+        # Include closed orders moved to the archive
+        return await _merge_archived_orders(user_id, query, orders)
     except Exception as e:
         print(f"Error getting orders: {str(e)}")
         return []
 
+async def get_orders_page(
+    user_id: str,
+    filters: Dict[str, Any] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    projection: Dict[str, Any] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get one page of a user's orders, newest first, using keyset pagination.
+    
+    Pages are addressed by the (created_at, _id) of the last order on the
+    previous page, so every page costs the same index seek as the first.
+    
+    Args:
+        user_id: The user's ID
+        filters: Optional filters (status, date range, etc.)
+        limit: Maximum number of orders on the page
+        cursor: Cursor returned with the previous page (optional)
+        projection: Optional projection of the fields to fetch
+        
+    Returns:
+        Tuple[List[dict], Optional[str]]: The orders and the cursor of the
+        next page, or None on the last page
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if db.orders is None:
+        return [], None
+    
+    query = build_order_query(user_id, filters)
+    before = None
+    if cursor:
+        before = decode_cursor(cursor)
+        query.update(after_cursor_filter(*before))
+    
+    try:
+        # Fetch one extra order to know whether another page exists
+        db_cursor = db.orders.find(query, projection).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1)
+        orders = await db_cursor.to_list(length=limit + 1)
+        
+        # Archived orders are older than the cutoff, so a full page that ends
+        # after it can't contain any of them
+        if len(orders) <= limit or reaches_archive(orders[-1]["created_at"]):
+            orders = await _merge_archived_orders(
+                user_id, query, orders, projection=projection, before=before, limit=limit + 1
+            )
+            orders = orders[:limit + 1]
+    except Exception as e:
+        print(f"Error getting orders: {str(e)}")
+        return [], None
+    
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = encode_cursor(orders[-1]["created_at"], orders[-1]["_id"])
+    return orders, next_cursor
+
+async def get_order_summaries(
+    user_id: str,
+    filters: Dict[str, Any] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get the list-view fields of a user's orders, newest first.
+    
+    Only number, table, total, status and time are read from the database,
+    leaving out the item lines.
+    
+    Args:
+        user_id: The user's ID
+        filters: Optional filters (status, date range, etc.)
+        limit: Page size; all matching orders are returned when omitted
+        cursor: Cursor returned with the previous page (optional)
+        
+    Returns:
+        Tuple[List[dict], Optional[str]]: The order summaries and the cursor
+        of the next page, or None on the last page
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if db.orders is None:
+        return [], None
+    
+    if limit is None and cursor is None:
+        query = build_order_query(user_id, filters)
+        db_cursor = db.orders.find(query, ORDER_SUMMARY_PROJECTION).sort("created_at", -1)
+        summaries = await db_cursor.to_list(length=None)
+        summaries = await _merge_archived_orders(user_id, query, summaries, projection=ORDER_SUMMARY_PROJECTION)
+        next_cursor = None
+    else:
+        summaries, next_cursor = await get_orders_page(
+            user_id, filters, limit=limit or 50, cursor=cursor, projection=ORDER_SUMMARY_PROJECTION
+        )
+    
+    for summary in summaries:
+        summary["_id"] = str(summary["_id"])
+    return summaries, next_cursor
+
+async def iter_orders(
+    user_id: str,
+    filters: Dict[str, Any] = None,
+    projection: Dict[str, Any] = None,
+    batch_size: int = 500
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a user's orders from the database in batches.
+    
+    Only one cursor batch is held in memory at a time, so this is safe for
+    exports of any size. Archived orders in the range are merged into the
+    stream by creation time, decompressing one archive bucket at a time.
+    
+    Args:
+        user_id: The user's ID
+        filters: Optional filters (status, date range, etc.)
+        projection: Optional projection of the fields to fetch
+        batch_size: Number of documents fetched per round trip
+        
+    Yields:
+        dict: The orders, oldest first
+    """
+    if db.orders is None:
+        return
+    
+    query = build_order_query(user_id, filters)
+    
+    archived = None
+    archive_filters = _archive_filters(query)
+    if reaches_archive(archive_filters["start_datetime"]):
+        archived = iter_archived_orders(user_id, **archive_filters)
+    archived_order = await anext(archived, None) if archived else None
+    
+    cursor = db.orders.find(query, projection).sort("created_at", 1).batch_size(batch_size)
+    async for order in cursor:
+        while archived_order is not None and archived_order["created_at"] <= order["created_at"]:
+            yield _project(archived_order, projection)
+            archived_order = await anext(archived, None)
+        yield order
+    
+    while archived_order is not None:
+        yield _project(archived_order, projection)
+        archived_order = await anext(archived, None)
+
 async def get_order(user_id: str, order_id: str) -> Optional[Dict[str, Any]]:
     """
     Get a specific order.
@@ -63,33 +306,106 @@ async def get_order(user_id: str, order_id: str) -> Optional[Dict[str, Any]]:
     try:
         order_id_obj = ObjectId(order_id)
         order = await db.orders.find_one({"_id": order_id_obj, "user_id": user_id})
+        
+        # Orders created after the archive cutoff can't have been archived
+        if order is None and reaches_archive(order_id_obj.generation_time.replace(tzinfo=None)):
+            order = await get_archived_order(user_id, order_id_obj)
         return order
     except Exception:
         return None
 
-async def create_order(user_id: str, order_data: OrderCreate) -> Dict[str, Any]:
+async def get_order_changes(user_id: str, since: Optional[datetime] = None) -> Dict[str, Any]:
     """
-    Create a new order.
+    Get the orders created, updated or deleted since a sync watermark.
+    
+    Archived orders are not part of the sync, so a full resync only
+    returns orders still in the orders collection.
     
     Args:
         user_id: The user's ID
-        order_data: The order data
+        since: The watermark returned by the previous sync (optional)
         
     Returns:
-        dict: The created order
+        dict: changed orders, deleted order IDs, the new watermark and
+        whether this is a full resync
     """
-    if db.orders is None:
-        # This should not happen in production
-        raise Exception("Database not initialized")
+    changes = await get_changes(user_id, SYNC_ORDERS, since)
+    for order in changes["changed"]:
+        order["_id"] = str(order["_id"])
+    return changes
+
+async def get_order_menu_items(user_id: str, orders_data: List[OrderCreate]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the menu items referenced by new orders from the menu cache.
+    
+    The cached snapshot is reloaded if it doesn't know an item, which
+    covers items added by another worker since the snapshot was taken.
+    Snapshots loaded within MENU_CACHE_MISS_REFRESH_SECONDS are kept, so
+    repeated requests for a bad ID don't reload the menu every time.
+    
+    Args:
+        user_id: The user's ID
+        orders_data: The orders being created
+        
+    Returns:
+        dict: The user's menu items by ID
+    """
+    snapshot = await menu_cache.get(user_id)
     
+    referenced_ids = {item.menu_item_id for order_data in orders_data for item in order_data.items}
+    if not referenced_ids.issubset(snapshot.items):
+        snapshot = await menu_cache.get(user_id, max_age=settings.MENU_CACHE_MISS_REFRESH_SECONDS)
+    return snapshot.items
+
+def validate_order_items(order_data: OrderCreate, menu_items: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Check that every line of an order refers to an available menu item.
+    
+    Raises:
+        ValueError: If an item is unknown or unavailable
+    """
+    for item in order_data.items:
+        menu_item = menu_items.get(item.menu_item_id)
+        if menu_item is None:
+            raise ValueError(f"Menu item {item.menu_item_id} not found")
+        if not menu_item.get("is_available", True):
+            raise ValueError(f"Menu item '{menu_item['name']}' is not available")
+
+def build_order_doc(
+    user_id: str,
+    order_data: OrderCreate,
+    menu_items: Dict[str, Dict[str, Any]],
+    now: datetime,
+    order_seq: int
+) -> Dict[str, Any]:
+    """
+    Build the document for a new order, computing its totals.
+    
+    Names, prices and categories come from the menu, not from the client.
+    
+    Args:
+        user_id: The user's ID
+        order_data: The order data, already checked by validate_order_items
+        menu_items: The user's menu items by ID
+        now: Creation timestamp
+        order_seq: The order's sequence number within the day
+        
+    Returns:
+        dict: The order document, ready to insert
+    """
     # Calculate financial data
     items = []
     subtotal = 0.0
     
     for item in order_data.items:
+        menu_item = menu_items[item.menu_item_id]
         item_dict = item.dict()
-        item_subtotal = item.price * item.quantity
+        item_dict["name"] = menu_item["name"]
+        item_dict["price"] = menu_item["price"]
+        item_subtotal = menu_item["price"] * item.quantity
         item_dict["subtotal"] = item_subtotal
+        # Stamp the category so category reports don't need a join
+        item_dict["category"] = menu_item.get("category")
         items.append(item_dict)
         subtotal += item_subtotal
     
@@ -102,16 +418,11 @@ async def create_order(user_id: str, order_data: OrderCreate) -> Dict[str, Any]:
     # Calculate total
     total = subtotal + tax - discount
     
-    # Generate order number (format: YYYYMMDD-XXXX)
-    now = datetime.utcnow()
-    date_part = now.strftime("%Y%m%d")
-    random_part = str(uuid.uuid4().int)[:4]
-    order_number = f"{date_part}-{random_part}"
-    
     # Prepare order document
     order_doc = {
         "user_id": user_id,
-        "order_number": order_number,
+        "order_number": format_order_number(now, order_seq),  # YYYYMMDD-NNNN
+        "order_seq": order_seq,
         "customer_name": order_data.customer_name,
         "customer_phone": order_data.customer_phone,
         "table_number": order_data.table_number,
@@ -128,13 +439,210 @@ async def create_order(user_id: str, order_data: OrderCreate) -> Dict[str, Any]:
         "updated_at": now
     }
     
-    # Insert order
-    result = await db.orders.insert_one(order_doc)
+    # Only store the idempotency key when the client sent one, so the
+    # partial unique index ignores orders without it
+    if order_data.idempotency_key:
+        order_doc["idempotency_key"] = order_data.idempotency_key
+    
+    return order_doc
+
+async def create_order(user_id: str, order_data: OrderCreate) -> Dict[str, Any]:
+    """
+    Create a new order.
+    
+    If the order carries an idempotency key that was already used by this
+    user, the existing order is returned instead of creating a duplicate.
+    The key is looked up before the items are checked, so a replay still
+    returns the stored order after its items have left the menu.
     
-    # Get the inserted order
-    order = await db.orders.find_one({"_id": result.inserted_id})
+    Args:
+        user_id: The user's ID
+        order_data: The order data
+        
+    Returns:
+        dict: The created order
+        
+    Raises:
+        ValueError: If an item is unknown or unavailable
+    """
+    if db.orders is None:
+        # This should not happen in production
+        raise Exception("Database not initialized")
+    
+    # A replay of an order that was already stored
+    if order_data.idempotency_key:
+        existing_order = await db.orders.find_one(
+            {"user_id": user_id, "idempotency_key": order_data.idempotency_key}
+        )
+        if existing_order is not None:
+            return existing_order
+    
+    # Check and price every line against the cached menu
+    menu_items = await get_order_menu_items(user_id, [order_data])
+    validate_order_items(order_data, menu_items)
+    
+    # Take the next number of the day from this worker's reserved block
+    now = datetime.utcnow()
+    order_seq = await order_numbers.next_number(user_id, now.strftime("%Y%m%d"))
+    
+    order_doc = build_order_doc(user_id, order_data, menu_items, now, order_seq)
+    
+    # Insert order, sharing a round trip with concurrent orders if enabled
+    try:
+        if settings.ORDER_INSERT_BATCHING:
+            inserted_id = await order_insert_batcher.insert(order_doc)
+        else:
+            inserted_id = (await db.orders.insert_one(order_doc)).inserted_id
+    except DuplicateKeyError as e:
+        if "idempotency_key" not in (e.details or {}).get("keyPattern", {}):
+            raise
+        # A concurrent replay stored the order first
+        return await db.orders.find_one(
+            {"user_id": user_id, "idempotency_key": order_data.idempotency_key}
+        )
+    
+    # The inserted document is the order; no need to read it back
+    order = order_doc
+    order["_id"] = inserted_id
+    
+    # Keep the daily report rollups and cached reports current
+    await record_order_created(order)
+    report_cache.invalidate(user_id, order["created_at"])
+    publish_order_event(user_id, ORDER_CREATED, order)
     return order
 
+def build_idempotency_keys_query(user_id: str, keys: Iterable[str]) -> Dict[str, Any]:
+    """
+    Build the query for a user's orders holding any of the idempotency keys.
+    """
+    return {"user_id": user_id, "idempotency_key": {"$in": list(keys)}}
+
+async def _find_orders_by_key(user_id: str, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the stored orders holding any of the idempotency keys, by key.
+    """
+    cursor = db.orders.find(
+        build_idempotency_keys_query(user_id, keys),
+        {"idempotency_key": 1, "order_number": 1}
+    )
+    return {order["idempotency_key"]: order async for order in cursor}
+
+async def create_orders_bulk(user_id: str, orders_data: List[OrderCreate]) -> List[Dict[str, Any]]:
+    """
+    Create many orders with a single unordered insert.
+    
+    Orders whose idempotency key was already used by this user (or earlier
+    in the same batch) are reported as duplicates pointing at the stored
+    order, so replaying a batch never creates duplicates. Stored keys are
+    looked up before the items are checked, so replays succeed even after
+    their items have left the menu.
+    
+    Args:
+        user_id: The user's ID
+        orders_data: The orders to create
+        
+    Returns:
+        List[dict]: One result per input order, in input order, with index,
+        status ("created", "duplicate" or "failed"), order_id, order_number
+        and error
+    """
+    if db.orders is None:
+        # This should not happen in production
+        raise Exception("Database not initialized")
+    
+    # Find the orders replayed from an earlier batch
+    existing = {}
+    keys = {order_data.idempotency_key for order_data in orders_data if order_data.idempotency_key}
+    if keys:
+        existing = await _find_orders_by_key(user_id, keys)
+    
+    # Check and price every line against the cached menu
+    menu_items = await get_order_menu_items(user_id, orders_data)
+    
+    now = datetime.utcnow()
+    results = [None] * len(orders_data)
+    doc_indexes = []
+    first_index_by_key = {}
+    
+    for index, order_data in enumerate(orders_data):
+        key = order_data.idempotency_key
+        if key and key in existing:
+            results[index] = {"index": index, "status": "duplicate", "idempotency_key": key}
+            continue
+        if key and key in first_index_by_key:
+            # Repeated within the batch, resolved once the first one is stored
+            results[index] = {"index": index, "status": "duplicate", "duplicate_of": first_index_by_key[key]}
+            continue
+        if key:
+            first_index_by_key[key] = index
+        try:
+            validate_order_items(order_data, menu_items)
+        except ValueError as e:
+            results[index] = {"index": index, "status": "failed", "error": str(e)}
+            continue
+        doc_indexes.append(index)
+    
+    # Reserve the order numbers for the whole batch at once
+    order_seqs = await order_numbers.next_numbers(user_id, now.strftime("%Y%m%d"), len(doc_indexes))
+    docs = [
+        build_order_doc(user_id, orders_data[index], menu_items, now, order_seq)
+        for index, order_seq in zip(doc_indexes, order_seqs)
+    ]
+    
+    # Insert everything in one round trip; failures don't stop the rest
+    write_errors = {}
+    if docs:
+        try:
+            await db.orders.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                write_errors[error["index"]] = error
+    
+    created_orders = []
+    duplicate_keys = set()
+    for position, (index, doc) in enumerate(zip(doc_indexes, docs)):
+        error = write_errors.get(position)
+        if error is None:
+            created_orders.append(doc)
+            results[index] = {
+                "index": index,
+                "status": "created",
+                "order_id": str(doc["_id"]),
+                "order_number": doc["order_number"]
+            }
+        elif error.get("code") == 11000 and "idempotency_key" in error.get("keyPattern", {}):
+            duplicate_keys.add(doc["idempotency_key"])
+            results[index] = {"index": index, "status": "duplicate", "idempotency_key": doc["idempotency_key"]}
+        else:
+            results[index] = {"index": index, "status": "failed", "error": error.get("errmsg", "Insert failed")}
+    
+    # Resolve orders that a concurrent replay stored first
+    if duplicate_keys:
+        existing.update(await _find_orders_by_key(user_id, duplicate_keys))
+    
+    for result in results:
+        if result["status"] != "duplicate":
+            continue
+        if "duplicate_of" in result:
+            original = results[result.pop("duplicate_of")]
+            result["order_id"] = original.get("order_id")
+            result["order_number"] = original.get("order_number")
+            if original["status"] == "failed":
+                result["status"] = "failed"
+                result["error"] = original.get("error")
+        else:
+            stored = existing.get(result.pop("idempotency_key"))
+            result["order_id"] = str(stored["_id"]) if stored else None
+            result["order_number"] = stored["order_number"] if stored else None
+    
+    # Keep the daily report rollups and cached reports current
+    await record_orders_created(created_orders)
+    for order in created_orders:
+        report_cache.invalidate(user_id, order["created_at"])
+        publish_order_event(user_id, ORDER_CREATED, order)
+    
+    return results
+
 async def update_order(user_id: str, order_id: str, order_data: OrderUpdate) -> Optional[Dict[str, Any]]:
     """
     Update an order.
@@ -162,17 +670,22 @@ async def update_order(user_id: str, order_id: str, order_data: OrderUpdate) ->
         # Add updated_at timestamp
         update_data["updated_at"] = datetime.utcnow()
         
-        # Update order
-        result = await db.orders.update_one(
+        # Update order, keeping the previous version for the rollup delta
+        previous_order = await db.orders.find_one_and_update(
             {"_id": order_id_obj, "user_id": user_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.modified_count == 0:
+        if previous_order is None:
             return None
         
-        # Get the updated order
-        updated_order = await db.orders.find_one({"_id": order_id_obj})
+        updated_order = {**previous_order, **update_data}
+        
+        # Keep the daily report rollups and cached reports current
+        await record_order_updated(previous_order, updated_order)
+        report_cache.invalidate(user_id, updated_order["created_at"])
+        publish_order_event(user_id, ORDER_UPDATED, updated_order)
         return updated_order
     except Exception:
         return None
@@ -193,7 +706,15 @@ async def delete_order(user_id: str, order_id: str) -> bool:
     
     try:
         order_id_obj = ObjectId(order_id)
-        result = await db.orders.delete_one({"_id": order_id_obj, "user_id": user_id})
-        return result.deleted_count > 0
+        deleted_order = await db.orders.find_one_and_delete({"_id": order_id_obj, "user_id": user_id})
+        if deleted_order is None:
+            return False
+        
+        # Keep the daily report rollups and cached reports current
+        await record_order_deleted(deleted_order)
+        await record_deletion(user_id, SYNC_ORDERS, order_id_obj)
+        report_cache.invalidate(user_id, deleted_order["created_at"])
+        publish_order_event(user_id, ORDER_DELETED, deleted_order)
+        return True
     except Exception:
         return False
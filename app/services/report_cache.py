@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from datetime import datetime, date
+from typing import Optional, Dict, Any, Tuple
+from app.core.config import settings
+import time
+
+class ReportCache:
+    """
+    Bounded LRU cache for generated reports with write-driven invalidation.
+
+    Entries for ranges that are still open (ending today or later) expire
+    after ttl_seconds. Entries for closed historical ranges only change
+    through writes to old orders, so they are kept for the much longer
+    closed_ttl_seconds. A write to an order inside a cached range drops the
+    entry at once, but only in the process that made the write: with
+    several workers, the TTLs bound how stale a report can get on the
+    workers that did not see it.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, closed_ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.closed_ttl_seconds = closed_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # key -> (report, range start, range end, expires_at)
+        self._entries: "OrderedDict[Tuple, Tuple[Any, datetime, datetime, float]]" = OrderedDict()
+        # user_id -> keys cached for that user
+        self._keys_by_user: Dict[str, set] = {}
+        # user_id -> number of order writes seen, used to reject reports
+        # that were computed while a write was landing
+        self._write_versions: Dict[str, int] = {}
+
+    @staticmethod
+    def _key(kind: str, user_id: str, time_frame: str, start: date, end: date) -> Tuple:
+        return (kind, user_id, str(time_frame), start, end)
+
+    def get(self, kind: str, user_id: str, time_frame: str, start: date, end: date) -> Optional[Any]:
+        """
+        Get a cached report, or None on a miss.
+        """
+        key = self._key(kind, user_id, time_frame, start, end)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry[3] <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def version(self, user_id: str) -> int:
+        """
+        Get the write version of a user, to be passed back to set().
+        """
+        return self._write_versions.get(user_id, 0)
+
+    def set(
+        self,
+        kind: str,
+        user_id: str,
+        time_frame: str,
+        start: date,
+        end: date,
+        report: Any,
+        version: Optional[int] = None
+    ) -> None:
+        """
+        Cache a report for a resolved date range.
+
+        When version is given and an order write for the user has been seen
+        since it was taken, the report may be stale and is not cached.
+        """
+        if self.max_entries <= 0:
+            return
+        if version is not None and version != self.version(user_id):
+            return
+
+        key = self._key(kind, user_id, time_frame, start, end)
+        range_start = datetime.combine(start, datetime.min.time())
+        range_end = datetime.combine(end, datetime.max.time())
+
+        # Closed historical periods only change through writes to old orders
+        if end < datetime.utcnow().date():
+            expires_at = time.monotonic() + self.closed_ttl_seconds
+        else:
+            expires_at = time.monotonic() + self.ttl_seconds
+
+        self._entries[key] = (report, range_start, range_end, expires_at)
+        self._entries.move_to_end(key)
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    def invalidate(self, user_id: str, created_at: datetime) -> int:
+        """
+        Drop the cached reports of a user whose range covers an order timestamp.
+
+        Args:
+            user_id: The user's ID
+            created_at: The created_at of the order that was written
+
+        Returns:
+            int: Number of entries dropped
+        """
+        self._write_versions[user_id] = self.version(user_id) + 1
+
+        keys = self._keys_by_user.get(user_id)
+        if not keys:
+            return 0
+
+        stale = [
+            key for key in keys
+            if self._entries[key][1] <= created_at <= self._entries[key][2]
+        ]
+        for key in stale:
+            self._remove(key)
+
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations
+        }
+
+    def _remove(self, key: Tuple) -> None:
+        self._entries.pop(key, None)
+        user_keys = self._keys_by_user.get(key[1])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[key[1]]
+
+# Shared cache for sales and revenue reports
+report_cache = ReportCache(
+    max_entries=settings.REPORT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.REPORT_CACHE_TTL_SECONDS,
+    closed_ttl_seconds=settings.REPORT_CACHE_CLOSED_TTL_SECONDS
+)
@@ -1,10 +1,520 @@
 from app.db.connection import db
-from app.schemas.report import ReportTimeFrame, SalesReport, RevenueReport
+from app.core.config import settings
+from app.schemas.report import ReportTimeFrame, SalesReport, RevenueReport, CategorySalesReport, SummaryReport
+from app.services.rollup_service import get_daily_rollups, ROLLUP_FIELDS
+from app.services.report_cache import report_cache
+from app.services.archive_service import reaches_archive, archived_days_pipeline
 from app.utils.date_utils import get_date_range, format_date_for_timeframe
 from datetime import datetime, date, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from bisect import bisect_right
+from array import array
 from bson import ObjectId
 
+# Report engines selectable through settings.REPORT_ENGINE
+ENGINE_PYTHON = "python"
+ENGINE_AGGREGATION = "aggregation"
+ENGINE_ROLLUPS = "rollups"
+
+def _bucket_id(time_frame: ReportTimeFrame, field: str = "$created_at") -> Dict[str, Any]:
+    """
+    Build the $group _id expression for a time frame.
+    
+    Weeks are keyed by calendar year and ISO week number, matching the
+    grouping used by the in-process report path.
+    """
+    if time_frame == ReportTimeFrame.DAILY:
+        return {
+            "year": {"$year": field},
+            "month": {"$month": field},
+            "day": {"$dayOfMonth": field}
+        }
+    elif time_frame == ReportTimeFrame.WEEKLY:
+        return {
+            "year": {"$year": field},
+            "week": {"$isoWeek": field}
+        }
+    elif time_frame == ReportTimeFrame.MONTHLY:
+        return {
+            "year": {"$year": field},
+            "month": {"$month": field}
+        }
+    return {"year": {"$year": field}}
+
+def build_bucket_pipeline(
+    user_id: str,
+    time_frame: ReportTimeFrame,
+    start_datetime: datetime,
+    end_datetime: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Build an aggregation pipeline that buckets orders by time frame.
+    
+    Args:
+        user_id: The user's ID
+        time_frame: The time frame (daily, weekly, monthly, yearly)
+        start_datetime: Inclusive lower bound on created_at
+        end_datetime: Inclusive upper bound on created_at
+        
+    Returns:
+        List[dict]: The pipeline stages
+    """
+    return [
+        {"$match": {
+            "user_id": user_id,
+            "created_at": {
+                "$gte": start_datetime,
+                "$lte": end_datetime
+            }
+        }},
+        {"$group": {
+            "_id": _bucket_id(time_frame),
+            "orders_count": {"$sum": 1},
+            "items_sold": {"$sum": {"$sum": "$items.quantity"}},
+            "subtotal": {"$sum": "$subtotal"},
+            "tax": {"$sum": "$tax"},
+            "discount": {"$sum": "$discount"},
+            "total": {"$sum": "$total"},
+            "first_order_at": {"$min": "$created_at"}
+        }},
+        {"$sort": {"first_order_at": 1}}
+    ]
+
+def _group_key(group_id: Any) -> Any:
+    if isinstance(group_id, dict):
+        return tuple(sorted(group_id.items()))
+    return group_id
+
+def _merge_groups(groups: List[Dict[str, Any]], extra_groups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Combine two lists of $group results that share _id values, summing
+    their totals.
+    """
+    merged = {}
+    for group in list(groups) + list(extra_groups):
+        key = _group_key(group["_id"])
+        current = merged.get(key)
+        if current is None:
+            merged[key] = dict(group)
+            continue
+        for field, value in group.items():
+            if field == "_id":
+                continue
+            if field == "first_order_at":
+                current[field] = min(current[field], value)
+            else:
+                current[field] += value
+    return list(merged.values())
+
+def _archived_bucket_stages(time_frame: ReportTimeFrame) -> List[Dict[str, Any]]:
+    """
+    Build the stages that bucket archived per-day totals like
+    build_bucket_pipeline buckets orders.
+    """
+    return [{"$group": {
+        "_id": _bucket_id(time_frame, "$day"),
+        **{field: {"$sum": f"${field}"} for field in ROLLUP_FIELDS},
+        "first_order_at": {"$min": "$first_order_at"}
+    }}]
+
+def _archived_breakdown_stages(breakdown: str, field: str, default: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Build the stages that total one per-day breakdown of the archive by
+    its key field, grouping missing keys under default if given.
+    """
+    key = f"${breakdown}.{field}"
+    return [
+        {"$unwind": f"${breakdown}"},
+        {"$group": {
+            "_id": {"$ifNull": [key, default]} if default is not None else key,
+            "orders_count": {"$sum": f"${breakdown}.orders_count"},
+            "net_amount": {"$sum": f"${breakdown}.net_amount"}
+        }}
+    ]
+
+async def _aggregate_archive(
+    user_id: str,
+    start_datetime: datetime,
+    end_datetime: datetime,
+    stages: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Run aggregation stages over the per-day totals stored on the archive
+    buckets in a report range.
+    
+    The archive is skipped entirely when the range starts after the archive
+    cutoff, and archived orders are never decompressed.
+    """
+    if db.order_archive is None or not reaches_archive(start_datetime):
+        return []
+    pipeline = archived_days_pipeline(user_id, start_datetime, end_datetime) + stages
+    return await db.order_archive.aggregate(pipeline).to_list(length=None)
+
+def _bucket_date(time_frame: ReportTimeFrame, bucket: Dict[str, Any]) -> datetime:
+    """
+    Get the data point date for an aggregated bucket.
+    """
+    key = bucket["_id"]
+    if time_frame == ReportTimeFrame.DAILY:
+        return datetime(key["year"], key["month"], key["day"])
+    elif time_frame == ReportTimeFrame.WEEKLY:
+        # Weekly points are dated by the first day with orders in that week
+        return datetime.combine(bucket["first_order_at"].date(), datetime.min.time())
+    elif time_frame == ReportTimeFrame.MONTHLY:
+        return datetime(key["year"], key["month"], 1)
+    return datetime(key["year"], 1, 1)
+
+def _empty_row(bucket_date: datetime) -> Dict[str, Any]:
+    return {
+        "date": bucket_date,
+        "orders_count": 0,
+        "items_sold": 0,
+        "subtotal": 0,
+        "tax": 0,
+        "discount": 0,
+        "total": 0
+    }
+
+def _fill_daily_rows(rows: List[Dict[str, Any]], start: date, end: date) -> List[Dict[str, Any]]:
+    """
+    Expand daily rows so that every day in the range has a data point.
+    """
+    rows_by_date = {row["date"]: row for row in rows}
+    filled = []
+    current_date = start
+    while current_date <= end:
+        current_start = datetime.combine(current_date, datetime.min.time())
+        filled.append(rows_by_date.get(current_start) or _empty_row(current_start))
+        current_date += timedelta(days=1)
+    return filled
+
+async def aggregate_report_rows(
+    user_id: str,
+    time_frame: ReportTimeFrame,
+    start: date,
+    end: date
+) -> List[Dict[str, Any]]:
+    """
+    Compute per-bucket order totals on the database server.
+    
+    Only one small document per bucket is sent back instead of every order
+    in the range. Archived orders are bucketed on the server from the
+    per-day totals of their archive buckets and added in.
+    
+    Args:
+        user_id: The user's ID
+        time_frame: The time frame (daily, weekly, monthly, yearly)
+        start: The start date
+        end: The end date
+        
+    Returns:
+        List[dict]: Rows with date, orders_count, items_sold, subtotal, tax,
+        discount and total, sorted by date
+    """
+    start_datetime = datetime.combine(start, datetime.min.time())
+    end_datetime = datetime.combine(end, datetime.max.time())
+    
+    pipeline = build_bucket_pipeline(user_id, time_frame, start_datetime, end_datetime)
+    buckets = await db.orders.aggregate(pipeline).to_list(length=None)
+    
+    archived = await _aggregate_archive(
+        user_id, start_datetime, end_datetime, _archived_bucket_stages(time_frame)
+    )
+    if archived:
+        buckets = _merge_groups(buckets, archived)
+    return _rows_from_buckets(time_frame, start, end, buckets)
+
+def _rows_from_buckets(
+    time_frame: ReportTimeFrame,
+    start: date,
+    end: date,
+    buckets: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Turn the output of the bucket pipeline into report rows.
+    """
+    rows = []
+    for bucket in buckets:
+        row = _empty_row(_bucket_date(time_frame, bucket))
+        for field in ROLLUP_FIELDS:
+            row[field] = bucket[field]
+        rows.append(row)
+    
+    if time_frame == ReportTimeFrame.DAILY:
+        return _fill_daily_rows(rows, start, end)
+    return sorted(rows, key=lambda x: x["date"])
+
+def _day_bucket(time_frame: ReportTimeFrame, day: date) -> tuple:
+    """
+    Get the bucket key and data point date for a day.
+    """
+    if time_frame == ReportTimeFrame.DAILY:
+        return (day,), datetime.combine(day, datetime.min.time())
+    elif time_frame == ReportTimeFrame.WEEKLY:
+        # Weekly points are dated by the first day with orders in that week
+        return (day.year, day.isocalendar()[1]), datetime.combine(day, datetime.min.time())
+    elif time_frame == ReportTimeFrame.MONTHLY:
+        return (day.year, day.month), datetime(day.year, day.month, 1)
+    return (day.year,), datetime(day.year, 1, 1)
+
+async def rollup_report_rows(
+    user_id: str,
+    time_frame: ReportTimeFrame,
+    start: date,
+    end: date
+) -> List[Dict[str, Any]]:
+    """
+    Compute per-bucket order totals from the daily rollup collection.
+    
+    At most one small document per day in the range is read.
+    
+    Args:
+        user_id: The user's ID
+        time_frame: The time frame (daily, weekly, monthly, yearly)
+        start: The start date
+        end: The end date
+        
+    Returns:
+        List[dict]: Rows in the same shape as aggregate_report_rows
+    """
+    rollups = await get_daily_rollups(user_id, start, end)
+    
+    buckets = {}
+    for rollup in rollups:
+        key, bucket_date = _day_bucket(time_frame, rollup["day"].date())
+        if key not in buckets:
+            buckets[key] = _empty_row(bucket_date)
+        for field in ROLLUP_FIELDS:
+            buckets[key][field] += rollup.get(field, 0)
+    
+    rows = list(buckets.values())
+    if time_frame == ReportTimeFrame.DAILY:
+        return _fill_daily_rows(rows, start, end)
+    return sorted(rows, key=lambda x: x["date"])
+
+def _bucket_segments(
+    time_frame: ReportTimeFrame,
+    start: date,
+    end: date
+) -> Tuple[List[datetime], List[int], List[datetime]]:
+    """
+    Split a date range into contiguous segments that each map to one bucket.
+    
+    A bucket can own more than one segment: weeks are keyed by calendar year
+    and ISO week, so the last days of December that fall in ISO week 1 share
+    a bucket with the first week of that same year.
+    
+    Returns:
+        tuple: Segment start datetimes (sorted), the bucket index of each
+        segment, and the data point date of each bucket
+    """
+    boundaries = []
+    segment_buckets = []
+    bucket_dates = []
+    bucket_index = {}
+    
+    current_date = start
+    previous_key = None
+    while current_date <= end:
+        key, bucket_date = _day_bucket(time_frame, current_date)
+        if key != previous_key:
+            if key not in bucket_index:
+                bucket_index[key] = len(bucket_dates)
+                bucket_dates.append(bucket_date)
+            boundaries.append(datetime.combine(current_date, datetime.min.time()))
+            segment_buckets.append(bucket_index[key])
+            previous_key = key
+        current_date += timedelta(days=1)
+    
+    return boundaries, segment_buckets, bucket_dates
+
+async def scan_report_rows(
+    user_id: str,
+    time_frame: ReportTimeFrame,
+    start: date,
+    end: date
+) -> List[Dict[str, Any]]:
+    """
+    Compute per-bucket order totals in a single pass over the orders.
+    
+    Bucket boundaries are computed once for the range, and each order is
+    placed with a binary search over them while the totals accumulate in
+    flat columns, so the cost is O(orders * log(buckets)) for every time
+    frame.
+    
+    Args:
+        user_id: The user's ID
+        time_frame: The time frame (daily, weekly, monthly, yearly)
+        start: The start date
+        end: The end date
+        
+    Returns:
+        List[dict]: Rows in the same shape as aggregate_report_rows
+    """
+    start_datetime = datetime.combine(start, datetime.min.time())
+    end_datetime = datetime.combine(end, datetime.max.time())
+    boundaries, segment_buckets, bucket_dates = _bucket_segments(time_frame, start, end)
+    bucket_count = len(bucket_dates)
+    
+    orders_count = array("q", [0]) * bucket_count
+    items_sold = array("q", [0]) * bucket_count
+    subtotal = array("d", [0.0]) * bucket_count
+    tax = array("d", [0.0]) * bucket_count
+    discount = array("d", [0.0]) * bucket_count
+    total = array("d", [0.0]) * bucket_count
+    first_order_at = [None] * bucket_count
+    
+    # Only fetch the fields that feed the totals
+    cursor = db.orders.find(
+        {
+            "user_id": user_id,
+            "created_at": {
+                "$gte": start_datetime,
+                "$lte": end_datetime
+            }
+        },
+        {
+            "_id": 0,
+            "created_at": 1,
+            "items.quantity": 1,
+            "subtotal": 1,
+            "tax": 1,
+            "discount": 1,
+            "total": 1
+        }
+    )
+    
+    def add_order(order: Dict[str, Any]) -> None:
+        created_at = order["created_at"]
+        bucket = segment_buckets[bisect_right(boundaries, created_at) - 1]
+        
+        orders_count[bucket] += 1
+        items_sold[bucket] += sum(item["quantity"] for item in order["items"])
+        subtotal[bucket] += order["subtotal"]
+        tax[bucket] += order["tax"]
+        discount[bucket] += order["discount"]
+        total[bucket] += order["total"]
+        if first_order_at[bucket] is None or created_at < first_order_at[bucket]:
+            first_order_at[bucket] = created_at
+    
+    async for order in cursor:
+        add_order(order)
+    
+    # Closed orders moved to the archive still count, through the per-day
+    # totals of their buckets
+    for day in await _aggregate_archive(user_id, start_datetime, end_datetime, []):
+        bucket = segment_buckets[bisect_right(boundaries, day["day"]) - 1]
+        
+        orders_count[bucket] += day["orders_count"]
+        items_sold[bucket] += day["items_sold"]
+        subtotal[bucket] += day["subtotal"]
+        tax[bucket] += day["tax"]
+        discount[bucket] += day["discount"]
+        total[bucket] += day["total"]
+        if first_order_at[bucket] is None or day["first_order_at"] < first_order_at[bucket]:
+            first_order_at[bucket] = day["first_order_at"]
+    
+    rows = []
+    for bucket in range(bucket_count):
+        if time_frame != ReportTimeFrame.DAILY and orders_count[bucket] == 0:
+            continue
+        
+        bucket_date = bucket_dates[bucket]
+        if time_frame == ReportTimeFrame.WEEKLY:
+            # Weekly points are dated by the first day with orders in that week
+            bucket_date = datetime.combine(first_order_at[bucket].date(), datetime.min.time())
+        
+        rows.append({
+            "date": bucket_date,
+            "orders_count": orders_count[bucket],
+            "items_sold": items_sold[bucket],
+            "subtotal": subtotal[bucket],
+            "tax": tax[bucket],
+            "discount": discount[bucket],
+            "total": total[bucket]
+        })
+    
+    return sorted(rows, key=lambda x: x["date"])
+
+async def compute_report_rows(
+    user_id: str,
+    time_frame: ReportTimeFrame,
+    start: date,
+    end: date
+) -> List[Dict[str, Any]]:
+    """
+    Compute report rows with the engine selected by settings.REPORT_ENGINE.
+    
+    Args:
+        user_id: The user's ID
+        time_frame: The time frame (daily, weekly, monthly, yearly)
+        start: The start date
+        end: The end date
+        
+    Returns:
+        List[dict]: Rows with date, orders_count, items_sold, subtotal, tax,
+        discount and total, sorted by date
+    """
+    if settings.REPORT_ENGINE == ENGINE_ROLLUPS:
+        return await rollup_report_rows(user_id, time_frame, start, end)
+    if settings.REPORT_ENGINE == ENGINE_AGGREGATION:
+        return await aggregate_report_rows(user_id, time_frame, start, end)
+    return await scan_report_rows(user_id, time_frame, start, end)
+
+def build_sales_report(
+    time_frame: ReportTimeFrame,
+    start: date,
+    end: date,
+    rows: List[Dict[str, Any]]
+) -> SalesReport:
+    """
+    Build a sales report from bucketed rows.
+    """
+    return SalesReport(
+        time_frame=time_frame,
+        start_date=start,
+        end_date=end,
+        total_orders=sum(row["orders_count"] for row in rows),
+        total_items_sold=sum(row["items_sold"] for row in rows),
+        data=[
+            {
+                "date": row["date"],
+                "orders_count": row["orders_count"],
+                "items_sold": row["items_sold"]
+            }
+            for row in rows
+        ]
+    )
+
+def build_revenue_report(
+    time_frame: ReportTimeFrame,
+    start: date,
+    end: date,
+    rows: List[Dict[str, Any]]
+) -> RevenueReport:
+    """
+    Build a revenue report from bucketed rows.
+    """
+    return RevenueReport(
+        time_frame=time_frame,
+        start_date=start,
+        end_date=end,
+        total_revenue=sum(row["subtotal"] for row in rows),
+        total_tax=sum(row["tax"] for row in rows),
+        total_discount=sum(row["discount"] for row in rows),
+        total_net_amount=sum(row["total"] for row in rows),
+        data=[
+            {
+                "date": row["date"],
+                "revenue": row["subtotal"],
+                "tax": row["tax"],
+                "discount": row["discount"],
+                "net_amount": row["total"]
+            }
+            for row in rows
+        ]
+    )
+
 async def generate_sales_report(
     user_id: str,
     time_frame: ReportTimeFrame,
@@ -37,124 +547,19 @@ async def generate_sales_report(
     # Get date range
     start, end = get_date_range(time_frame, start_date, end_date)
     
-    # Convert to datetime for query
-    start_datetime = datetime.combine(start, datetime.min.time())
-    end_datetime = datetime.combine(end, datetime.max.time())
+    # Serve repeated requests for the same range from the cache
+    cached_report = report_cache.get("sales", user_id, time_frame, start, end)
+    if cached_report is not None:
+        return cached_report
     
-    # Query orders within date range
-    orders = await db.orders.find({
-        "user_id": user_id,
-        "created_at": {
-            "$gte": start_datetime,
-            "$lte": end_datetime
-        }
-    }).to_list(length=None)
-    
-    # Calculate total orders and items sold
-    total_orders = len(orders)
-    total_items_sold = sum(sum(item["quantity"] for item in order["items"]) for order in orders)
-    
-    # Group data by time frame
-    data_points = []
-    
-    if time_frame == ReportTimeFrame.DAILY:
-        # For daily reports, we show each day
-        current_date = start
-        while current_date <= end:
-            current_start = datetime.combine(current_date, datetime.min.time())
-            current_end = datetime.combine(current_date, datetime.max.time())
-            
-            # Filter orders for current day
-            day_orders = [o for o in orders if current_start <= o["created_at"] <= current_end]
-            
-            # Calculate data for current day
-            orders_count = len(day_orders)
-            items_sold = sum(sum(item["quantity"] for item in order["items"]) for order in day_orders)
-            
-            # Add data point
-            data_points.append({
-                "date": current_start,
-                "orders_count": orders_count,
-                "items_sold": items_sold
-            })
-            
-            # Move to next day
-            current_date += timedelta(days=1)
+    # Group orders by time frame
+    cache_version = report_cache.version(user_id)
+    rows = await compute_report_rows(user_id, time_frame, start, end)
     
-    elif time_frame == ReportTimeFrame.WEEKLY:
-        # For weekly reports, we group by week
-        week_data = {}
-        
-        for order in orders:
-            order_date = order["created_at"].date()
-            week_num = order_date.isocalendar()[1]
-            week_year = order_date.year
-            week_key = f"{week_year}-{week_num}"
-            
-            if week_key not in week_data:
-                week_data[week_key] = {
-                    "date": datetime.combine(order_date, datetime.min.time()),
-                    "orders_count": 0,
-                    "items_sold": 0
-                }
-            
-            week_data[week_key]["orders_count"] += 1
-            week_data[week_key]["items_sold"] += sum(item["quantity"] for item in order["items"])
-        
-        # Convert to list and sort by date
-        data_points = sorted(week_data.values(), key=lambda x: x["date"])
-    
-    elif time_frame == ReportTimeFrame.MONTHLY:
-        # For monthly reports, we group by month
-        month_data = {}
-        
-        for order in orders:
-            order_date = order["created_at"].date()
-            month_key = f"{order_date.year}-{order_date.month}"
-            
-            if month_key not in month_data:
-                month_data[month_key] = {
-                    "date": datetime(order_date.year, order_date.month, 1),
-                    "orders_count": 0,
-                    "items_sold": 0
-                }
-            
-            month_data[month_key]["orders_count"] += 1
-            month_data[month_key]["items_sold"] += sum(item["quantity"] for item in order["items"])
-        
-        # Convert to list and sort by date
-        data_points = sorted(month_data.values(), key=lambda x: x["date"])
-    
-    elif time_frame == ReportTimeFrame.YEARLY:
-        # For yearly reports, we group by year
-        year_data = {}
-        
-        for order in orders:
-            order_date = order["created_at"].date()
-            year_key = str(order_date.year)
-            
-            if year_key not in year_data:
-                year_data[year_key] = {
-                    "date": datetime(order_date.year, 1, 1),
-                    "orders_count": 0,
-                    "items_sold": 0
-                }
-            
-            year_data[year_key]["orders_count"] += 1
-            year_data[year_key]["items_sold"] += sum(item["quantity"] for item in order["items"])
-        
-        # Convert to list and sort by date
-        data_points = sorted(year_data.values(), key=lambda x: x["date"])
-    
-    # Create and return report
-    return SalesReport(
-        time_frame=time_frame,
-        start_date=start,
-        end_date=end,
-        total_orders=total_orders,
-        total_items_sold=total_items_sold,
-        data=data_points
-    )
+    # Create, cache and return report
+    report = build_sales_report(time_frame, start, end, rows)
+    report_cache.set("sales", user_id, time_frame, start, end, report, version=cache_version)
+    return report
 
 async def generate_revenue_report(
     user_id: str,
@@ -190,141 +595,268 @@ async def generate_revenue_report(
     # Get date range
     start, end = get_date_range(time_frame, start_date, end_date)
     
-    # Convert to datetime for query
+    # Serve repeated requests for the same range from the cache
+    cached_report = report_cache.get("revenue", user_id, time_frame, start, end)
+    if cached_report is not None:
+        return cached_report
+    
+    # Group orders by time frame
+    cache_version = report_cache.version(user_id)
+    rows = await compute_report_rows(user_id, time_frame, start, end)
+    
+    # Create, cache and return report
+    report = build_revenue_report(time_frame, start, end, rows)
+    report_cache.set("revenue", user_id, time_frame, start, end, report, version=cache_version)
+    return report
+
+# Category assigned to order items created before categories were stamped
+UNCATEGORIZED = "uncategorized"
+
+def build_category_pipeline(
+    user_id: str,
+    start_datetime: datetime,
+    end_datetime: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Build an aggregation pipeline that totals order items per menu category.
+    
+    Relies on the category stamped into each order item at creation time,
+    so no lookup against menu_items is needed.
+    """
+    return [
+        {"$match": {
+            "user_id": user_id,
+            "created_at": {
+                "$gte": start_datetime,
+                "$lte": end_datetime
+            }
+        }},
+        {"$unwind": "$items"},
+        {"$group": {
+            "_id": {"$ifNull": ["$items.category", UNCATEGORIZED]},
+            "items_sold": {"$sum": "$items.quantity"},
+            "revenue": {"$sum": "$items.subtotal"}
+        }},
+        {"$sort": {"revenue": -1, "_id": 1}}
+    ]
+
+async def generate_category_report(
+    user_id: str,
+    time_frame: ReportTimeFrame,
+    start_date: date,
+    end_date: Optional[date] = None
+) -> CategorySalesReport:
+    """
+    Generate a category-wise sales report.
+    
+    Args:
+        user_id: The user's ID
+        time_frame: The time frame (daily, weekly, monthly, yearly)
+        start_date: The start date
+        end_date: The end date (optional)
+        
+    Returns:
+        CategorySalesReport: The category sales report
+    """
+    if db.orders is None:
+        # Return empty report if DB not initialized
+        return CategorySalesReport(
+            time_frame=time_frame,
+            start_date=start_date,
+            end_date=end_date or start_date,
+            data=[]
+        )
+    
+    # Get date range
+    start, end = get_date_range(time_frame, start_date, end_date)
+    
+    # Serve repeated requests for the same range from the cache
+    cached_report = report_cache.get("categories", user_id, time_frame, start, end)
+    if cached_report is not None:
+        return cached_report
+    
+    # Group order items by category on the database server
+    cache_version = report_cache.version(user_id)
     start_datetime = datetime.combine(start, datetime.min.time())
     end_datetime = datetime.combine(end, datetime.max.time())
+    pipeline = build_category_pipeline(user_id, start_datetime, end_datetime)
+    categories = await db.orders.aggregate(pipeline).to_list(length=None)
     
-    # Query orders within date range
-    orders = await db.orders.find({
-        "user_id": user_id,
-        "created_at": {
-            "$gte": start_datetime,
-            "$lte": end_datetime
+    # Add the per-day category totals of archived orders in the range
+    archived = await _aggregate_archive(user_id, start_datetime, end_datetime, [
+        {"$unwind": "$categories"},
+        {"$group": {
+            "_id": {"$ifNull": ["$categories.category", UNCATEGORIZED]},
+            "items_sold": {"$sum": "$categories.items_sold"},
+            "revenue": {"$sum": "$categories.revenue"}
+        }}
+    ])
+    if archived:
+        categories = _merge_groups(categories, archived)
+        categories.sort(key=lambda category: (-category["revenue"], category["_id"]))
+    
+    total_revenue = sum(category["revenue"] for category in categories)
+    data = [
+        {
+            "category": category["_id"],
+            "items_sold": category["items_sold"],
+            "revenue": category["revenue"],
+            "percentage": round(category["revenue"] / total_revenue * 100, 2) if total_revenue else 0.0
         }
-    }).to_list(length=None)
+        for category in categories
+    ]
     
-    # Calculate totals
-    total_revenue = sum(order["subtotal"] for order in orders)
-    total_tax = sum(order["tax"] for order in orders)
-    total_discount = sum(order["discount"] for order in orders)
-    total_net_amount = sum(order["total"] for order in orders)
+    # Create, cache and return report
+    report = CategorySalesReport(
+        time_frame=time_frame,
+        start_date=start,
+        end_date=end,
+        data=data
+    )
+    report_cache.set("categories", user_id, time_frame, start, end, report, version=cache_version)
+    return report
+
+# Payment method reported for orders created before it was required
+UNKNOWN_PAYMENT_METHOD = "unknown"
+
+def build_summary_pipeline(
+    user_id: str,
+    time_frame: ReportTimeFrame,
+    start_datetime: datetime,
+    end_datetime: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Build a single aggregation that produces the time buckets together with
+    the payment method and status breakdowns.
     
-    # Group data by time frame
-    data_points = []
+    The orders are matched once and fanned out with $facet, so the range is
+    only read a single time.
+    """
+    match_stage, *bucket_stages = build_bucket_pipeline(user_id, time_frame, start_datetime, end_datetime)
     
-    if time_frame == ReportTimeFrame.DAILY:
-        # For daily reports, we show each day
-        current_date = start
-        while current_date <= end:
-            current_start = datetime.combine(current_date, datetime.min.time())
-            current_end = datetime.combine(current_date, datetime.max.time())
-            
-            # Filter orders for current day
-            day_orders = [o for o in orders if current_start <= o["created_at"] <= current_end]
-            
-            # Calculate data for current day
-            revenue = sum(order["subtotal"] for order in day_orders)
-            tax = sum(order["tax"] for order in day_orders)
-            discount = sum(order["discount"] for order in day_orders)
-            net_amount = sum(order["total"] for order in day_orders)
-            
-            # Add data point
-            data_points.append({
-                "date": current_start,
-                "revenue": revenue,
-                "tax": tax,
-                "discount": discount,
-                "net_amount": net_amount
-            })
-            
-            # Move to next day
-            current_date += timedelta(days=1)
+    breakdown_totals = {
+        "orders_count": {"$sum": 1},
+        "net_amount": {"$sum": "$total"}
+    }
+    return [
+        match_stage,
+        {"$facet": {
+            "buckets": bucket_stages,
+            "payment_methods": [
+                {"$group": {"_id": {"$ifNull": ["$payment_method", UNKNOWN_PAYMENT_METHOD]}, **breakdown_totals}},
+                {"$sort": {"_id": 1}}
+            ],
+            "statuses": [
+                {"$group": {"_id": "$status", **breakdown_totals}},
+                {"$sort": {"_id": 1}}
+            ]
+        }}
+    ]
+
+async def generate_summary_report(
+    user_id: str,
+    time_frame: ReportTimeFrame,
+    start_date: date,
+    end_date: Optional[date] = None
+) -> SummaryReport:
+    """
+    Generate the sales and revenue series plus payment method and status
+    breakdowns from one aggregation over the orders.
     
-    elif time_frame == ReportTimeFrame.WEEKLY:
-        # For weekly reports, we group by week
-        week_data = {}
-        
-        for order in orders:
-            order_date = order["created_at"].date()
-            week_num = order_date.isocalendar()[1]
-            week_year = order_date.year
-            week_key = f"{week_year}-{week_num}"
-            
-            if week_key not in week_data:
-                week_data[week_key] = {
-                    "date": datetime.combine(order_date, datetime.min.time()),
-                    "revenue": 0,
-                    "tax": 0,
-                    "discount": 0,
-                    "net_amount": 0
-                }
-            
-            week_data[week_key]["revenue"] += order["subtotal"]
-            week_data[week_key]["tax"] += order["tax"]
-            week_data[week_key]["discount"] += order["discount"]
-            week_data[week_key]["net_amount"] += order["total"]
+    Args:
+        user_id: The user's ID
+        time_frame: The time frame (daily, weekly, monthly, yearly)
+        start_date: The start date
+        end_date: The end date (optional)
         
-        # Convert to list and sort by date
-        data_points = sorted(week_data.values(), key=lambda x: x["date"])
+    Returns:
+        SummaryReport: The summary report
+    """
+    if db.orders is None:
+        # Return empty report if DB not initialized
+        return SummaryReport(
+            time_frame=time_frame,
+            start_date=start_date,
+            end_date=end_date or start_date,
+            total_orders=0,
+            total_items_sold=0,
+            total_revenue=0,
+            total_tax=0,
+            total_discount=0,
+            total_net_amount=0,
+            sales=[],
+            revenue=[],
+            payment_methods=[],
+            statuses=[]
+        )
     
-    elif time_frame == ReportTimeFrame.MONTHLY:
-        # For monthly reports, we group by month
-        month_data = {}
-        
-        for order in orders:
-            order_date = order["created_at"].date()
-            month_key = f"{order_date.year}-{order_date.month}"
-            
-            if month_key not in month_data:
-                month_data[month_key] = {
-                    "date": datetime(order_date.year, order_date.month, 1),
-                    "revenue": 0,
-                    "tax": 0,
-                    "discount": 0,
-                    "net_amount": 0
-                }
-            
-            month_data[month_key]["revenue"] += order["subtotal"]
-            month_data[month_key]["tax"] += order["tax"]
-            month_data[month_key]["discount"] += order["discount"]
-            month_data[month_key]["net_amount"] += order["total"]
-        
-        # Convert to list and sort by date
-        data_points = sorted(month_data.values(), key=lambda x: x["date"])
+    # Get date range
+    start, end = get_date_range(time_frame, start_date, end_date)
     
-    elif time_frame == ReportTimeFrame.YEARLY:
-        # For yearly reports, we group by year
-        year_data = {}
-        
-        for order in orders:
-            order_date = order["created_at"].date()
-            year_key = str(order_date.year)
-            
-            if year_key not in year_data:
-                year_data[year_key] = {
-                    "date": datetime(order_date.year, 1, 1),
-                    "revenue": 0,
-                    "tax": 0,
-                    "discount": 0,
-                    "net_amount": 0
-                }
-            
-            year_data[year_key]["revenue"] += order["subtotal"]
-            year_data[year_key]["tax"] += order["tax"]
-            year_data[year_key]["discount"] += order["discount"]
-            year_data[year_key]["net_amount"] += order["total"]
-        
-        # Convert to list and sort by date
-        data_points = sorted(year_data.values(), key=lambda x: x["date"])
+    # Serve repeated requests for the same range from the cache
+    cached_report = report_cache.get("summary", user_id, time_frame, start, end)
+    if cached_report is not None:
+        return cached_report
     
-    # Create and return report
-    return RevenueReport(
+    # Run the bucket and breakdown groupings over a single match
+    cache_version = report_cache.version(user_id)
+    start_datetime = datetime.combine(start, datetime.min.time())
+    end_datetime = datetime.combine(end, datetime.max.time())
+    pipeline = build_summary_pipeline(user_id, time_frame, start_datetime, end_datetime)
+    result = await db.orders.aggregate(pipeline).to_list(length=None)
+    facets = result[0] if result else {"buckets": [], "payment_methods": [], "statuses": []}
+    
+    # Fold the per-day totals of archived orders in the range into each facet
+    archived = await _aggregate_archive(user_id, start_datetime, end_datetime, [
+        {"$facet": {
+            "buckets": _archived_bucket_stages(time_frame),
+            "payment_methods": _archived_breakdown_stages("payment_methods", "payment_method", UNKNOWN_PAYMENT_METHOD),
+            "statuses": _archived_breakdown_stages("statuses", "status")
+        }}
+    ])
+    if archived:
+        archived_facets = archived[0]
+        facets["buckets"] = _merge_groups(facets["buckets"], archived_facets["buckets"])
+        for facet in ("payment_methods", "statuses"):
+            facets[facet] = sorted(
+                _merge_groups(facets[facet], archived_facets[facet]),
+                # Same order as $sort, where a missing value sorts first
+                key=lambda entry: (entry["_id"] is not None, entry["_id"] or "")
+            )
+    
+    rows = _rows_from_buckets(time_frame, start, end, facets["buckets"])
+    sales = build_sales_report(time_frame, start, end, rows)
+    revenue = build_revenue_report(time_frame, start, end, rows)
+    
+    # Create, cache and return report
+    report = SummaryReport(
         time_frame=time_frame,
         start_date=start,
         end_date=end,
-        total_revenue=total_revenue,
-        total_tax=total_tax,
-        total_discount=total_discount,
-        total_net_amount=total_net_amount,
-        data=data_points
+        total_orders=sales.total_orders,
+        total_items_sold=sales.total_items_sold,
+        total_revenue=revenue.total_revenue,
+        total_tax=revenue.total_tax,
+        total_discount=revenue.total_discount,
+        total_net_amount=revenue.total_net_amount,
+        sales=sales.data,
+        revenue=revenue.data,
+        payment_methods=[
+            {
+                "payment_method": entry["_id"],
+                "orders_count": entry["orders_count"],
+                "net_amount": entry["net_amount"]
+            }
+            for entry in facets["payment_methods"]
+        ],
+        statuses=[
+            {
+                "status": entry["_id"],
+                "orders_count": entry["orders_count"],
+                "net_amount": entry["net_amount"]
+            }
+            for entry in facets["statuses"]
+        ]
     )
+    report_cache.set("summary", user_id, time_frame, start, end, report, version=cache_version)
+    return report
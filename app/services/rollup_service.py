@@ -0,0 +1,280 @@
+from app.db.connection import db
+from pymongo import ReplaceOne, UpdateOne
+from datetime import datetime, date
+from typing import Optional, Dict, Any, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Counters kept on every (user_id, day) rollup document
+ROLLUP_FIELDS = ("orders_count", "items_sold", "subtotal", "tax", "discount", "total")
+
+# Money totals are floats, so allow for rounding when comparing
+DRIFT_TOLERANCE = 0.005
+
+def order_day(created_at: datetime) -> datetime:
+    """
+    Get the rollup day (midnight) an order timestamp belongs to.
+    """
+    return datetime.combine(created_at.date(), datetime.min.time())
+
+def order_rollup_values(order: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the contribution of a single order to its daily rollup.
+
+    Args:
+        order: The order document
+
+    Returns:
+        dict: The value of each rollup counter for this order
+    """
+    return {
+        "orders_count": 1,
+        "items_sold": sum(item["quantity"] for item in order["items"]),
+        "subtotal": order["subtotal"],
+        "tax": order["tax"],
+        "discount": order["discount"],
+        "total": order["total"]
+    }
+
+async def _apply_delta(user_id: str, day: datetime, delta: Dict[str, Any]) -> None:
+    """
+    Atomically add a delta to a daily rollup, creating it if needed.
+    """
+    if not any(delta.values()):
+        return
+
+    try:
+        await db.order_daily_rollups.update_one(
+            {"user_id": user_id, "day": day},
+            {"$inc": delta},
+            upsert=True
+        )
+    except Exception as e:
+        # The order write already succeeded; verify/rebuild will repair the drift
+        logger.error(f"Failed to update daily rollup for {user_id} on {day.date()}: {str(e)}")
+
+async def record_order_created(order: Dict[str, Any]) -> None:
+    """
+    Add a newly created order to its daily rollup.
+    """
+    if db.order_daily_rollups is None:
+        return
+
+    await _apply_delta(order["user_id"], order_day(order["created_at"]), order_rollup_values(order))
+
+async def record_orders_created(orders: List[Dict[str, Any]]) -> None:
+    """
+    Add a batch of newly created orders to their daily rollups.
+
+    Orders are summed per (user_id, day) first, so a batch costs one
+    bulk write no matter how many orders it holds.
+    """
+    if db.order_daily_rollups is None or not orders:
+        return
+
+    deltas = {}
+    for order in orders:
+        key = (order["user_id"], order_day(order["created_at"]))
+        delta = deltas.setdefault(key, {field: 0 for field in ROLLUP_FIELDS})
+        for field, value in order_rollup_values(order).items():
+            delta[field] += value
+
+    operations = [
+        UpdateOne({"user_id": user_id, "day": day}, {"$inc": delta}, upsert=True)
+        for (user_id, day), delta in deltas.items()
+    ]
+    try:
+        await db.order_daily_rollups.bulk_write(operations, ordered=False)
+    except Exception as e:
+        # The orders are already stored; verify/rebuild will repair the drift
+        logger.error(f"Failed to update daily rollups for {len(orders)} orders: {str(e)}")
+
+async def record_order_deleted(order: Dict[str, Any]) -> None:
+    """
+    Remove a deleted order from its daily rollup.
+    """
+    if db.order_daily_rollups is None:
+        return
+
+    values = order_rollup_values(order)
+    delta = {field: -value for field, value in values.items()}
+    await _apply_delta(order["user_id"], order_day(order["created_at"]), delta)
+
+async def record_order_updated(before: Dict[str, Any], after: Dict[str, Any]) -> None:
+    """
+    Apply the difference between two versions of an order to the rollups.
+    """
+    if db.order_daily_rollups is None:
+        return
+
+    before_day = order_day(before["created_at"])
+    after_day = order_day(after["created_at"])
+
+    if before_day != after_day:
+        await record_order_deleted(before)
+        await record_order_created(after)
+        return
+
+    before_values = order_rollup_values(before)
+    after_values = order_rollup_values(after)
+    delta = {field: after_values[field] - before_values[field] for field in ROLLUP_FIELDS}
+    await _apply_delta(after["user_id"], after_day, delta)
+
+async def get_daily_rollups(user_id: str, start: date, end: date) -> List[Dict[str, Any]]:
+    """
+    Get the non-empty daily rollups for a user in a date range.
+
+    Args:
+        user_id: The user's ID
+        start: The start date
+        end: The end date (inclusive)
+
+    Returns:
+        List[dict]: Rollup documents sorted by day
+    """
+    if db.order_daily_rollups is None:
+        return []
+
+    cursor = db.order_daily_rollups.find(
+        {
+            "user_id": user_id,
+            "day": {
+                "$gte": datetime.combine(start, datetime.min.time()),
+                "$lte": datetime.combine(end, datetime.min.time())
+            },
+            "orders_count": {"$gt": 0}
+        },
+        {"_id": 0, "user_id": 0}
+    ).sort("day", 1)
+    return await cursor.to_list(length=None)
+
+async def compute_rollups_from_orders(user_id: Optional[str] = None) -> Dict[Tuple[str, datetime], Dict[str, Any]]:
+    """
+    Recompute daily rollups from the raw orders collection plus the per-day
+    totals stored on the archive buckets, since archived orders still count.
+
+    Args:
+        user_id: Restrict to a single user (optional)
+
+    Returns:
+        dict: Rollup counters keyed by (user_id, day)
+    """
+    match = {"user_id": user_id} if user_id else {}
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "user_id": "$user_id",
+                "day": {"$dateFromParts": {
+                    "year": {"$year": "$created_at"},
+                    "month": {"$month": "$created_at"},
+                    "day": {"$dayOfMonth": "$created_at"}
+                }}
+            },
+            "orders_count": {"$sum": 1},
+            "items_sold": {"$sum": {"$sum": "$items.quantity"}},
+            "subtotal": {"$sum": "$subtotal"},
+            "tax": {"$sum": "$tax"},
+            "discount": {"$sum": "$discount"},
+            "total": {"$sum": "$total"}
+        }}
+    ]
+
+    expected = {}
+    async for bucket in db.orders.aggregate(pipeline):
+        key = (bucket["_id"]["user_id"], bucket["_id"]["day"])
+        expected[key] = {field: bucket[field] for field in ROLLUP_FIELDS}
+
+    if db.order_archive is None:
+        return expected
+
+    # A day can be split over several buckets when a month outgrows one
+    archive_pipeline = [
+        {"$match": match},
+        {"$unwind": "$days"},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "day": "$days.day"},
+            **{field: {"$sum": f"$days.{field}"} for field in ROLLUP_FIELDS}
+        }}
+    ]
+    async for bucket in db.order_archive.aggregate(archive_pipeline):
+        key = (bucket["_id"]["user_id"], bucket["_id"]["day"])
+        values = expected.setdefault(key, {field: 0 for field in ROLLUP_FIELDS})
+        for field in ROLLUP_FIELDS:
+            values[field] += bucket[field]
+    return expected
+
+async def _load_rollups(user_id: Optional[str] = None) -> Dict[Tuple[str, datetime], Dict[str, Any]]:
+    query = {"user_id": user_id} if user_id else {}
+    stored = {}
+    async for doc in db.order_daily_rollups.find(query, {"_id": 0}):
+        stored[(doc["user_id"], doc["day"])] = {field: doc.get(field, 0) for field in ROLLUP_FIELDS}
+    return stored
+
+def _differs(expected: Dict[str, Any], actual: Dict[str, Any]) -> bool:
+    return any(abs(expected[field] - actual[field]) > DRIFT_TOLERANCE for field in ROLLUP_FIELDS)
+
+async def verify_rollups(user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Compare stored rollups against the raw and archived orders.
+
+    Args:
+        user_id: Restrict to a single user (optional)
+
+    Returns:
+        List[dict]: One entry per drifted (user_id, day) with expected and
+        actual counters
+    """
+    expected = await compute_rollups_from_orders(user_id)
+    stored = await _load_rollups(user_id)
+    empty = {field: 0 for field in ROLLUP_FIELDS}
+
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        expected_values = expected.get(key, empty)
+        actual_values = stored.get(key, empty)
+        if _differs(expected_values, actual_values):
+            drift.append({
+                "user_id": key[0],
+                "day": key[1],
+                "expected": expected_values,
+                "actual": actual_values
+            })
+    return drift
+
+async def rebuild_rollups(user_id: Optional[str] = None) -> Dict[str, int]:
+    """
+    Recompute rollups from the raw and archived orders and overwrite the
+    stored ones.
+
+    Writes that land while the rebuild runs may be lost, so run it while
+    order traffic is quiet and follow up with verify_rollups.
+
+    Args:
+        user_id: Restrict to a single user (optional)
+
+    Returns:
+        dict: Number of rollup documents written and removed
+    """
+    expected = await compute_rollups_from_orders(user_id)
+
+    operations = [
+        ReplaceOne(
+            {"user_id": key[0], "day": key[1]},
+            {"user_id": key[0], "day": key[1], **values},
+            upsert=True
+        )
+        for key, values in expected.items()
+    ]
+    if operations:
+        await db.order_daily_rollups.bulk_write(operations, ordered=False)
+
+    # Remove rollups for days that no longer have any orders
+    removed = 0
+    stored = await _load_rollups(user_id)
+    for stale_user_id, stale_day in set(stored) - set(expected):
+        result = await db.order_daily_rollups.delete_one({"user_id": stale_user_id, "day": stale_day})
+        removed += result.deleted_count
+
+    return {"written": len(operations), "removed": removed}
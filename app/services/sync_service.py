@@ -0,0 +1,105 @@
+from app.db.connection import db
+from app.core.config import settings
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Collections that POS clients can sync incrementally
+SYNC_ORDERS = "orders"
+SYNC_MENU_ITEMS = "menu_items"
+
+async def record_deletion(user_id: str, collection: str, document_id: Any) -> None:
+    """
+    Leave a tombstone for a deleted document so syncing clients drop it.
+
+    Tombstones expire after SYNC_TOMBSTONE_RETENTION_DAYS. The document is
+    already gone when this runs, so a failed write is logged rather than
+    raised and the rest of the delete still happens.
+    """
+    if db.deletions is None:
+        return
+
+    try:
+        await db.deletions.insert_one({
+            "user_id": user_id,
+            "collection": collection,
+            "document_id": str(document_id),
+            "deleted_at": datetime.utcnow()
+        })
+    except Exception as e:
+        # Clients syncing by delta keep the document until their next full resync
+        logger.error(f"Failed to record deletion of {collection} {document_id} for {user_id}: {str(e)}")
+
+def build_changes_query(user_id: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Build the query for a user's documents written in (since, until], or
+    every document of the user for a full resync when since is None.
+    Results are sorted by updated_at.
+    """
+    query = {"user_id": user_id}
+    if since is not None:
+        query["updated_at"] = {"$gt": since, "$lte": until}
+    return query
+
+def build_tombstones_query(user_id: str, collection: str, since: datetime, until: datetime) -> Dict[str, Any]:
+    """
+    Build the query for the tombstones a user's collection left in (since, until].
+    """
+    return {
+        "user_id": user_id,
+        "collection": collection,
+        "deleted_at": {"$gt": since, "$lte": until}
+    }
+
+async def get_changes(user_id: str, collection: str, since: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Get what changed in a user's collection since a client's watermark.
+
+    Documents written in the last SYNC_SETTLE_SECONDS are left for the next
+    sync, so writes still in flight on other workers aren't skipped. The
+    returned watermark is where the next sync should continue from.
+
+    Without a watermark, or with one older than the tombstone retention,
+    every document is returned and the client should replace its copy.
+
+    Args:
+        user_id: The user's ID
+        collection: SYNC_ORDERS or SYNC_MENU_ITEMS
+        since: The watermark returned by the previous sync (optional)
+
+    Returns:
+        dict: changed documents, deleted document IDs, the new watermark,
+        and full (True if this is a full resync)
+    """
+    if since is not None and since.tzinfo is not None:
+        # Stored timestamps are naive UTC
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    now = datetime.utcnow()
+    watermark = now - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    full = since is None or since < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    if db.db is None:
+        return {"changed": [], "deleted": [], "watermark": since or watermark, "full": False}
+
+    query = build_changes_query(user_id, None if full else since, watermark)
+
+    documents = db.db[collection]
+    changed = await documents.find(query).sort("updated_at", 1).to_list(length=None)
+
+    deleted: List[str] = []
+    if not full:
+        cursor = db.deletions.find(
+            build_tombstones_query(user_id, collection, since, watermark),
+            {"document_id": 1}
+        )
+        deleted = [tombstone["document_id"] async for tombstone in cursor]
+
+    return {
+        "changed": changed,
+        "deleted": deleted,
+        "watermark": watermark,
+        "full": full
+    }
@@ -1,6 +1,7 @@
 from app.db.connection import db
 from app.core.security import get_password_hash
 from bson import ObjectId
+from pymongo import ReturnDocument
 from app.schemas.user import UserCreate, UserProfileUpdate
 from datetime import datetime
 from typing import Optional, Dict, Any
@@ -60,9 +61,9 @@ async def create_user(user_data: UserCreate) -> Dict[str, Any]:
     # Insert user
     result = await db.users.insert_one(user_doc)
     
-    # Get the inserted user
-    user = await db.users.find_one({"_id": result.inserted_id})
-    return user
+    # The inserted document is the user; no need to read it back
+    user_doc["_id"] = result.inserted_id
+    return user_doc
 
 async def update_user_profile(user_id: str, profile_data: UserProfileUpdate) -> Optional[Dict[str, Any]]:
     """
@@ -90,14 +91,12 @@ async def update_user_profile(user_id: str, profile_data: UserProfileUpdate) ->
         # Add updated_at timestamp
         update_data["updated_at"] = datetime.utcnow()
         
-        # Update user
-        await db.users.update_one(
+        # Update user and get the new version in the same round trip
+        updated_user = await db.users.find_one_and_update(
             {"_id": user_id_obj},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
-        
-        # Get the updated user
-        updated_user = await db.users.find_one({"_id": user_id_obj})
         return updated_user
     except Exception:
         return None
@@ -119,31 +118,28 @@ async def update_profile_image(user_id: str, file: UploadFile) -> Optional[Dict[
     try:
         user_id_obj = ObjectId(user_id)
         
-        # Get the current user
-        user = await db.users.find_one({"_id": user_id_obj})
-        if not user:
-            return None
-        
-        # Delete old image if exists
-        if user.get("profile_image"):
-            delete_file(user["profile_image"])
-        
-        # Save new image
-        file_path = await save_upload_file(file, "profile")
+        # Save new image; each user gets a folder so uploads are only
+        # deduplicated within a tenant
+        file_path = await save_upload_file(file, f"profile/{user_id}")
         
-        # Update user profile with new image
-        await db.users.update_one(
+        # Point the profile at the new image, getting the previous version back
+        update_data = {
+            "profile_image": file_path,
+            "updated_at": datetime.utcnow()
+        }
+        previous_user = await db.users.find_one_and_update(
             {"_id": user_id_obj},
-            {
-                "$set": {
-                    "profile_image": file_path,
-                    "updated_at": datetime.utcnow()
-                }
-            }
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE
         )
+        if not previous_user:
+            await delete_file(file_path)
+            return None
         
-        # Get the updated user
-        updated_user = await db.users.find_one({"_id": user_id_obj})
-        return updated_user
+        # Delete old image if exists
+        if previous_user.get("profile_image"):
+            await delete_file(previous_user["profile_image"])
+        
+        return {**previous_user, **update_data}
     except Exception:
         return None
@@ -0,0 +1,33 @@
+import hashlib
+from typing import Optional
+
+def make_etag(*parts: str) -> str:
+    """
+    Build a strong ETag from the values a response depends on.
+
+    Args:
+        parts: Strings that change whenever the response body changes
+
+    Returns:
+        str: The quoted ETag
+    """
+    digest = hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against the current ETag.
+
+    Uses the weak comparison required for If-None-Match, so W/ prefixes
+    added by proxies are ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+from datetime import datetime, date
+from enum import Enum
+from typing import AsyncIterator, Dict, Any
+from bson import ObjectId
+
+# Columns of the order CSV export, one row per order
+ORDER_CSV_COLUMNS = [
+    "order_id",
+    "order_number",
+    "created_at",
+    "table_number",
+    "status",
+    "payment_status",
+    "payment_method",
+    "items_count",
+    "subtotal",
+    "tax",
+    "discount",
+    "total",
+    "notes"
+]
+
+# Fields needed to build a CSV row
+ORDER_CSV_PROJECTION = {
+    "order_number": 1,
+    "created_at": 1,
+    "table_number": 1,
+    "status": 1,
+    "payment_status": 1,
+    "payment_method": 1,
+    "items.quantity": 1,
+    "subtotal": 1,
+    "tax": 1,
+    "discount": 1,
+    "total": 1,
+    "notes": 1
+}
+
+# Number of rows serialized before a chunk is sent to the client
+ROWS_PER_CHUNK = 200
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def order_to_csv_row(order: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten an order document into a CSV row.
+    """
+    return {
+        "order_id": str(order["_id"]),
+        "order_number": order.get("order_number"),
+        "created_at": _plain(order.get("created_at")),
+        "table_number": order.get("table_number"),
+        "status": _plain(order.get("status")),
+        "payment_status": _plain(order.get("payment_status")),
+        "payment_method": _plain(order.get("payment_method")),
+        "items_count": sum(item.get("quantity", 0) for item in order.get("items", [])),
+        "subtotal": order.get("subtotal"),
+        "tax": order.get("tax"),
+        "discount": order.get("discount"),
+        "total": order.get("total"),
+        "notes": order.get("notes")
+    }
+
+async def stream_orders_csv(orders: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """
+    Serialize a stream of orders as CSV text chunks, header first.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=ORDER_CSV_COLUMNS)
+    writer.writeheader()
+
+    rows = 0
+    async for order in orders:
+        writer.writerow(order_to_csv_row(order))
+        rows += 1
+        if rows % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue()
+
+async def stream_orders_ndjson(orders: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """
+    Serialize a stream of orders as newline-delimited JSON chunks.
+    """
+    lines = []
+    async for order in orders:
+        lines.append(json.dumps(order, default=_json_default))
+        if len(lines) == ROWS_PER_CHUNK:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
@@ -0,0 +1,82 @@
+import os
+import stat
+from fastapi.concurrency import run_in_threadpool
+from typing import AsyncIterator, Optional, Tuple
+
+# Bytes read from a file at a time when streaming part of it
+FILE_CHUNK_SIZE = 64 * 1024
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header against a file's size.
+
+    Only a single byte range is served partially. Headers that are
+    malformed, use another unit or ask for several ranges are ignored, so
+    the whole file is sent as RFC 9110 allows.
+
+    Args:
+        range_header: The Range header, if any
+        size: The file size in bytes
+
+    Returns:
+        tuple: The first and last byte offsets (inclusive), or None to send
+        the whole file
+
+    Raises:
+        ValueError: If the range lies entirely past the end of the file
+    """
+    if not range_header:
+        return None
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    first, dash, last = ranges.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if not dash or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+async def iter_file_range(file_path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    """
+    Stream bytes start..end (inclusive) of a file, reading in the thread
+    pool so the event loop never waits on the disk.
+    """
+    file = await run_in_threadpool(open, file_path, "rb")
+    try:
+        await run_in_threadpool(file.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await run_in_threadpool(file.read, min(FILE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await run_in_threadpool(file.close)
+
+def stat_file(file_path: str) -> Optional[os.stat_result]:
+    """
+    Stat a regular file, returning None if it is missing or not a file.
+    """
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(stat_result.st_mode):
+        return None
+    return stat_result
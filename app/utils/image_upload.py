@@ -1,62 +1,215 @@
+import asyncio
+import hashlib
 import os
-import shutil
+import re
+import tempfile
+from datetime import datetime, timedelta
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
+from typing import Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.core.config import settings
-import uuid
+from app.db.connection import db
+from app.utils.image_variants import remove_variants
+
+# Bytes read from an upload at a time
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Stored images are named after the SHA-256 of their contents
+_CONTENT_ADDRESSED_NAME = re.compile(r"^([0-9a-f]{64})(\.[^.]*)?$")
+
+# How often, and how long apart, an upload retries while the file it
+# would share is being deleted
+IMAGE_REF_RETRIES = 20
+IMAGE_REF_RETRY_DELAY = 0.05
+
+# A deletion that hasn't finished after this long is taken to have died
+IMAGE_REF_STALE_SECONDS = 60
+
+def content_digest(file_path: str) -> Optional[str]:
+    """
+    Get the SHA-256 a stored file is named after.
+
+    Returns:
+        str: The hex digest, or None for files saved before uploads were
+        deduplicated, which have uuid4 names
+    """
+    match = _CONTENT_ADDRESSED_NAME.match(Path(file_path).name)
+    return match.group(1) if match else None
+
+def _write_chunk(temp_file, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    temp_file.write(chunk)
+
+def _discard_temp_file(temp_file, temp_path: str) -> None:
+    temp_file.close()
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+def _store_temp_file(temp_file, temp_path: str, file_path: Path) -> None:
+    if file_path.exists():
+        # Identical bytes are already stored
+        _discard_temp_file(temp_file, temp_path)
+        return
+    temp_file.flush()
+    os.fsync(temp_file.fileno())
+    temp_file.close()
+    # mkstemp creates files readable by the owner only
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, file_path)
+
+def _remove_file(file_path: str) -> bool:
+    full_path = Path(settings.UPLOAD_DIR) / file_path
+    if os.path.exists(full_path):
+        os.remove(full_path)
+        remove_variants(file_path)
+        return True
+    return False
+
+async def _add_image_ref(file_path: str) -> None:
+    """
+    Count one more reference to a stored image.
+
+    An entry locked by a deletion in progress can't be reused until the
+    deletion finishes, so the file isn't removed from under the upload.
+
+    Raises:
+        HTTPException: 503 if the image stays locked
+    """
+    for _ in range(IMAGE_REF_RETRIES):
+        now = datetime.utcnow()
+        try:
+            await db.image_refs.update_one(
+                {
+                    "_id": file_path,
+                    "$or": [
+                        {"deleting_at": {"$exists": False}},
+                        {"deleting_at": {"$lt": now - timedelta(seconds=IMAGE_REF_STALE_SECONDS)}}
+                    ]
+                },
+                {
+                    "$inc": {"refs": 1},
+                    "$set": {"updated_at": now},
+                    "$unset": {"deleting_at": ""},
+                    "$setOnInsert": {"created_at": now}
+                },
+                upsert=True
+            )
+            return
+        except DuplicateKeyError:
+            # The entry exists but is locked for deletion
+            await asyncio.sleep(IMAGE_REF_RETRY_DELAY)
+    raise HTTPException(status_code=503, detail="Image is busy, please retry")
 
 async def save_upload_file(upload_file: UploadFile, folder: str = "profile") -> str:
     """
     Save an uploaded file to disk.
     
+    The upload is streamed in UPLOAD_CHUNK_SIZE chunks to a temporary file
+    that is renamed into place once complete, so at most one chunk is held
+    in memory and a partial file is never visible. Disk writes run in the
+    thread pool to keep the event loop free.
+    
+    Files are named after the SHA-256 of their contents, so identical
+    uploads to the same folder share one file. Each save counts a reference in the image_refs
+    collection; release it with delete_file.
+    
     Args:
         upload_file: The file to save
-        folder: The subfolder to save in (e.g., 'profile', 'menu')
+        folder: The subfolder to save in (e.g., 'menu/<user_id>')
         
     Returns:
         str: The path to the saved file
+        
+    Raises:
+        HTTPException: 413 as soon as the upload exceeds MAX_UPLOAD_SIZE
     """
+    # Reject uploads whose declared size is already too large
+    declared_size = getattr(upload_file, "size", None)
+    if declared_size is not None and declared_size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+    
     # Ensure the upload directory exists
     upload_dir = Path(settings.UPLOAD_DIR) / folder
-    os.makedirs(upload_dir, exist_ok=True)
+    await run_in_threadpool(os.makedirs, upload_dir, exist_ok=True)
     
-    # Get file content
-    content = await upload_file.read()
+    file_extension = os.path.splitext(upload_file.filename or "")[1].lower()
     
-    # Check file size
-    if len(content) > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(status_code=413, detail="File too large")
-    
-    # Generate a unique filename
-    file_extension = os.path.splitext(upload_file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = upload_dir / unique_filename
+    # Write to a temporary file in the same directory so the rename is atomic
+    descriptor, temp_path = await run_in_threadpool(
+        tempfile.mkstemp, dir=upload_dir, prefix=".upload-", suffix=".part"
+    )
+    temp_file = os.fdopen(descriptor, "wb")
+    try:
+        hasher = hashlib.sha256()
+        size = 0
+        while True:
+            chunk = await upload_file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > settings.MAX_UPLOAD_SIZE:
+                raise HTTPException(status_code=413, detail="File too large")
+            await run_in_threadpool(_write_chunk, temp_file, hasher, chunk)
+        
+        # The relative path to be stored in the database
+        file_path = str(Path(folder) / f"{hasher.hexdigest()}{file_extension}")
+        if db.image_refs is not None:
+            await _add_image_ref(file_path)
+    except BaseException:
+        await run_in_threadpool(_discard_temp_file, temp_file, temp_path)
+        raise
     
-    # Write the file
-    with open(file_path, "wb") as f:
-        f.write(content)
+    try:
+        await run_in_threadpool(_store_temp_file, temp_file, temp_path, Path(settings.UPLOAD_DIR) / file_path)
+    except BaseException:
+        await run_in_threadpool(_discard_temp_file, temp_file, temp_path)
+        await delete_file(file_path)
+        raise
     
-    # Return the relative path to be stored in the database
-    return str(Path(folder) / unique_filename)
+    return file_path
 
-def delete_file(file_path: str) -> bool:
+async def delete_file(file_path: str) -> bool:
     """
-    Delete a file from disk.
+    Release a file saved by save_upload_file.
+    
+    The file is only removed from disk once nothing else references it.
+    Files saved before uploads were deduplicated are removed directly.
     
     Args:
         file_path: The path to the file to delete
         
     Returns:
-        bool: True if deletion was successful, False otherwise
+        bool: True if the file was removed from disk, False otherwise
     """
     try:
-        # Join with the upload dir
-        full_path = Path(settings.UPLOAD_DIR) / file_path
+        if content_digest(file_path) is None:
+            return await run_in_threadpool(_remove_file, file_path)
+        if db.image_refs is None:
+            # Without the counts the file can't safely be removed
+            return False
         
-        # Check if file exists
-        if os.path.exists(full_path):
-            os.remove(full_path)
-            return True
-        return False
+        now = datetime.utcnow()
+        ref = await db.image_refs.find_one_and_update(
+            {"_id": file_path, "refs": {"$gt": 0}},
+            {"$inc": {"refs": -1}, "$set": {"updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        if ref is None or ref["refs"] > 0:
+            return False
+        
+        # Last reference gone: lock the entry so no upload reuses the file
+        # while it is removed, then drop the entry to unlock it
+        locked = await db.image_refs.update_one(
+            {"_id": file_path, "refs": 0, "deleting_at": {"$exists": False}},
+            {"$set": {"deleting_at": now}}
+        )
+        if not locked.modified_count:
+            return False
+        removed = await run_in_threadpool(_remove_file, file_path)
+        await db.image_refs.delete_one({"_id": file_path, "refs": 0, "deleting_at": now})
+        return removed
     except Exception:
         return False
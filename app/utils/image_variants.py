@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from fastapi.concurrency import run_in_threadpool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    # Pillow is in requirements.txt; installs without it only serve the
+    # original images
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Derivative name -> longest side in pixels. Thumbnails are drawn at 80px,
+# so they are rendered at twice that for high-density screens.
+IMAGE_VARIANTS = {
+    "thumbnail": 160,
+    "medium": 640
+}
+IMAGE_VARIANT_QUALITY = 80  # WebP quality
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def variant_paths(file_path: str) -> Dict[str, str]:
+    """
+    Get where each derivative of a stored image is kept.
+
+    Derivatives sit next to the original and are named after it, so
+    deduplicated originals share their derivatives too.
+
+    Args:
+        file_path: The original's path relative to UPLOAD_DIR
+
+    Returns:
+        dict: Derivative name -> path relative to UPLOAD_DIR
+    """
+    path = Path(file_path)
+    return {name: str(path.with_name(f"{path.stem}.{name}.webp")) for name in IMAGE_VARIANTS}
+
+def remove_variants(file_path: str) -> None:
+    """
+    Delete the derivatives of a stored image from disk, if any.
+    """
+    for variant_path in variant_paths(file_path).values():
+        full_path = Path(settings.UPLOAD_DIR) / variant_path
+        if os.path.exists(full_path):
+            os.remove(full_path)
+
+def _render_variants(source_path: str, targets: List[Tuple[str, int]]) -> None:
+    """
+    Resize an image to each target. Runs in a worker process.
+
+    Args:
+        source_path: The original image on disk
+        targets: (output path, longest side) pairs
+    """
+    with Image.open(source_path) as image:
+        # Apply the camera's rotation before it is lost with the metadata
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.mode in ("LA", "PA", "P") else "RGB")
+        
+        for target_path, size in targets:
+            derivative = image.copy()
+            derivative.thumbnail((size, size), Image.LANCZOS)
+            
+            # Rename into place so a partial derivative is never served
+            descriptor, temp_path = tempfile.mkstemp(
+                dir=os.path.dirname(target_path), prefix=".variant-", suffix=".part"
+            )
+            try:
+                with os.fdopen(descriptor, "wb") as temp_file:
+                    derivative.save(temp_file, format="WEBP", quality=IMAGE_VARIANT_QUALITY, method=4)
+                os.chmod(temp_path, 0o644)
+                os.replace(temp_path, target_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned workers only import this module, not the running app
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+def _missing_targets(paths: Dict[str, str]) -> List[Tuple[str, int]]:
+    upload_dir = Path(settings.UPLOAD_DIR)
+    return [
+        (str(upload_dir / path), IMAGE_VARIANTS[name])
+        for name, path in paths.items()
+        if not (upload_dir / path).exists()
+    ]
+
+async def generate_variants(file_path: str) -> Optional[Dict[str, str]]:
+    """
+    Render the derivatives of a stored image in the process pool, so
+    resizing never holds up the event loop. Derivatives already on disk
+    are reused.
+
+    Args:
+        file_path: The original's path relative to UPLOAD_DIR
+
+    Returns:
+        dict: Derivative name -> path relative to UPLOAD_DIR, or None if
+        Pillow isn't installed, IMAGE_VARIANT_WORKERS is 0, or the image
+        couldn't be resized
+    """
+    if Image is None or settings.IMAGE_VARIANT_WORKERS <= 0:
+        return None
+    
+    paths = variant_paths(file_path)
+    targets = await run_in_threadpool(_missing_targets, paths)
+    if targets:
+        source_path = str(Path(settings.UPLOAD_DIR) / file_path)
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(_get_pool(), _render_variants, source_path, targets)
+        except Exception as e:
+            logger.warning(f"Could not create image variants for {file_path}: {str(e)}")
+            return None
+    return paths
+
+def shutdown_variant_pool() -> None:
+    """
+    Stop the worker processes, dropping derivatives not yet started.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+
+# Menu item fields read from an import file
+MENU_IMPORT_FIELDS = ("name", "price", "description", "category", "is_vegetarian", "is_available")
+
+def _clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keep the known fields of a row, dropping empty cells so that optional
+    fields fall back to their defaults.
+    """
+    cleaned = {}
+    for field in MENU_IMPORT_FIELDS:
+        value = row.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or (value == "" and field != "description"):
+            continue
+        cleaned[field] = value
+    return cleaned
+
+def iter_menu_csv(file: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """
+    Read menu rows from a CSV file with a header line, one row at a time.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        for row in csv.DictReader(text):
+            yield _clean_row({key.strip().lower(): value for key, value in row.items() if key})
+    finally:
+        # Leave the underlying upload open for its owner to close
+        text.detach()
+
+def iter_menu_json(file: BinaryIO) -> Iterator[Optional[Dict[str, Any]]]:
+    """
+    Read menu rows from a JSON array of objects. Elements that are not
+    objects are yielded as None.
+
+    Raises:
+        ValueError: If the file is not a JSON array
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig")
+    try:
+        rows = json.load(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e.msg} at line {e.lineno}")
+    finally:
+        text.detach()
+    if not isinstance(rows, list):
+        raise ValueError("JSON import must be an array of menu items")
+
+    for row in rows:
+        yield _clean_row(row) if isinstance(row, dict) else None
+
+def iter_menu_ndjson(file: BinaryIO) -> Iterator[Optional[Dict[str, Any]]]:
+    """
+    Read menu rows from newline-delimited JSON, one row at a time. Lines
+    that are not JSON objects are yielded as None.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig")
+    try:
+        for line in text:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield _clean_row(row) if isinstance(row, dict) else None
+    finally:
+        text.detach()
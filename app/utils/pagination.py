@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple, Dict, Any
+from bson import ObjectId
+
+# Page size used when a cursor is given without an explicit limit
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(created_at: datetime, document_id: ObjectId) -> str:
+    """
+    Encode the sort key of the last document on a page as an opaque cursor.
+
+    Args:
+        created_at: The document's created_at
+        document_id: The document's _id
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    payload = json.dumps({"t": created_at.isoformat(), "id": str(document_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: The cursor string
+
+    Returns:
+        Tuple[datetime, ObjectId]: The created_at and _id it points after
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def after_cursor_filter(created_at: datetime, document_id: ObjectId) -> Dict[str, Any]:
+    """
+    Build the keyset condition for documents after a cursor when sorting by
+    (created_at, _id) descending.
+
+    Combined with an index on (user_id, created_at, _id) this seeks straight
+    to the next page instead of skipping over the previous ones.
+    """
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": document_id}}
+        ]
+    }
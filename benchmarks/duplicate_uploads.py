@@ -0,0 +1,56 @@
+"""
+Benchmark saving the same image many times, as when a menu is re-imported
+with unchanged photos.
+
+    python -m benchmarks.duplicate_uploads
+    python -m benchmarks.duplicate_uploads --uploads 1000 --size-kb 200
+
+Uploads go to a temporary UPLOAD_DIR and image_refs is an in-memory fake,
+so the timings cover hashing and disk writes but not the database.
+"""
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+import time
+
+from starlette.datastructures import UploadFile
+
+from app.core.config import settings
+from app.db.connection import db
+from app.utils.image_upload import save_upload_file
+from tests.fakes import FakeCollection
+
+async def upload_all(image: bytes, uploads: int) -> None:
+    for _ in range(uploads):
+        await save_upload_file(UploadFile(io.BytesIO(image), filename="dish.jpg"), folder="menu/bench-user")
+
+def disk_usage(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory)
+        for name in names
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=1000)
+    parser.add_argument("--size-kb", type=int, default=200)
+    args = parser.parse_args()
+
+    image = os.urandom(args.size_kb * 1024)
+    with tempfile.TemporaryDirectory() as upload_dir:
+        settings.UPLOAD_DIR = upload_dir
+        db.image_refs = FakeCollection("image_refs")
+
+        started = time.perf_counter()
+        asyncio.run(upload_all(image, args.uploads))
+        elapsed = time.perf_counter() - started
+
+        print(f"{args.uploads} uploads of {len(image)} bytes in {elapsed:.2f}s "
+              f"({elapsed / args.uploads * 1000:.2f} ms each)")
+        print(f"{disk_usage(upload_dir)} bytes on disk, {len(image) * args.uploads} without deduplication")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark menu imports, comparing row validation on the event loop with
+validation in the threadpool.
+
+    python -m benchmarks.menu_import
+    python -m benchmarks.menu_import --rows 1000 10000
+
+Prints the import time and the longest stretch the event loop could not
+run other requests (measured with a 1 ms ticker). The bulk write goes to a
+fake collection that returns immediately.
+"""
+import argparse
+import asyncio
+import io
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+
+from bson import ObjectId
+
+from app.db.connection import db
+from app.services.menu_service import _prepare_menu_import, import_menu_items
+from app.utils.menu_import import iter_menu_csv
+
+USER_ID = "bench-user"
+
+class MemoryMenuItems:
+    """Stands in for db.menu_items; bulk writes upsert nothing."""
+
+    async def bulk_write(self, operations, ordered=True):
+        return SimpleNamespace(upserted_ids={index: ObjectId() for index in range(len(operations))})
+
+def make_csv(rows: int) -> bytes:
+    lines = ["name,price,description,category,is_vegetarian,is_available"]
+    for row in range(rows):
+        lines.append(f"Dish {row},{5 + row % 20}.50,House special {row},main,{row % 2 == 0},true")
+    return "\n".join(lines).encode()
+
+async def import_on_loop(user_id: str, rows) -> None:
+    """The import before validation moved to the threadpool."""
+    upserts, _ = _prepare_menu_import(user_id, rows, datetime.utcnow())
+    await db.menu_items.bulk_write([operation for _, operation in upserts.values()], ordered=False)
+
+async def measure(import_function, content: bytes) -> tuple:
+    longest_stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal longest_stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            longest_stall = max(longest_stall, now - last)
+            last = now
+
+    ticking = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await import_function(USER_ID, iter_menu_csv(io.BytesIO(content)))
+    elapsed = time.perf_counter() - started
+    done = True
+    await ticking
+    return elapsed, longest_stall
+
+def run(sizes: List[int]) -> None:
+    db.menu_items = MemoryMenuItems()
+
+    print(f"{'rows':>7}  {'validation':<12}{'seconds':>9}{'longest stall ms':>18}")
+    for size in sizes:
+        content = make_csv(size)
+        for name, import_function in (("event loop", import_on_loop), ("threadpool", import_menu_items)):
+            elapsed, stall = asyncio.run(measure(import_function, content))
+            print(f"{size:>7}  {name:<12}{elapsed:>9.3f}{stall * 1000:>18.1f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+    run(args.rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark order inserts with and without the insert batcher, against a
+fake collection with a fixed round trip latency.
+
+    python -m benchmarks.order_batching
+    python -m benchmarks.order_batching --clients 50 200 --latency-ms 2 --pool-size 10
+
+Every insert_one or insert_many takes one round trip and holds one of
+pool-size connections while it runs, the way a Motor client is capped by
+maxPoolSize. Prints throughput and per-insert latency percentiles.
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from bson import ObjectId
+
+from app.db.batcher import InsertBatcher
+
+class LatencyCollection:
+    """Stands in for db.orders; writes only sleep."""
+
+    def __init__(self, latency: float, per_document: float, pool_size: int):
+        self.latency = latency
+        self.per_document = per_document
+        self.pool = asyncio.Semaphore(pool_size)
+        self.round_trips = 0
+
+    async def _round_trip(self, documents: int) -> None:
+        async with self.pool:
+            self.round_trips += 1
+            await asyncio.sleep(self.latency + self.per_document * documents)
+
+    async def insert_one(self, document: Dict[str, Any]):
+        await self._round_trip(1)
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True):
+        await self._round_trip(len(documents))
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def run_clients(insert, clients: int, inserts_per_client: int) -> List[float]:
+    latencies = []
+
+    async def client():
+        for _ in range(inserts_per_client):
+            started = time.perf_counter()
+            await insert({"_id": ObjectId()})
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies
+
+async def measure(batching: bool, clients: int, args) -> Dict[str, float]:
+    collection = LatencyCollection(args.latency_ms / 1000.0, args.per_document_ms / 1000.0, args.pool_size)
+    if batching:
+        batcher = InsertBatcher(lambda: collection, window_ms=args.window_ms, max_batch=args.max_batch)
+        insert = batcher.insert
+    else:
+        insert = collection.insert_one
+
+    started = time.perf_counter()
+    latencies = await run_clients(insert, clients, args.inserts)
+    elapsed = time.perf_counter() - started
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.5) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "round_trips": collection.round_trips
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--inserts", type=int, default=50, help="Inserts per client")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Round trip latency")
+    parser.add_argument("--per-document-ms", type=float, default=0.01, help="Extra time per inserted document")
+    parser.add_argument("--pool-size", type=int, default=10, help="Concurrent round trips allowed")
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'clients':>8}  {'mode':<10}{'inserts/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'round trips':>13}")
+    for clients in args.clients:
+        for batching in (False, True):
+            result = asyncio.run(measure(batching, clients, args))
+            mode = "batched" if batching else "direct"
+            print(
+                f"{clients:>8}  {mode:<10}{result['throughput']:>11.0f}"
+                f"{result['p50']:>9.2f}{result['p99']:>9.2f}{result['round_trips']:>13}"
+            )
+
+if __name__ == "__main__":
+    main()
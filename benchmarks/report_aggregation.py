@@ -0,0 +1,86 @@
+"""
+Benchmark the aggregation report engine against the python engine on a
+real MongoDB, for every report time frame.
+
+    MONGODB_URI=mongodb://localhost:27017 python -m benchmarks.report_aggregation
+    MONGODB_URI=... python -m benchmarks.report_aggregation --sizes 10000 100000 --database report_benchmark
+
+Orders are seeded into a separate database (dropped afterwards unless
+--keep is given), so the timings include the network and the server-side
+work that the in-memory report_engines benchmark leaves out.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import List
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.db.connection import db, connect_to_mongo, close_mongo_connection
+from app.schemas.report import ReportTimeFrame
+from app.services.report_service import aggregate_report_rows, scan_report_rows
+from benchmarks.report_engines import END, START, USER_ID, make_orders
+
+# Orders sent per insert_many while seeding
+SEED_BATCH = 10000
+
+async def seed(count: int) -> None:
+    await db.orders.delete_many({"user_id": USER_ID})
+    orders = make_orders(count)
+    for order in orders:
+        order["_id"] = ObjectId()
+        order["user_id"] = USER_ID
+    for offset in range(0, count, SEED_BATCH):
+        await db.orders.insert_many(orders[offset:offset + SEED_BATCH], ordered=False)
+
+async def timed(coroutine) -> float:
+    started = time.perf_counter()
+    await coroutine
+    return time.perf_counter() - started
+
+async def run(sizes: List[int], repeat: int, keep: bool) -> int:
+    await connect_to_mongo()
+    if db.client is None or db.orders is None:
+        print("Could not connect to MongoDB", file=sys.stderr)
+        return 2
+
+    # No archive in the benchmark
+    db.order_archive = None
+    try:
+        print(f"{'orders':>9}  {'time frame':<10}{'aggregation':>13}{'python':>10}")
+        for size in sizes:
+            await seed(size)
+            for time_frame in ReportTimeFrame:
+                # Best of several runs, so a cold cache doesn't decide
+                aggregation = min([
+                    await timed(aggregate_report_rows(USER_ID, time_frame, START, END)) for _ in range(repeat)
+                ])
+                python = min([
+                    await timed(scan_report_rows(USER_ID, time_frame, START, END)) for _ in range(repeat)
+                ])
+                print(f"{size:>9}  {time_frame.value:<10}{aggregation:>13.3f}{python:>10.3f}")
+        return 0
+    finally:
+        if not keep:
+            await db.client.drop_database(settings.MONGODB_DB_NAME)
+        await close_mongo_connection()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine, the fastest is reported")
+    parser.add_argument("--database", default="report_benchmark", help="Database to seed; it is dropped afterwards")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded database")
+    args = parser.parse_args()
+
+    if not settings.MONGODB_URI:
+        print("Set MONGODB_URI to run this benchmark", file=sys.stderr)
+        sys.exit(2)
+    # Never seed or drop the application database
+    settings.MONGODB_DB_NAME = args.database
+    sys.exit(asyncio.run(run(args.sizes, args.repeat, args.keep)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark the single-pass report engine against the per-day loop it
+replaced, on synthetic orders.
+
+    python -m benchmarks.report_engines
+    python -m benchmarks.report_engines --sizes 10000 100000 1000000 --legacy-max 100000
+
+The orders are served from memory by a fake cursor, so the timings cover
+the bucketing work in the API worker and not the database.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from app.db.connection import db
+from app.schemas.report import ReportTimeFrame
+from app.services.report_service import scan_report_rows
+
+USER_ID = "bench-user"
+START = date(2024, 1, 1)
+END = date(2024, 12, 31)
+
+class MemoryCursor:
+    def __init__(self, orders: List[Dict[str, Any]]):
+        self.orders = orders
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for order in self.orders:
+            yield order
+
+    async def to_list(self, length=None):
+        return list(self.orders)
+
+class MemoryOrders:
+    """Stands in for db.orders; every order is in the report range."""
+
+    def __init__(self, orders: List[Dict[str, Any]]):
+        self.orders = orders
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor(self.orders)
+
+def make_orders(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(count)
+    start = datetime.combine(START, datetime.min.time())
+    span = int((datetime.combine(END, datetime.max.time()) - start).total_seconds())
+    orders = []
+    for _ in range(count):
+        subtotal = round(rng.uniform(5, 120), 2)
+        orders.append({
+            "created_at": start + timedelta(seconds=rng.randrange(span)),
+            "items": [{"quantity": rng.randint(1, 4)}],
+            "subtotal": subtotal,
+            "tax": round(subtotal * 0.1, 2),
+            "discount": 0.0,
+            "total": round(subtotal * 1.1, 2)
+        })
+    return orders
+
+def legacy_daily_rows(orders: List[Dict[str, Any]], start: date, end: date) -> List[Dict[str, Any]]:
+    """
+    The daily report loop used before the single-pass engine: every day
+    filters the whole order list again.
+    """
+    rows = []
+    current_date = start
+    while current_date <= end:
+        current_start = datetime.combine(current_date, datetime.min.time())
+        current_end = datetime.combine(current_date, datetime.max.time())
+        day_orders = [o for o in orders if current_start <= o["created_at"] <= current_end]
+        rows.append({
+            "date": current_start,
+            "orders_count": len(day_orders),
+            "items_sold": sum(sum(item["quantity"] for item in order["items"]) for order in day_orders)
+        })
+        current_date += timedelta(days=1)
+    return rows
+
+def timed(function, *args) -> float:
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+def run(sizes: List[int], legacy_max: int) -> None:
+    # No archive in the benchmark
+    db.order_archive = None
+
+    print(f"{'orders':>9}  {'engine':<22}{'seconds':>10}")
+    for size in sizes:
+        orders = make_orders(size)
+        db.orders = MemoryOrders(orders)
+
+        if size <= legacy_max:
+            seconds = timed(legacy_daily_rows, orders, START, END)
+            print(f"{size:>9}  {'legacy daily':<22}{seconds:>10.3f}")
+        else:
+            print(f"{size:>9}  {'legacy daily':<22}{'skipped':>10}")
+
+        for time_frame in ReportTimeFrame:
+            seconds = timed(asyncio.run, scan_report_rows(USER_ID, time_frame, START, END))
+            print(f"{size:>9}  {'single pass ' + time_frame.value:<22}{seconds:>10.3f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument(
+        "--legacy-max",
+        type=int,
+        default=100000,
+        help="Largest order count to run the quadratic legacy loop on"
+    )
+    args = parser.parse_args()
+    run(args.sizes, args.legacy_max)
+
+if __name__ == "__main__":
+    main()
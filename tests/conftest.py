@@ -0,0 +1,38 @@
+import pytest
+
+from app.db.connection import db
+from app.services.menu_cache import menu_cache
+from app.services.report_cache import report_cache
+from app.services.sequence_service import order_numbers
+from tests.fakes import FakeDatabase
+
+# Collections bound onto app.db.connection.db, with the unique indexes
+# from app.db.indexes that the services rely on
+COLLECTIONS = {
+    "users": [("email",)],
+    "menu_items": [],
+    "orders": [("user_id", "idempotency_key"), ("user_id", "order_number")],
+    "order_daily_rollups": [("user_id", "day")],
+    "order_counters": [],
+    "order_archive": [],
+    "deletions": [],
+    "image_refs": []
+}
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """
+    Point the services at a fresh in-memory database and empty caches.
+    """
+    database = FakeDatabase()
+    monkeypatch.setattr(db, "db", database)
+    for name, unique in COLLECTIONS.items():
+        monkeypatch.setattr(db, name, database.collection(name, unique=unique))
+
+    report_cache.clear()
+    menu_cache._snapshots.clear()
+    order_numbers._blocks.clear()
+    yield database
+    report_cache.clear()
+    menu_cache._snapshots.clear()
+    order_numbers._blocks.clear()
@@ -0,0 +1,562 @@
+"""
+In-memory stand-ins for the Motor collections the services use.
+
+Only the query, update and aggregation operators the app relies on are
+implemented. Every call reports a command to app.db.monitoring, so
+count_db_calls() counts round trips against the fakes as it does against
+MongoDB.
+"""
+import asyncio
+import copy
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import InsertOne, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.db.monitoring import command_counter
+
+_MISSING = object()
+
+def _resolve(document: Any, path: str) -> Any:
+    """
+    Get the value at a dotted path, mapping over arrays as MongoDB does.
+    """
+    value = document
+    for part in path.split("."):
+        if isinstance(value, list):
+            values = [_resolve(element, part) for element in value if isinstance(element, dict)]
+            value = [element for element in values if element is not _MISSING]
+        elif isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+def _candidates(document: Dict[str, Any], path: str) -> List[Any]:
+    value = _resolve(document, path)
+    if value is _MISSING:
+        return []
+    if isinstance(value, list):
+        return [value] + value
+    return [value]
+
+def _compare(left: Any, right: Any, operator: str) -> bool:
+    try:
+        if operator == "$gt":
+            return left > right
+        if operator == "$gte":
+            return left >= right
+        if operator == "$lt":
+            return left < right
+        return left <= right
+    except TypeError:
+        return False
+
+_BSON_TYPES = {"string": str, "date": datetime, "objectId": ObjectId}
+
+def _field_matches(document: Dict[str, Any], path: str, condition: Any) -> bool:
+    values = _candidates(document, path)
+    if not (isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition)):
+        if condition is None:
+            return not values or None in values
+        return condition in values
+
+    for operator, operand in condition.items():
+        if operator == "$exists":
+            if bool(values) != bool(operand):
+                return False
+        elif operator == "$ne":
+            if operand in values:
+                return False
+        elif operator == "$in":
+            if not any(value in operand for value in values) and not (None in operand and not values):
+                return False
+        elif operator == "$nin":
+            if any(value in operand for value in values):
+                return False
+        elif operator == "$type":
+            if not any(isinstance(value, _BSON_TYPES[operand]) for value in values):
+                return False
+        elif operator in ("$gt", "$gte", "$lt", "$lte"):
+            if not any(_compare(value, operand, operator) for value in values):
+                return False
+        else:
+            raise NotImplementedError(operator)
+    return True
+
+def matches(document: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    """
+    Check a document against a find() query.
+    """
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, clause) for clause in condition):
+                return False
+        elif not _field_matches(document, key, condition):
+            return False
+    return True
+
+def _set_path(document: Dict[str, Any], path: str, value: Any) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        document = document.setdefault(part, {})
+    document[last] = value
+
+def _unset_path(document: Dict[str, Any], path: str) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        document = document.get(part, {})
+    document.pop(last, None)
+
+def _apply_update(document: Dict[str, Any], update: Dict[str, Any], inserting: bool) -> None:
+    for operator, fields in update.items():
+        for path, value in fields.items():
+            current = _resolve(document, path)
+            if operator == "$set":
+                _set_path(document, path, copy.deepcopy(value))
+            elif operator == "$setOnInsert":
+                if inserting:
+                    _set_path(document, path, copy.deepcopy(value))
+            elif operator == "$unset":
+                _unset_path(document, path)
+            elif operator == "$inc":
+                _set_path(document, path, (0 if current is _MISSING else current) + value)
+            elif operator == "$min":
+                if current is _MISSING or value < current:
+                    _set_path(document, path, value)
+            elif operator == "$max":
+                if current is _MISSING or value > current:
+                    _set_path(document, path, value)
+            else:
+                raise NotImplementedError(operator)
+
+def _project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    document = copy.deepcopy(document)
+    if not projection:
+        return document
+    included = {field.split(".")[0] for field, flag in projection.items() if flag and field != "_id"}
+    if included:
+        projected = {key: value for key, value in document.items() if key in included}
+        if projection.get("_id", 1) and "_id" in document:
+            projected["_id"] = document["_id"]
+        return projected
+    excluded = {field for field, flag in projection.items() if not flag}
+    return {key: value for key, value in document.items() if key not in excluded}
+
+def _sort_key(value: Any) -> tuple:
+    if value is _MISSING or value is None:
+        return (0,)
+    if isinstance(value, list):
+        value = min(value) if value else None
+        return _sort_key(value)
+    return (1, value)
+
+def _sort(documents: List[Dict[str, Any]], keys: List[tuple]) -> List[Dict[str, Any]]:
+    for field, direction in reversed(keys):
+        documents.sort(key=lambda document: _sort_key(_resolve(document, field)), reverse=direction < 0)
+    return documents
+
+# Aggregation expressions
+
+def evaluate(expression: Any, document: Dict[str, Any]) -> Any:
+    """
+    Evaluate an aggregation expression against a document.
+    """
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _resolve(document, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, dict):
+        if len(expression) == 1:
+            operator, operand = next(iter(expression.items()))
+            if operator.startswith("$"):
+                return _evaluate_operator(operator, operand, document)
+        return {key: evaluate(value, document) for key, value in expression.items()}
+    if isinstance(expression, list):
+        return [evaluate(value, document) for value in expression]
+    return expression
+
+def _evaluate_operator(operator: str, operand: Any, document: Dict[str, Any]) -> Any:
+    if operator == "$sum":
+        value = evaluate(operand, document)
+        values = value if isinstance(value, list) else [value]
+        return sum(value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool))
+    if operator == "$ifNull":
+        value, fallback = operand
+        value = evaluate(value, document)
+        return evaluate(fallback, document) if value is None else value
+    if operator == "$dateFromParts":
+        parts = evaluate(operand, document)
+        return datetime(parts["year"], parts.get("month", 1), parts.get("day", 1))
+
+    value = evaluate(operand, document)
+    if operator == "$year":
+        return value.year
+    if operator == "$month":
+        return value.month
+    if operator == "$dayOfMonth":
+        return value.day
+    if operator == "$isoWeek":
+        return value.isocalendar()[1]
+    raise NotImplementedError(operator)
+
+def _accumulate(groups: Dict[Any, Dict[str, Any]], key: Any, group_id: Any, spec: Dict[str, Any], document: Dict[str, Any]) -> None:
+    group = groups.get(key)
+    if group is None:
+        group = groups[key] = {"_id": group_id}
+    for field, accumulator in spec.items():
+        if field == "_id":
+            continue
+        operator, operand = next(iter(accumulator.items()))
+        value = evaluate(operand, document)
+        if operator == "$sum":
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                group[field] = group.get(field, 0) + value
+            else:
+                group.setdefault(field, 0)
+        elif operator in ("$min", "$max"):
+            current = group.get(field)
+            if value is not None and (current is None or (value < current if operator == "$min" else value > current)):
+                group[field] = value
+            else:
+                group.setdefault(field, current)
+        elif operator == "$first":
+            group.setdefault(field, value)
+        else:
+            raise NotImplementedError(operator)
+
+def _hashable(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+def run_pipeline(documents: List[Dict[str, Any]], pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run an aggregation pipeline over in-memory documents.
+    """
+    documents = [copy.deepcopy(document) for document in documents]
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            documents = [document for document in documents if matches(document, spec)]
+        elif name == "$group":
+            groups: Dict[Any, Dict[str, Any]] = {}
+            for document in documents:
+                group_id = evaluate(spec["_id"], document)
+                _accumulate(groups, _hashable(group_id), group_id, spec, document)
+            documents = list(groups.values())
+        elif name == "$sort":
+            documents = _sort(documents, list(spec.items()))
+        elif name == "$unwind":
+            path = (spec["path"] if isinstance(spec, dict) else spec)[1:]
+            unwound = []
+            for document in documents:
+                values = _resolve(document, path)
+                if not isinstance(values, list):
+                    continue
+                for value in values:
+                    copied = copy.deepcopy(document)
+                    _set_path(copied, path, value)
+                    unwound.append(copied)
+            documents = unwound
+        elif name == "$replaceRoot":
+            documents = [evaluate(spec["newRoot"], document) for document in documents]
+        elif name == "$facet":
+            documents = [{facet: run_pipeline(documents, stages) for facet, stages in spec.items()}]
+        elif name == "$limit":
+            documents = documents[:spec]
+        elif name == "$project":
+            documents = [_project(document, spec) for document in documents]
+        else:
+            raise NotImplementedError(name)
+    return documents
+
+# Collections
+
+class FakeResult(SimpleNamespace):
+    pass
+
+class FakeCursor:
+    """Async cursor over a find() or aggregate() result."""
+
+    def __init__(self, collection: "FakeCollection", command: str, load):
+        self._collection = collection
+        self._command = command
+        self._load = load
+        self._sort: List[tuple] = []
+        self._limit: Optional[int] = None
+        self._documents: Optional[List[Dict[str, Any]]] = None
+
+    def sort(self, key, direction=None) -> "FakeCursor":
+        self._sort = [(key, direction or 1)] if isinstance(key, str) else list(key)
+        return self
+
+    def limit(self, count: int) -> "FakeCursor":
+        self._limit = count or None
+        return self
+
+    def batch_size(self, size: int) -> "FakeCursor":
+        return self
+
+    def _results(self) -> List[Dict[str, Any]]:
+        if self._documents is None:
+            self._collection._record(self._command)
+            documents = _sort(self._load(), self._sort)
+            self._documents = documents[:self._limit] if self._limit else documents
+        return self._documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self._results():
+            yield document
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        documents = self._results()
+        return documents[:length] if length else list(documents)
+
+class FakeCollection:
+    """
+    In-memory collection.
+
+    Args:
+        name: Collection name, used in the recorded calls
+        unique: Field tuples that must be unique across documents holding
+            all of them (like a partial unique index)
+        calls: Shared list the (collection, command) of every call goes to
+        latency: Seconds every call waits before completing
+    """
+
+    def __init__(self, name: str = "fake", unique: List[tuple] = (), calls: Optional[list] = None, latency: float = 0):
+        self.name = name
+        self.documents: List[Dict[str, Any]] = []
+        self.unique = [tuple(fields) for fields in unique]
+        self.calls = calls if calls is not None else []
+        self.latency = latency
+
+    def _record(self, command: str) -> None:
+        self.calls.append((self.name, command))
+        command_counter.started(SimpleNamespace(command_name=command))
+
+    async def _wait(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        else:
+            await asyncio.sleep(0)
+
+    def _duplicate_of(self, document: Dict[str, Any], ignore: Optional[Dict[str, Any]] = None) -> Optional[tuple]:
+        for fields in [("_id",)] + self.unique:
+            if not all(field in document for field in fields):
+                continue
+            key = tuple(document[field] for field in fields)
+            for other in self.documents:
+                if other is ignore or not all(field in other for field in fields):
+                    continue
+                if tuple(other[field] for field in fields) == key:
+                    return fields
+        return None
+
+    def _insert(self, document: Dict[str, Any]) -> None:
+        document.setdefault("_id", ObjectId())
+        fields = self._duplicate_of(document)
+        if fields is not None:
+            raise DuplicateKeyError(
+                f"E11000 duplicate key error collection: {self.name}",
+                11000,
+                {"code": 11000, "keyPattern": {field: 1 for field in fields}}
+            )
+        self.documents.append(copy.deepcopy(document))
+
+    def _find(self, query: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [document for document in self.documents if matches(document, query)]
+
+    def _upsert_document(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        document = {
+            key: value for key, value in query.items()
+            if not key.startswith("$") and not (isinstance(value, dict) and any(op.startswith("$") for op in value))
+        }
+        return copy.deepcopy(document)
+
+    def _update(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool) -> tuple:
+        """
+        Returns:
+            tuple: (document before, document after, upserted _id)
+        """
+        found = self._find(query)
+        if found:
+            document = found[0]
+            before = copy.deepcopy(document)
+            if any(key.startswith("$") for key in update):
+                _apply_update(document, update, inserting=False)
+            else:
+                document.clear()
+                document.update({"_id": before["_id"], **copy.deepcopy(update)})
+            if self._duplicate_of(document, ignore=document):
+                document.clear()
+                document.update(before)
+                raise DuplicateKeyError("E11000 duplicate key error", 11000, {"code": 11000})
+            return before, document, None
+        if not upsert:
+            return None, None, None
+
+        document = self._upsert_document(query)
+        if any(key.startswith("$") for key in update):
+            _apply_update(document, update, inserting=True)
+        else:
+            document.update(copy.deepcopy(update))
+        self._insert(document)
+        return None, self.documents[-1], document["_id"]
+
+    async def insert_one(self, document: Dict[str, Any]) -> FakeResult:
+        self._record("insert")
+        await self._wait()
+        self._insert(document)
+        return FakeResult(inserted_id=document["_id"])
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True) -> FakeResult:
+        self._record("insert")
+        await self._wait()
+        errors = []
+        for index, document in enumerate(documents):
+            try:
+                self._insert(document)
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "errmsg": str(e), **e.details})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(documents) - len(errors)})
+        return FakeResult(inserted_ids=[document["_id"] for document in documents])
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None) -> FakeCursor:
+        return FakeCursor(self, "find", lambda: [_project(document, projection) for document in self._find(query)])
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None):
+        self._record("find")
+        await self._wait()
+        found = self._find(query)
+        return _project(found[0], projection) if found else None
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        self._record("aggregate")
+        await self._wait()
+        return len(self._find(query))
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False) -> FakeResult:
+        self._record("update")
+        await self._wait()
+        before, after, upserted_id = self._update(query, update, upsert)
+        matched = 1 if before is not None else 0
+        return FakeResult(matched_count=matched, modified_count=matched, upserted_id=upserted_id)
+
+    async def replace_one(self, query: Dict[str, Any], replacement: Dict[str, Any], upsert: bool = False) -> FakeResult:
+        return await self.update_one(query, replacement, upsert=upsert)
+
+    async def find_one_and_update(
+        self,
+        query: Dict[str, Any],
+        update: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.BEFORE
+    ):
+        self._record("findAndModify")
+        await self._wait()
+        before, after, _ = self._update(query, update, upsert)
+        result = after if return_document == ReturnDocument.AFTER else before
+        return _project(result, projection) if result is not None else None
+
+    async def find_one_and_delete(self, query: Dict[str, Any]):
+        self._record("findAndModify")
+        await self._wait()
+        found = self._find(query)
+        if not found:
+            return None
+        self.documents.remove(found[0])
+        return found[0]
+
+    async def delete_one(self, query: Dict[str, Any]) -> FakeResult:
+        self._record("delete")
+        await self._wait()
+        found = self._find(query)
+        if found:
+            self.documents.remove(found[0])
+        return FakeResult(deleted_count=len(found[:1]))
+
+    async def delete_many(self, query: Dict[str, Any]) -> FakeResult:
+        self._record("delete")
+        await self._wait()
+        found = self._find(query)
+        for document in found:
+            self.documents.remove(document)
+        return FakeResult(deleted_count=len(found))
+
+    async def bulk_write(self, operations: list, ordered: bool = True) -> FakeResult:
+        self._record("bulkWrite")
+        await self._wait()
+        inserted = matched = upserted = 0
+        upserted_ids = {}
+        errors = []
+        for index, operation in enumerate(operations):
+            try:
+                if isinstance(operation, InsertOne):
+                    self._insert(operation._doc)
+                    inserted += 1
+                elif isinstance(operation, (UpdateOne, ReplaceOne)):
+                    before, _, upserted_id = self._update(
+                        operation._filter, operation._doc, bool(operation._upsert)
+                    )
+                    if before is not None:
+                        matched += 1
+                    if upserted_id is not None:
+                        upserted += 1
+                        upserted_ids[index] = upserted_id
+                else:
+                    raise NotImplementedError(type(operation).__name__)
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "errmsg": str(e), **e.details})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": inserted, "nUpserted": upserted})
+        return FakeResult(
+            inserted_count=inserted,
+            matched_count=matched,
+            modified_count=matched,
+            upserted_count=upserted,
+            upserted_ids=upserted_ids
+        )
+
+    def aggregate(self, pipeline: List[Dict[str, Any]]) -> FakeCursor:
+        return FakeCursor(self, "aggregate", lambda: run_pipeline(self.documents, pipeline))
+
+class FakeDatabase:
+    """Collections created on first access, sharing one list of calls."""
+
+    def __init__(self, latency: float = 0):
+        self.calls: List[tuple] = []
+        self.latency = latency
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def collection(self, name: str, unique: List[tuple] = ()) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(name, unique=unique, calls=self.calls, latency=self.latency)
+        return self._collections[name]
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return self.collection(name)
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.collection(name)
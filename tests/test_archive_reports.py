@@ -0,0 +1,118 @@
+import asyncio
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.schemas.report import ReportTimeFrame
+from app.services import archive_service
+from app.services.archive_service import archive_orders
+from app.services.report_cache import report_cache
+from app.services.report_service import (
+    aggregate_report_rows,
+    generate_category_report,
+    generate_summary_report,
+    scan_report_rows
+)
+
+USER_ID = "user-1"
+START = date(2024, 1, 1)
+END = date(2024, 3, 31)
+
+def make_orders(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    span = int((datetime.combine(END, datetime.max.time()) - datetime.combine(START, datetime.min.time())).total_seconds())
+    orders = []
+    for _ in range(count):
+        items = []
+        for _ in range(rng.randint(1, 3)):
+            quantity = rng.randint(1, 4)
+            price = rng.choice([2.5, 4.0, 7.25])
+            items.append({
+                "quantity": quantity,
+                "price": price,
+                "subtotal": quantity * price,
+                "category": rng.choice(["mains", "drinks", None])
+            })
+        subtotal = sum(item["subtotal"] for item in items)
+        orders.append({
+            "_id": ObjectId(),
+            "user_id": USER_ID,
+            "created_at": datetime.combine(START, datetime.min.time()) + timedelta(seconds=rng.randrange(span)),
+            "items": items,
+            "subtotal": subtotal,
+            "tax": round(subtotal * 0.1, 2),
+            "discount": 0.0,
+            "total": subtotal + round(subtotal * 0.1, 2),
+            # Pending orders stay in the orders collection
+            "status": rng.choice(["delivered", "cancelled", "pending"]),
+            "payment_method": rng.choice(["cash", "card", "upi"])
+        })
+    return orders
+
+def rounded(value):
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, dict):
+        return {key: rounded(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rounded(item) for item in value]
+    return value
+
+async def reports(time_frame, start, end):
+    report_cache.clear()
+    return rounded({
+        "scan": await scan_report_rows(USER_ID, time_frame, start, end),
+        "aggregate": await aggregate_report_rows(USER_ID, time_frame, start, end),
+        "categories": (await generate_category_report(USER_ID, time_frame, start, end)).model_dump(),
+        "summary": (await generate_summary_report(USER_ID, time_frame, start, end)).model_dump()
+    })
+
+@pytest.mark.parametrize("time_frame", list(ReportTimeFrame))
+def test_reports_unchanged_by_archiving(fake_db, monkeypatch, time_frame):
+    fake_db.orders.documents.extend(make_orders(600))
+    # Starts mid-month so only part of a bucket's days are in range
+    start, end = date(2024, 1, 17), date(2024, 3, 9)
+    before = asyncio.run(reports(time_frame, start, end))
+
+    result = asyncio.run(archive_orders(USER_ID))
+    assert result["archived"] > 0
+    assert all("days" in bucket for bucket in fake_db.order_archive.documents)
+
+    def no_decompress(blob):
+        raise AssertionError("reports must not decompress archived orders")
+
+    monkeypatch.setattr(archive_service, "decompress_orders", no_decompress)
+    after = asyncio.run(reports(time_frame, start, end))
+
+    assert after == before
+
+def test_archive_backfills_bucket_days(fake_db):
+    orders = [order for order in make_orders(50) if order["status"] != "pending"]
+    bucket = archive_service.build_archive_bucket(USER_ID, orders)
+    bucket["_id"] = ObjectId()
+    expected_days = bucket.pop("days")
+    fake_db.order_archive.documents.append(bucket)
+
+    result = asyncio.run(archive_orders(USER_ID))
+
+    assert result["backfilled"] == 1
+    assert fake_db.order_archive.documents[0]["days"] == expected_days
+
+def test_orders_without_payment_method_are_reported_as_unknown(fake_db):
+    orders = make_orders(40)
+    for order in orders[::4]:
+        # Created before payment_method was required
+        del order["payment_method"]
+    fake_db.orders.documents.extend(orders)
+    asyncio.run(archive_orders(USER_ID))
+    assert fake_db.orders.documents and fake_db.order_archive.documents
+
+    report_cache.clear()
+    report = asyncio.run(generate_summary_report(USER_ID, ReportTimeFrame.MONTHLY, START, END))
+
+    counts = {entry.payment_method: entry.orders_count for entry in report.payment_methods}
+    assert counts["unknown"] == 10
+    assert sum(counts.values()) == 40
+    assert list(counts) == sorted(counts)
@@ -0,0 +1,104 @@
+"""
+Round trips made by each service write, counted with count_db_calls().
+"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.security import create_user
+from app.db.monitoring import count_db_calls
+from app.schemas.menu import MenuItemCreate, MenuItemUpdate
+from app.schemas.order import OrderCreate, OrderUpdate, OrderStatus
+from app.services.menu_cache import menu_cache
+from app.services.menu_service import create_menu_item, delete_menu_item, update_menu_item
+from app.services.order_service import create_order, delete_order, update_order
+
+USER_ID = "user-1"
+
+def run(coroutine):
+    with count_db_calls() as calls:
+        result = asyncio.run(coroutine)
+    return result, calls
+
+def add_menu_item(fake_db):
+    item_id = ObjectId()
+    fake_db.menu_items.documents.append({
+        "_id": item_id,
+        "user_id": USER_ID,
+        "name": "Dal",
+        "price": 8.0,
+        "description": "",
+        "category": "main",
+        "is_available": True
+    })
+    return str(item_id)
+
+def order_data(item_id):
+    return OrderCreate(items=[{"menu_item_id": item_id, "name": "Dal", "quantity": 2, "price": 8.0}])
+
+def test_create_order(fake_db):
+    item_id = add_menu_item(fake_db)
+    # The first order loads the menu snapshot and reserves a block of order numbers
+    _, calls = run(create_order(USER_ID, order_data(item_id)))
+    assert calls.commands == ["find", "findAndModify", "insert", "update"]
+
+    # Later orders are served from both: the insert plus the rollup update
+    _, calls = run(create_order(USER_ID, order_data(item_id)))
+    assert calls.commands == ["insert", "update"]
+
+def test_unknown_menu_item_reloads_menu_once(fake_db):
+    item_id = add_menu_item(fake_db)
+    run(create_order(USER_ID, order_data(item_id)))
+    # A snapshot loaded before the refresh floor, so a miss may reload it
+    menu_cache._snapshots[USER_ID].loaded_at -= settings.MENU_CACHE_MISS_REFRESH_SECONDS
+    unknown_id = str(ObjectId())
+
+    with count_db_calls() as calls:
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                asyncio.run(create_order(USER_ID, order_data(unknown_id)))
+    assert calls.commands == ["find"]
+
+def test_update_order(fake_db):
+    item_id = add_menu_item(fake_db)
+    order, _ = run(create_order(USER_ID, order_data(item_id)))
+
+    updated, calls = run(update_order(USER_ID, str(order["_id"]), OrderUpdate(status=OrderStatus.PREPARING)))
+
+    assert updated["status"] == OrderStatus.PREPARING
+    # No updatable field changes the totals, so the rollup is left alone
+    assert calls.commands == ["findAndModify"]
+
+def test_delete_order(fake_db):
+    item_id = add_menu_item(fake_db)
+    order, _ = run(create_order(USER_ID, order_data(item_id)))
+
+    deleted, calls = run(delete_order(USER_ID, str(order["_id"])))
+
+    assert deleted
+    # Delete, rollup adjustment and the sync tombstone
+    assert calls.commands == ["findAndModify", "update", "insert"]
+
+def test_menu_item_writes(fake_db):
+    created, calls = run(create_menu_item(
+        USER_ID,
+        MenuItemCreate(name="Lassi", price=3.5, description="", category="beverage")
+    ))
+    assert calls.commands == ["insert"]
+
+    updated, calls = run(update_menu_item(USER_ID, created["_id"], MenuItemUpdate(price=4.0)))
+    assert updated["price"] == 4.0
+    assert calls.commands == ["findAndModify"]
+
+    deleted, calls = run(delete_menu_item(USER_ID, created["_id"]))
+    assert deleted
+    # Delete plus the sync tombstone
+    assert calls.commands == ["findAndModify", "insert"]
+
+def test_create_user(fake_db):
+    user, calls = run(create_user({"email": "owner@example.com", "password": "hashed"}))
+
+    assert user["_id"] is not None
+    assert calls.commands == ["insert"]
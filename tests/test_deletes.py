@@ -0,0 +1,59 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.schemas.order import OrderCreate
+from app.services.menu_service import delete_menu_item
+from app.services.order_events import ORDER_DELETED, order_event_hub
+from app.services.order_service import create_order, delete_order
+from app.services.report_cache import report_cache
+
+USER_ID = "user-1"
+IMAGE = "menu/" + "a" * 64 + ".jpg"
+
+def add_menu_item(fake_db, **fields):
+    item_id = ObjectId()
+    fake_db.menu_items.documents.append({
+        "_id": item_id,
+        "user_id": USER_ID,
+        "name": "Dal",
+        "price": 8.0,
+        "description": "",
+        "category": "main",
+        "is_available": True,
+        **fields
+    })
+    return str(item_id)
+
+def fail_tombstones(fake_db, monkeypatch):
+    async def insert_one(document):
+        raise RuntimeError("deletions unavailable")
+
+    monkeypatch.setattr(fake_db.deletions, "insert_one", insert_one)
+
+def test_order_delete_survives_tombstone_failure(fake_db, monkeypatch):
+    item_id = add_menu_item(fake_db)
+    order = asyncio.run(create_order(USER_ID, OrderCreate(
+        items=[{"menu_item_id": item_id, "name": "Dal", "quantity": 1, "price": 8.0}]
+    )))
+    fail_tombstones(fake_db, monkeypatch)
+    version = report_cache.version(USER_ID)
+
+    deleted = asyncio.run(delete_order(USER_ID, str(order["_id"])))
+
+    assert deleted
+    assert fake_db.orders.documents == []
+    assert report_cache.version(USER_ID) > version
+    assert order_event_hub._buffers[USER_ID][-1]["event"] == ORDER_DELETED
+
+def test_menu_delete_survives_tombstone_failure(fake_db, monkeypatch):
+    item_id = add_menu_item(fake_db, image=IMAGE)
+    fake_db.image_refs.documents.append({"_id": IMAGE, "refs": 2})
+    fail_tombstones(fake_db, monkeypatch)
+
+    deleted = asyncio.run(delete_menu_item(USER_ID, item_id))
+
+    assert deleted
+    assert fake_db.menu_items.documents == []
+    # The image reference is still released
+    assert fake_db.image_refs.documents[0]["refs"] == 1
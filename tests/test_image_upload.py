@@ -0,0 +1,39 @@
+import asyncio
+import io
+import os
+
+from starlette.datastructures import UploadFile
+
+from app.core.config import settings
+from app.utils.image_upload import delete_file, save_upload_file
+
+UPLOADS = 1000
+
+def disk_usage(directory):
+    files = [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+    return files, sum(os.path.getsize(path) for path in files)
+
+def test_duplicate_uploads_share_one_file(fake_db, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    image = os.urandom(200 * 1024)
+
+    async def upload_all():
+        paths = []
+        for _ in range(UPLOADS):
+            paths.append(await save_upload_file(UploadFile(io.BytesIO(image), filename="dish.JPG"), folder="menu"))
+        return paths
+
+    paths = asyncio.run(upload_all())
+
+    files, size = disk_usage(tmp_path)
+    assert set(paths) == {paths[0]} and paths[0].endswith(".jpg")
+    # One stored copy and no leftover temporary files
+    assert files == [str(tmp_path / paths[0])]
+    assert size == len(image)
+    assert fake_db.image_refs.documents[0]["refs"] == UPLOADS
+
+    # The file stays until its last reference is released
+    assert not any(asyncio.run(delete_file(paths[0])) for _ in range(UPLOADS - 1))
+    assert (tmp_path / paths[0]).exists()
+    assert asyncio.run(delete_file(paths[0]))
+    assert disk_usage(tmp_path)[0] == []
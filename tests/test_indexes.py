@@ -0,0 +1,18 @@
+"""
+Checks every service query shape against the index registry with explain().
+
+Needs a MongoDB server: set MONGODB_URI (and MONGODB_DB_NAME to a test
+database, since the registered indexes are created on connect). Skipped
+otherwise.
+"""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.scripts import indexes
+
+pytestmark = pytest.mark.skipif(not settings.MONGODB_URI, reason="MONGODB_URI is not set")
+
+def test_no_service_query_scans_a_collection():
+    assert asyncio.run(indexes.run("verify")) == 0
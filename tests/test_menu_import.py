@@ -0,0 +1,81 @@
+import asyncio
+import io
+import threading
+from types import SimpleNamespace
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.users import menu
+from app.core.config import settings
+from app.db.connection import db
+from app.middleware.auth_middleware import get_current_user
+from app.services.menu_service import import_menu_items
+from app.utils.menu_import import iter_menu_csv
+
+USER_ID = "user-1"
+# MENU_IMPORT_MAX_ROWS, the last of them invalid
+ROWS = 10000
+
+def menu_csv(rows: int) -> io.BytesIO:
+    lines = ["name,price,description,category,is_vegetarian"]
+    for row in range(rows - 1):
+        lines.append(f"Dish {row},{5 + row % 20}.50,House special,main,{'true' if row % 2 else 'false'}")
+    lines.append("Broken,-1,,main,true")
+    return io.BytesIO("\n".join(lines).encode())
+
+class BulkUpserts:
+    """Stands in for db.menu_items; records the upserts of one bulk write."""
+
+    def __init__(self):
+        self.operations = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.operations.extend(operations)
+        return SimpleNamespace(upserted_ids={index: ObjectId() for index in range(len(operations))})
+
+def test_import_10k_rows_off_the_event_loop(monkeypatch):
+    # The fake collection matches upserts by scanning, too slow for 10k rows
+    menu_items = BulkUpserts()
+    monkeypatch.setattr(db, "menu_items", menu_items)
+    parsed_on = set()
+
+    def rows():
+        for row in iter_menu_csv(menu_csv(ROWS)):
+            parsed_on.add(threading.get_ident())
+            yield row
+
+    async def run():
+        loop_thread = threading.get_ident()
+        return loop_thread, await import_menu_items(USER_ID, rows())
+
+    loop_thread, result = asyncio.run(run())
+
+    assert result["created"] == ROWS - 1
+    assert result["failed"] == 1 and result["errors"][0]["row"] == ROWS
+    assert len({operation._filter["name"] for operation in menu_items.operations}) == ROWS - 1
+    # Parsing and validation ran in the threadpool
+    assert parsed_on and loop_thread not in parsed_on
+
+def test_oversized_json_import_is_rejected_before_parsing(monkeypatch):
+    monkeypatch.setattr(db, "menu_items", BulkUpserts())
+    monkeypatch.setattr(settings, "MENU_IMPORT_MAX_BYTES", 1000)
+
+    def iter_menu_json(file):
+        raise AssertionError("oversized JSON must not be parsed")
+
+    monkeypatch.setitem(menu.MENU_IMPORT_READERS, menu.MenuImportFormat.JSON, iter_menu_json)
+    app = FastAPI()
+    app.include_router(menu.router, prefix="/users")
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": USER_ID}
+    client = TestClient(app)
+
+    content = b"[" + b",".join([b'{"name": "Dal", "price": 8}'] * 100) + b"]"
+    response = client.post(f"/users/{USER_ID}/menu/import", files={"file": ("menu.json", content)})
+    assert response.status_code == 413
+
+    # NDJSON is read row by row and only limited by MENU_IMPORT_MAX_ROWS
+    content = b"\n".join([b'{"name": "Dal", "price": 8}'] * 100)
+    response = client.post(f"/users/{USER_ID}/menu/import", files={"file": ("menu.ndjson", content)})
+    assert response.status_code == 200
@@ -0,0 +1,36 @@
+from bson import ObjectId
+
+from app.services.order_events import OrderEventHub, ORDER_CREATED, format_sse
+
+USER_ID = "user-1"
+
+def publish(hub, count):
+    return [hub.publish(USER_ID, ORDER_CREATED, {"_id": ObjectId(), "order_number": str(n)}) for n in range(count)]
+
+def test_replay_returns_events_after_last_id():
+    hub = OrderEventHub(buffer_size=10, queue_size=10)
+    events = publish(hub, 3)
+
+    missed = hub.replay(USER_ID, events[0]["id"])
+
+    assert [event["id"] for event in missed] == [events[1]["id"], events[2]["id"]]
+    assert format_sse(events[0]).startswith(f"id: {hub.epoch}-1\n")
+
+def test_id_from_before_restart_is_reset():
+    before = OrderEventHub(buffer_size=10, queue_size=10)
+    old_events = publish(before, 5)
+    after = OrderEventHub(buffer_size=10, queue_size=10)
+    publish(after, 2)
+
+    # Same seq, different epoch: a restarted hub must not replay from it
+    assert after.replay(USER_ID, old_events[0]["id"]) is None
+    assert after.replay(USER_ID, old_events[-1]["id"]) is None
+
+def test_evicted_and_malformed_ids_are_reset():
+    hub = OrderEventHub(buffer_size=2, queue_size=10)
+    events = publish(hub, 4)
+
+    assert hub.replay(USER_ID, events[0]["id"]) is None
+    assert [event["id"] for event in hub.replay(USER_ID, events[2]["id"])] == [events[3]["id"]]
+    assert hub.replay(USER_ID, "7") is None
+    assert hub.replay(USER_ID, f"{hub.epoch}-x") is None
@@ -0,0 +1,87 @@
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.users import orders
+from app.core.jwt import create_access_token
+from app.services.order_events import ORDER_CREATED, RESET_EVENT, order_event_hub
+
+USER_ID = "BZU-1"
+EMAIL = "owner@example.com"
+
+@pytest.fixture
+def client(fake_db, monkeypatch):
+    user_oid = ObjectId()
+    fake_db.users.documents.append({"_id": user_oid, "email": EMAIL, "user_id": USER_ID})
+    client = TestClient(FastAPI())
+    client.app.include_router(orders.router, prefix="/users")
+    # The claims login puts in its tokens
+    client.login_token = create_access_token({"sub": EMAIL, "user_id": str(user_oid), "custom_user_id": USER_ID})
+
+    subscribe = order_event_hub.subscribe
+
+    def subscribe_then_end(user_id):
+        # End the stream once the replay is sent, so the response completes
+        queue = subscribe(user_id)
+        queue.put_nowait(RESET_EVENT)
+        return queue
+
+    monkeypatch.setattr(order_event_hub, "subscribe", subscribe_then_end)
+    return client
+
+def publish(count):
+    return [order_event_hub.publish(USER_ID, ORDER_CREATED, {"_id": ObjectId(), "order_number": str(n)}) for n in range(count)]
+
+def event_ids(body):
+    return [line[len("id: "):] for line in body.splitlines() if line.startswith("id: ")]
+
+def stream_token(client):
+    response = client.post(
+        f"/users/{USER_ID}/orders/events/token",
+        headers={"Authorization": f"Bearer {client.login_token}"}
+    )
+    assert response.status_code == 200
+    return response.json()["token"]
+
+def test_resume_with_last_event_id_header(client):
+    events = publish(3)
+
+    response = client.get(
+        f"/users/{USER_ID}/orders/events",
+        headers={"Authorization": f"Bearer {client.login_token}", "Last-Event-ID": events[0]["id"]}
+    )
+
+    assert response.status_code == 200
+    assert event_ids(response.text) == [events[1]["id"], events[2]["id"]]
+    assert response.text.endswith("event: reset\ndata: {}\n\n")
+
+def test_event_source_resumes_with_query_token(client):
+    events = publish(3)
+    token = stream_token(client)
+
+    # What a browser EventSource sends when reconnecting: no Authorization header
+    response = client.get(
+        f"/users/{USER_ID}/orders/events",
+        params={"token": token},
+        headers={"Last-Event-ID": events[1]["id"]}
+    )
+    assert response.status_code == 200
+    assert event_ids(response.text) == [events[2]["id"]]
+
+    # A new EventSource opened with a fresh token passes the ID in the URL
+    response = client.get(
+        f"/users/{USER_ID}/orders/events",
+        params={"token": token, "lastEventId": events[0]["id"]}
+    )
+    assert event_ids(response.text) == [events[1]["id"], events[2]["id"]]
+
+def test_stream_token_only_opens_the_stream(client):
+    token = stream_token(client)
+
+    response = client.get(f"/users/{USER_ID}/orders/changes", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+    # A login token is not accepted in the URL
+    response = client.get(f"/users/{USER_ID}/orders/events", params={"token": client.login_token})
+    assert response.status_code == 401
@@ -0,0 +1,75 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services import archive_service
+from app.services.archive_service import archive_orders
+from app.services.order_service import iter_orders
+
+USER_ID = "user-1"
+
+def make_orders(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    # BSON datetimes have millisecond precision
+    now = datetime.utcnow().replace(microsecond=0)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": USER_ID,
+            "created_at": now - timedelta(seconds=rng.randrange(86400, 3 * settings.ORDER_ARCHIVE_AFTER_DAYS * 86400)),
+            "items": [{"quantity": 1, "subtotal": 5.0}],
+            "subtotal": 5.0,
+            "tax": 0.5,
+            "discount": 0.0,
+            "total": 5.5,
+            "status": rng.choice(["delivered", "pending"]),
+            "payment_method": "cash"
+        }
+        for _ in range(count)
+    ]
+
+async def collect(iterator, limit=None):
+    orders = []
+    async for order in iterator:
+        orders.append(order)
+        if limit is not None and len(orders) >= limit:
+            break
+    return orders
+
+def test_export_merges_archive_in_order(fake_db, monkeypatch):
+    monkeypatch.setattr(settings, "ORDER_ARCHIVE_BUCKET_SIZE", 10)
+    orders = make_orders(300)
+    fake_db.orders.documents.extend(orders)
+    asyncio.run(archive_orders(USER_ID))
+    # Orders closed later land in new buckets overlapping the earlier ones
+    for order in fake_db.orders.documents:
+        order["status"] = "delivered"
+    asyncio.run(archive_orders(USER_ID))
+
+    exported = asyncio.run(collect(iter_orders(USER_ID, projection={"created_at": 1})))
+
+    assert sorted(order["_id"] for order in exported) == sorted(order["_id"] for order in orders)
+    assert [order["created_at"] for order in exported] == sorted(order["created_at"] for order in orders)
+    assert set(exported[0]) == {"_id", "created_at"}
+
+def test_export_decompresses_buckets_lazily(fake_db, monkeypatch):
+    monkeypatch.setattr(settings, "ORDER_ARCHIVE_BUCKET_SIZE", 10)
+    fake_db.orders.documents.extend(order for order in make_orders(300) if order["status"] == "delivered")
+    asyncio.run(archive_orders(USER_ID))
+    buckets = len(fake_db.order_archive.documents)
+    assert buckets > 5
+
+    decompressed = []
+    decompress_orders = archive_service.decompress_orders
+
+    def counting_decompress(blob):
+        decompressed.append(blob)
+        return decompress_orders(blob)
+
+    monkeypatch.setattr(archive_service, "decompress_orders", counting_decompress)
+    asyncio.run(collect(iter_orders(USER_ID), limit=5))
+
+    assert len(decompressed) < buckets
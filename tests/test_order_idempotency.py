@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from app.schemas.order import OrderCreate
+from app.services.order_service import create_order, create_orders_bulk
+
+USER_ID = "user-1"
+
+def add_menu_item(fake_db, name, is_available=True):
+    item_id = ObjectId()
+    fake_db.menu_items.documents.append({
+        "_id": item_id,
+        "user_id": USER_ID,
+        "name": name,
+        "price": 6.0,
+        "category": "main",
+        "is_available": is_available
+    })
+    return str(item_id)
+
+def mark_unavailable(fake_db, item_id):
+    from app.services.menu_cache import menu_cache
+    for item in fake_db.menu_items.documents:
+        if str(item["_id"]) == item_id:
+            item["is_available"] = False
+    menu_cache.invalidate(USER_ID)
+
+def order_data(item_id, key=None):
+    return OrderCreate(
+        items=[{"menu_item_id": item_id, "name": "x", "quantity": 1, "price": 1.0}],
+        idempotency_key=key
+    )
+
+def test_replay_returns_stored_order_after_item_becomes_unavailable(fake_db):
+    item_id = add_menu_item(fake_db, "Soup")
+    stored = asyncio.run(create_order(USER_ID, order_data(item_id, key="tablet-1:42")))
+    mark_unavailable(fake_db, item_id)
+
+    replayed = asyncio.run(create_order(USER_ID, order_data(item_id, key="tablet-1:42")))
+
+    assert replayed["_id"] == stored["_id"]
+    assert len(fake_db.orders.documents) == 1
+
+def test_new_order_with_unavailable_item_is_rejected(fake_db):
+    item_id = add_menu_item(fake_db, "Soup", is_available=False)
+
+    with pytest.raises(ValueError):
+        asyncio.run(create_order(USER_ID, order_data(item_id, key="tablet-1:43")))
+
+def test_bulk_replay_after_item_becomes_unavailable(fake_db):
+    soup = add_menu_item(fake_db, "Soup")
+    bread = add_menu_item(fake_db, "Bread")
+    stored = asyncio.run(create_order(USER_ID, order_data(soup, key="tablet-1:42")))
+    mark_unavailable(fake_db, soup)
+
+    results = asyncio.run(create_orders_bulk(USER_ID, [
+        order_data(soup, key="tablet-1:42"),
+        order_data(bread, key="tablet-1:44"),
+        order_data(soup, key="tablet-1:42"),
+        order_data(soup, key="tablet-1:45")
+    ]))
+
+    assert [result["status"] for result in results] == ["duplicate", "created", "duplicate", "failed"]
+    assert results[0]["order_id"] == results[2]["order_id"] == str(stored["_id"])
+    assert results[0]["order_number"] == stored["order_number"]
+    assert len(fake_db.orders.documents) == 2
@@ -0,0 +1,101 @@
+import asyncio
+import math
+import random
+import re
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.schemas.order import OrderCreate
+from app.services.order_service import create_order
+from app.services.sequence_service import OrderNumberAllocator, format_order_number
+
+USER_ID = "user-1"
+DAY = "20240315"
+
+def counter_calls(fake_db):
+    return [call for call in fake_db.calls if call[0] == "order_counters"]
+
+def test_concurrent_workers_never_repeat_a_number(fake_db):
+    # Each allocator plays one worker sharing the order_counters collection
+    fake_db.order_counters.latency = 0.001
+    workers = [OrderNumberAllocator(block_size=block_size) for block_size in (1, 5, 20, 20, 50)]
+    rng = random.Random(12)
+
+    async def create_orders():
+        calls = [rng.choice(workers).next_number(USER_ID, DAY) for _ in range(600)]
+        return await asyncio.gather(*calls)
+
+    numbers = asyncio.run(create_orders())
+
+    assert len(numbers) == 600
+    assert len(set(numbers)) == 600
+
+def test_counter_round_trips_per_block(fake_db):
+    block_size = settings.ORDER_NUMBER_BLOCK_SIZE
+    workers = [OrderNumberAllocator(block_size=block_size) for _ in range(4)]
+
+    async def create_orders():
+        # Round robin, so every worker is left with a partly used block
+        calls = [workers[n % len(workers)].next_number(USER_ID, DAY) for n in range(600)]
+        return await asyncio.gather(*calls)
+
+    numbers = asyncio.run(create_orders())
+
+    assert len(set(numbers)) == 600
+    # One $inc per block; each worker's last block may be partly unused
+    blocks = math.ceil(600 / block_size)
+    assert blocks <= len(counter_calls(fake_db)) <= blocks + len(workers) - 1
+    assert max(numbers) <= len(counter_calls(fake_db)) * block_size
+
+def test_batch_reservations_stay_unique(fake_db):
+    first, second = OrderNumberAllocator(block_size=10), OrderNumberAllocator(block_size=10)
+
+    async def reserve():
+        return await asyncio.gather(
+            first.next_numbers(USER_ID, DAY, 25),
+            second.next_numbers(USER_ID, DAY, 3),
+            first.next_numbers(USER_ID, DAY, 4),
+            second.next_numbers(USER_ID, DAY, 30)
+        )
+
+    batches = asyncio.run(reserve())
+    numbers = [number for batch in batches for number in batch]
+
+    assert len(numbers) == len(set(numbers)) == 62
+    assert all(batch == sorted(batch) for batch in batches)
+
+def test_new_day_starts_a_new_counter(fake_db):
+    allocator = OrderNumberAllocator(block_size=5)
+
+    async def allocate():
+        return [
+            await allocator.next_number(USER_ID, "20240315"),
+            await allocator.next_number(USER_ID, "20240315"),
+            await allocator.next_number(USER_ID, "20240316")
+        ]
+
+    assert asyncio.run(allocate()) == [1, 2, 1]
+
+def test_format_order_number():
+    assert format_order_number(datetime(2024, 3, 15, 9, 30), 7) == "20240315-0007"
+
+def test_create_order_numbers(fake_db):
+    item_id = ObjectId()
+    fake_db.menu_items.documents.append({
+        "_id": item_id, "user_id": USER_ID, "name": "Dal", "price": 8.0, "category": "main", "is_available": True
+    })
+    order_data = OrderCreate(items=[{"menu_item_id": str(item_id), "name": "Dal", "quantity": 1, "price": 8.0}])
+    count = settings.ORDER_NUMBER_BLOCK_SIZE + 5
+
+    async def create_orders():
+        return await asyncio.gather(*[create_order(USER_ID, order_data) for _ in range(count)])
+
+    orders = asyncio.run(create_orders())
+    order_numbers = [order["order_number"] for order in orders]
+
+    assert all(re.fullmatch(r"\d{8}-\d{4}", number) for number in order_numbers)
+    assert all(order["order_number"].startswith(order["created_at"].strftime("%Y%m%d")) for order in orders)
+    assert sorted(int(number[-4:]) for number in order_numbers) == list(range(1, count + 1))
+    assert len(counter_calls(fake_db)) == math.ceil(count / settings.ORDER_NUMBER_BLOCK_SIZE)
@@ -0,0 +1,53 @@
+from datetime import date, datetime, timedelta
+
+from app.services import report_cache as report_cache_module
+from app.services.report_cache import ReportCache
+
+USER_ID = "user-1"
+
+def make_cache():
+    return ReportCache(max_entries=10, ttl_seconds=30, closed_ttl_seconds=600)
+
+def test_closed_range_expires_after_closed_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(report_cache_module.time, "monotonic", lambda: now[0])
+    cache = make_cache()
+    last_week = date.today() - timedelta(days=7)
+    cache.set("summary", USER_ID, "daily", last_week, last_week, "report")
+
+    # Outlives the open-range TTL...
+    now[0] += 599
+    assert cache.get("summary", USER_ID, "daily", last_week, last_week) == "report"
+
+    # ...but not the closed-range one, so writes on other workers show up
+    now[0] += 2
+    assert cache.get("summary", USER_ID, "daily", last_week, last_week) is None
+
+def test_open_range_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(report_cache_module.time, "monotonic", lambda: now[0])
+    cache = make_cache()
+    today = datetime.utcnow().date()
+    cache.set("sales", USER_ID, "daily", today, today, "report")
+
+    now[0] += 31
+    assert cache.get("sales", USER_ID, "daily", today, today) is None
+
+def test_write_invalidates_only_covering_ranges():
+    cache = make_cache()
+    january = (date(2024, 1, 1), date(2024, 1, 31))
+    february = (date(2024, 2, 1), date(2024, 2, 29))
+    cache.set("sales", USER_ID, "monthly", *january, "january")
+    cache.set("sales", USER_ID, "monthly", *february, "february")
+
+    assert cache.invalidate(USER_ID, datetime(2024, 1, 15, 12)) == 1
+    assert cache.get("sales", USER_ID, "monthly", *january) is None
+    assert cache.get("sales", USER_ID, "monthly", *february) == "february"
+
+def test_report_computed_during_a_write_is_not_cached():
+    cache = make_cache()
+    version = cache.version(USER_ID)
+    cache.invalidate(USER_ID, datetime(2024, 1, 15))
+    cache.set("sales", USER_ID, "monthly", date(2024, 1, 1), date(2024, 1, 31), "stale", version=version)
+
+    assert cache.get("sales", USER_ID, "monthly", date(2024, 1, 1), date(2024, 1, 31)) is None
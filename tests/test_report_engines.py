@@ -0,0 +1,62 @@
+import asyncio
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.schemas.report import ReportTimeFrame
+from app.services.report_service import aggregate_report_rows, rollup_report_rows, scan_report_rows
+from app.services.rollup_service import ROLLUP_FIELDS, record_orders_created
+
+USER_ID = "user-1"
+# Spans two year boundaries, where ISO weeks and calendar years disagree
+START = date(2023, 12, 20)
+END = date(2025, 1, 10)
+
+def make_orders(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    span = int((datetime.combine(END, datetime.max.time()) - datetime.combine(START, datetime.min.time())).total_seconds())
+    orders = []
+    for _ in range(count):
+        subtotal = round(rng.uniform(5, 120), 2)
+        tax = round(subtotal * 0.1, 2)
+        orders.append({
+            "user_id": USER_ID,
+            "created_at": datetime.combine(START, datetime.min.time()) + timedelta(seconds=rng.randrange(span)),
+            "items": [{"quantity": rng.randint(1, 4)} for _ in range(rng.randint(1, 3))],
+            "subtotal": subtotal,
+            "tax": tax,
+            "discount": 0.0,
+            "total": subtotal + tax
+        })
+    # Another user's orders must never leak in
+    orders.append({**orders[0], "user_id": "someone-else"})
+    return orders
+
+def assert_same_rows(actual, expected):
+    assert [row["date"] for row in actual] == [row["date"] for row in expected]
+    for actual_row, expected_row in zip(actual, expected):
+        for field in ROLLUP_FIELDS:
+            assert actual_row[field] == pytest.approx(expected_row[field]), (actual_row["date"], field)
+
+@pytest.mark.parametrize("time_frame", list(ReportTimeFrame))
+def test_engines_agree(fake_db, time_frame):
+    orders = make_orders(3000)
+    fake_db.orders.documents.extend(orders)
+    asyncio.run(record_orders_created(orders))
+
+    scanned = asyncio.run(scan_report_rows(USER_ID, time_frame, START, END))
+    aggregated = asyncio.run(aggregate_report_rows(USER_ID, time_frame, START, END))
+    rolled_up = asyncio.run(rollup_report_rows(USER_ID, time_frame, START, END))
+
+    assert sum(row["orders_count"] for row in scanned) == len(orders) - 1
+    assert_same_rows(aggregated, scanned)
+    assert_same_rows(rolled_up, scanned)
+
+def test_daily_rows_cover_every_day(fake_db):
+    fake_db.orders.documents.extend(make_orders(50))
+
+    rows = asyncio.run(scan_report_rows(USER_ID, ReportTimeFrame.DAILY, START, END))
+
+    assert len(rows) == (END - START).days + 1
+    assert rows[0]["date"] == datetime.combine(START, datetime.min.time())
@@ -0,0 +1,58 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services.archive_service import archive_orders
+from app.services.rollup_service import rebuild_rollups, record_orders_created, verify_rollups
+
+USER_ID = "user-1"
+
+def make_orders(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    # Half are old enough to archive, half are recent
+    now = datetime.utcnow()
+    orders = []
+    for _ in range(count):
+        subtotal = round(rng.uniform(5, 80), 2)
+        orders.append({
+            "_id": ObjectId(),
+            "user_id": USER_ID,
+            "created_at": now - timedelta(days=rng.uniform(1, 2 * settings.ORDER_ARCHIVE_AFTER_DAYS)),
+            "items": [{"quantity": rng.randint(1, 3), "subtotal": subtotal}],
+            "subtotal": subtotal,
+            "tax": round(subtotal * 0.1, 2),
+            "discount": 0.0,
+            "total": subtotal + round(subtotal * 0.1, 2),
+            "status": rng.choice(["delivered", "cancelled", "pending"]),
+            "payment_method": "cash"
+        })
+    return orders
+
+def test_archiving_causes_no_rollup_drift(fake_db, monkeypatch):
+    # Small buckets so some days are split over several of them
+    monkeypatch.setattr(settings, "ORDER_ARCHIVE_BUCKET_SIZE", 7)
+    orders = make_orders(400)
+    fake_db.orders.documents.extend(orders)
+    asyncio.run(record_orders_created(orders))
+    assert asyncio.run(verify_rollups(USER_ID)) == []
+
+    result = asyncio.run(archive_orders(USER_ID))
+
+    assert result["archived"] > 0
+    assert asyncio.run(verify_rollups(USER_ID)) == []
+
+def test_rebuild_counts_archived_orders(fake_db):
+    orders = make_orders(200)
+    fake_db.orders.documents.extend(orders)
+    asyncio.run(record_orders_created(orders))
+    stored = {(doc["user_id"], doc["day"]): doc["orders_count"] for doc in fake_db.order_daily_rollups.documents}
+    asyncio.run(archive_orders(USER_ID))
+
+    result = asyncio.run(rebuild_rollups(USER_ID))
+
+    rebuilt = {(doc["user_id"], doc["day"]): doc["orders_count"] for doc in fake_db.order_daily_rollups.documents}
+    assert result["removed"] == 0
+    assert rebuilt == stored
@@ -0,0 +1,52 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import uploads
+from app.core.config import settings
+
+CONTENT = bytes(range(256)) * 40
+PATH = "menu/user-1/" + "b" * 64 + ".jpg"
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    stored = tmp_path / PATH
+    stored.parent.mkdir(parents=True)
+    stored.write_bytes(CONTENT)
+
+    app = FastAPI()
+    app.include_router(uploads.router, prefix="/uploads")
+    return TestClient(app)
+
+def no_reads(monkeypatch):
+    def iter_file_range(*args):
+        raise AssertionError("HEAD must not read the file")
+
+    monkeypatch.setattr(uploads, "iter_file_range", iter_file_range)
+
+def test_get_range(client):
+    response = client.get(f"/uploads/{PATH}", headers={"Range": "bytes=10-19"})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+def test_head_range_has_headers_and_no_body(client, monkeypatch):
+    no_reads(monkeypatch)
+
+    response = client.head(f"/uploads/{PATH}", headers={"Range": "bytes=10-19"})
+
+    assert response.status_code == 206
+    assert response.content == b""
+    assert response.headers["content-length"] == "10"
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+    assert response.headers["content-type"] == "image/jpeg"
+
+def test_head_full_file_has_headers_and_no_body(client):
+    response = client.head(f"/uploads/{PATH}")
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == str(len(CONTENT))
+    assert response.headers["etag"] == '"' + "b" * 64 + '"'